@@ -1,12 +1,3 @@
-<<<<<<< HEAD
-from pathlib import Path
-
-import cv2
-from ultralytics import YOLO
-
-# Lazy-loaded YOLO model (avoid network attempts if path is wrong)
-_model = None
-=======
 """
 Yemen LPR - Plate Detection Module
 Safe model loading with graceful error handling.
@@ -15,25 +6,15 @@ from pathlib import Path
 import os
 import logging
 
-import cv2
-
 logger = logging.getLogger(__name__)
 
 # Singleton model instance
 _model = None
 _model_error = None
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
 
 
 def _resolve_model_path() -> str:
     """
-<<<<<<< HEAD
-    Resolve local YOLO weights path.
-    Expected layout (production): <repo_root>/ai/best.pt
-    """
-    repo_root = Path(__file__).resolve().parents[1]  # workspace root
-    candidates = [
-=======
     Resolve YOLO plate detection weights path.
     Priority: ENV var > ai/models/plate_detect.pt > ai/best.pt > legacy paths
     Returns None if not found (instead of raising).
@@ -52,61 +33,10 @@ def _resolve_model_path() -> str:
     candidates = [
         Path(__file__).resolve().parent / "models" / "plate_detect.pt",
         Path(__file__).resolve().parent / "models" / "best.pt",
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
         Path(__file__).resolve().parent / "best.pt",
         repo_root / "model" / "best.pt",
         repo_root / "models" / "best.pt",
     ]
-<<<<<<< HEAD
-    for p in candidates:
-        if p.exists():
-            return str(p)
-    raise FileNotFoundError(
-        "YOLO weights not found. Expected one of: "
-        + ", ".join(str(p) for p in candidates)
-    )
-
-
-def get_model() -> YOLO:
-    """Get or create YOLO model (singleton)."""
-    global _model
-    if _model is None:
-        weights = _resolve_model_path()
-        _model = YOLO(weights)
-        _model.to("cpu")
-    return _model
-
-def detect_plates(image, conf_thres=0.4):
-    """
-    image: صورة BGR (numpy array)
-    يرجع قائمة من العناصر: (crop_bgr, conf, bbox)
-    bbox = [x1, y1, x2, y2]
-    """
-    # استخدم predict مع تحديد الجهاز
-    model = get_model()
-    results = model.predict(source=image, device="cpu")[0]
-    plates = []
-
-    if results.boxes is None:
-        return plates
-    for box in results.boxes:
-        # xyxy قد يكون Tensor؛ نحوله لأرقام صحيحة
-        xyxy = box.xyxy[0].cpu().numpy()
-        x1, y1, x2, y2 = map(int, xyxy[:4])
-        conf = float(box.conf[0])
-
-        if conf >= conf_thres:
-            # تأكد من حدود الصورة
-            h, w = image.shape[:2]
-            x1c, y1c = max(0, x1), max(0, y1)
-            x2c, y2c = min(w, x2), min(h, y2)
-            crop = image[y1c:y2c, x1c:x2c].copy()
-            if crop.size == 0:
-                continue
-            plates.append((crop, conf, [x1c, y1c, x2c, y2c]))
-
-    return plates
-=======
     
     for p in candidates:
         if p.exists():
@@ -135,9 +65,8 @@ def get_model():
             logger.error(_model_error)
             return None
         
-        from ultralytics import YOLO
-        _model = YOLO(weights)
-        _model.to("cpu")
+        from ai.yolo_backend import load_model
+        _model = load_model(weights, "YOLO_DETECT_ONNX_PATH")
         logger.info(f"Plate detection model loaded from: {weights}")
         return _model
         
@@ -169,17 +98,14 @@ def detect_plates(image, conf_thres=0.4):
         return []
     
     try:
-        results = model.predict(source=image, device="cpu", verbose=False)[0]
+        from ai.yolo_backend import predict
+        dets = predict(model, image, conf=conf_thres)[0]
         plates = []
         
-        if results.boxes is None:
-            return plates
-        
         h, w = image.shape[:2]
-        for box in results.boxes:
-            xyxy = box.xyxy[0].cpu().numpy()
+        for xyxy, conf in zip(dets.boxes, dets.confs):
             x1, y1, x2, y2 = map(int, xyxy[:4])
-            conf = float(box.conf[0])
+            conf = float(conf)
             
             if conf >= conf_thres:
                 x1c, y1c = max(0, x1), max(0, y1)
@@ -194,4 +120,3 @@ def detect_plates(image, conf_thres=0.4):
     except Exception as e:
         logger.error(f"Plate detection failed: {str(e)}")
         return []
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
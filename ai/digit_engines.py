@@ -0,0 +1,150 @@
+"""
+Yemen LPR - Fallback Digit Engines (Tesseract)
+Pluggable single-digit readers consulted by ai.gov_detect only when EasyOCR
+did not produce a valid governorate digit.
+
+Engines (GOV_DIGIT_ENGINE=auto|tesserocr|pytesseract|none):
+- tesserocr: persistent in-process Tesseract API handles (no fork per call)
+- pytesseract: tesseract CLI, run through a small thread pool
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIGIT_WHITELIST = "0123456789"
+ENGINE_NAME = os.getenv("GOV_DIGIT_ENGINE", "auto").lower()
+POOL_SIZE = int(os.getenv("GOV_DIGIT_ENGINE_WORKERS", "2"))
+
+_engine = None
+_engine_resolved = False
+_engine_lock = threading.Lock()
+
+
+class _EngineStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def record(self, seconds, error=False):
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            if error:
+                self.errors += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_seconds": round(self.seconds, 4),
+                "avg_ms": round(1000 * self.seconds / self.calls, 2) if self.calls else 0.0,
+            }
+
+
+class TesserocrEngine:
+    """Pool of persistent tesserocr API handles (one image per handle at a time)."""
+
+    name = "tesserocr"
+
+    def __init__(self, size=POOL_SIZE):
+        from tesserocr import PyTessBaseAPI, PSM
+
+        self._apis = queue.Queue()
+        for _ in range(max(size, 1)):
+            api = PyTessBaseAPI(psm=PSM.SINGLE_LINE)
+            api.SetVariable("tessedit_char_whitelist", DIGIT_WHITELIST)
+            self._apis.put(api)
+        self.stats = _EngineStats()
+
+    def read(self, img):
+        img = np.ascontiguousarray(img)
+        h, w = img.shape[:2]
+        api = self._apis.get()
+        started = time.perf_counter()
+        try:
+            api.SetImageBytes(img.tobytes(), w, h, 1, w)
+            text = api.GetUTF8Text().strip()
+            self.stats.record(time.perf_counter() - started)
+            return text
+        except Exception as e:
+            self.stats.record(time.perf_counter() - started, error=True)
+            logger.debug(f"tesserocr failed: {e}")
+            return None
+        finally:
+            self._apis.put(api)
+
+    def read_many(self, images):
+        return [self.read(img) for img in images]
+
+
+class PytesseractEngine:
+    """tesseract CLI via pytesseract; calls for one plate run in parallel."""
+
+    name = "pytesseract"
+    config = f"--psm 7 -c tessedit_char_whitelist={DIGIT_WHITELIST}"
+
+    def __init__(self, size=POOL_SIZE):
+        import pytesseract
+
+        pytesseract.get_tesseract_version()  # fail early if the binary is missing
+        self._pytesseract = pytesseract
+        self._pool = ThreadPoolExecutor(max_workers=max(size, 1), thread_name_prefix="tesseract")
+        self.stats = _EngineStats()
+
+    def read(self, img):
+        started = time.perf_counter()
+        try:
+            text = self._pytesseract.image_to_string(img, config=self.config).strip()
+            self.stats.record(time.perf_counter() - started)
+            return text
+        except Exception as e:
+            self.stats.record(time.perf_counter() - started, error=True)
+            logger.debug(f"pytesseract failed: {e}")
+            return None
+
+    def read_many(self, images):
+        return list(self._pool.map(self.read, images))
+
+
+def get_digit_engine():
+    """
+    Get the configured fallback digit engine (created once per process).
+    Returns None if disabled or no Tesseract binding is available.
+    """
+    global _engine, _engine_resolved
+    if _engine_resolved:
+        return _engine
+    with _engine_lock:
+        if _engine_resolved:
+            return _engine
+        candidates = {
+            "auto": (TesserocrEngine, PytesseractEngine),
+            "tesserocr": (TesserocrEngine,),
+            "pytesseract": (PytesseractEngine,),
+        }.get(ENGINE_NAME, ())
+        for cls in candidates:
+            try:
+                _engine = cls()
+                logger.info(f"Governorate fallback digit engine: {cls.name}")
+                break
+            except Exception as e:
+                logger.info(f"Digit engine {cls.name} unavailable: {e}")
+        _engine_resolved = True
+    return _engine
+
+
+def get_stats():
+    """Per-call latency statistics of the active digit engine."""
+    if _engine is None:
+        return {"engine": None}
+    return {"engine": _engine.name, **_engine.stats.as_dict()}
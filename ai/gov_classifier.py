@@ -0,0 +1,115 @@
+"""
+Yemen LPR - Governorate Digit Classifier (fast path)
+Template matching over the normalized 60x80 left strip: one mean template per
+digit, scored by normalized cross-correlation (a single small matrix product).
+ai.gov_detect falls back to OCR whenever the classifier is unsure.
+
+Templates are built from labeled crops with scripts/build_gov_templates.py.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).resolve().parent / "models" / "gov_digit_templates.npz"
+
+_classifier = None
+_classifier_resolved = False
+_lock = threading.Lock()
+
+
+def normalize_strip(strip):
+    """Flatten a strip into a zero-mean, unit-norm float32 vector."""
+    vec = np.asarray(strip, dtype=np.float32).ravel()
+    vec = vec - vec.mean()
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+class GovDigitClassifier:
+    """Nearest-template digit classifier with a confidence margin."""
+
+    def __init__(self, labels, templates, ratio=0.28, variant="resize_clahe",
+                 min_score=0.6, min_margin=0.08):
+        self.labels = [str(label) for label in labels]
+        self.templates = np.asarray(templates, dtype=np.float32)
+        self.ratio = float(ratio)
+        self.variant = str(variant)
+        self.min_score = float(min_score)
+        self.min_margin = float(min_margin)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        return cls(
+            labels=data["labels"],
+            templates=data["templates"],
+            ratio=data["ratio"].item(),
+            variant=data["variant"].item(),
+            min_score=data["min_score"].item(),
+            min_margin=data["min_margin"].item(),
+        )
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            templates=self.templates,
+            ratio=np.array(self.ratio),
+            variant=np.array(self.variant),
+            min_score=np.array(self.min_score),
+            min_margin=np.array(self.min_margin),
+        )
+
+    def scores(self, strip):
+        """Correlation of strip with every template."""
+        return self.templates @ normalize_strip(strip)
+
+    def classify(self, strip):
+        """
+        Classify a normalized strip.
+
+        Returns:
+            dict with digit, score, margin and sure (False means: use OCR)
+        """
+        scores = self.scores(strip)
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        second = float(scores[order[1]]) if len(order) > 1 else -1.0
+        margin = best - second
+        return {
+            "digit": self.labels[order[0]],
+            "score": round(best, 4),
+            "margin": round(margin, 4),
+            "sure": best >= self.min_score and margin >= self.min_margin,
+        }
+
+
+def get_classifier():
+    """
+    Load the template classifier once (GOV_CLASSIFIER_PATH or
+    ai/models/gov_digit_templates.npz). Returns None if no templates exist
+    or GOV_CLASSIFIER=false.
+    """
+    global _classifier, _classifier_resolved
+    if _classifier_resolved:
+        return _classifier
+    with _lock:
+        if _classifier_resolved:
+            return _classifier
+        enabled = os.getenv("GOV_CLASSIFIER", "true").lower() == "true"
+        path = Path(os.getenv("GOV_CLASSIFIER_PATH", str(DEFAULT_TEMPLATES_PATH)))
+        if not path.is_absolute():
+            path = Path(__file__).resolve().parents[1] / path
+        if enabled and path.exists():
+            try:
+                _classifier = GovDigitClassifier.load(path)
+                logger.info(f"Governorate digit classifier loaded from: {path}")
+            except Exception as e:
+                logger.error(f"Failed to load governorate classifier: {e}")
+        _classifier_resolved = True
+    return _classifier
@@ -6,11 +6,18 @@ Handles extraction and processing of left-side governorate codes
 import os
 import cv2
 import json
+import logging
+import time
 import uuid
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 
+from ai import digit_engines, gov_classifier, ocr_cache, ocr_engine, ocr_policy, ocr_pool
+from ai.preprocess import PlateContext
+
+logger = logging.getLogger(__name__)
+
 # Arabic-Indic digits mapping
 ARABIC_DIGITS = {
     '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
@@ -81,52 +88,16 @@ def preprocess_left_region_variant(img, variant='resize_clahe'):
     """Apply specialized preprocessing for left side governorate code extraction"""
     if img is None or img.size == 0:
         return None
-    
-    # Convert to grayscale if needed
-    if len(img.shape) == 3:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = img.copy()
-    
-    # Resize to standard dimensions
-    target_height = 80
-    target_width = 60
-    resized = cv2.resize(gray, (target_width, target_height), interpolation=cv2.INTER_CUBIC)
-    
-    if variant == 'resize_clahe':
-        # Resize + CLAHE enhancement
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(4, 4))
-        enhanced = clahe.apply(resized)
-        return enhanced
-    
-    elif variant == 'adaptive_threshold':
-        # Adaptive thresholding
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
-        enhanced = clahe.apply(resized)
-        binary = cv2.adaptiveThreshold(enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                     cv2.THRESH_BINARY, 11, 2)
-        return binary
-    
-    elif variant == 'bilateral_otsu':
-        # Bilateral filter + OTSU thresholding
-        bilateral = cv2.bilateralFilter(resized, 9, 75, 75)
-        _, binary = cv2.threshold(bilateral, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        return binary
-    
-    elif variant == 'invert':
-        # Invert colors for better OCR on dark text
-        inverted = cv2.bitwise_not(resized)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4))
-        enhanced = clahe.apply(inverted)
-        return enhanced
-    
-    return resized
+    return PlateContext.of(img).governorate_variant(variant)
 
 def extract_left_regions(plate_img, width_ratios=[0.22, 0.28, 0.36]):
     """Extract left side regions of plate for governorate code extraction"""
     if plate_img is None or plate_img.size == 0:
         return []
     
+    if isinstance(plate_img, PlateContext):
+        return [(ratio, plate_img.left(ratio)) for ratio in width_ratios]
+    
     h, w = plate_img.shape[:2]
     regions = []
     
@@ -138,13 +109,14 @@ def extract_left_regions(plate_img, width_ratios=[0.22, 0.28, 0.36]):
     
     return regions
 
-def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
+def extract_left_code_strong(plate_img, debug_dir=None, policy=None, **kwargs):
     """
     Strong governorate code extraction from left side of plate
     
     Args:
-        plate_img: Full plate image from YOLO detection
+        plate_img: Full plate image from YOLO detection (or PlateContext)
         debug_dir: Directory for debug images and JSON (optional)
+        policy: Overrides for the "governorate" OCR policy (see ai.ocr_policy)
     
     Returns:
         dict with governorate_code, governorate_name, governorate_source, raw_reads, debug
@@ -168,12 +140,8 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
     else:
         timestamp = None
     
-    # Extract left regions with different ratios
-    width_ratios = [0.22, 0.28, 0.36]
-    regions = extract_left_regions(plate_img, width_ratios)
-    
-    # Preprocessing variants
-    variants = ['resize_clahe', 'adaptive_threshold', 'bilateral_otsu', 'invert']
+    # Ordered (width_ratio, variant) passes with early-exit rule
+    policy = ocr_policy.get_policy('governorate', policy)
     
     # Load governorate mapping
     gov_mapping = load_governorate_mapping()
@@ -184,63 +152,131 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
     all_candidates = []
     debug_tries = []
     
-    # Import EasyOCR reader
-    try:
-        import easyocr
-        reader = easyocr.Reader(['ar', 'en'], gpu=False)
-    except ImportError:
-        reader = None
+    # (ratio, variant, processed, debug_try) of every OCR'd image
+    tried = []
     
-    # Process each region with each variant
-    for ratio, region in regions:
-        if region is None or region.size == 0:
-            continue
-            
-        for variant in variants:
+    # Grayscale plate shared by all passes; left regions are views of it
+    plate_img = PlateContext.of(plate_img)
+    regions = {}
+    
+    # Same plate seen recently (video frames, repeated uploads): reuse its result
+    cache = ocr_cache.get_cache()
+    cache_key = ocr_cache.make_key(plate_img.gray, 'governorate', policy, ocr_engine.PROFILE) if cache else None
+    if cache_key:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            # The cached debug paths belong to the request that filled the
+            # cache; this request gets its own debug JSON (no images, no OCR ran)
+            debug_json_path = None
+            if debug_dir and timestamp:
+                debug_json_path = Path(debug_dir) / f"debug_{timestamp}.json"
+                with open(debug_json_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'timestamp': timestamp,
+                        'cache_hit': True,
+                        'governorate_code': cached['governorate_code'],
+                        'governorate_name': cached['governorate_name'],
+                        'governorate_source': cached['governorate_source'],
+                        'early_exit': cached['debug'].get('early_exit'),
+                    }, f, indent=2, ensure_ascii=False)
+            cached['debug'].update({
+                'debug_json': str(debug_json_path) if debug_json_path else None,
+                'debug_images': [],
+                'cache_hit': True
+            })
+            return cached
+    
+    # Fast path: template classifier on the normalized left strip
+    classifier_result = None
+    classifier = gov_classifier.get_classifier()
+    if classifier:
+        strip = preprocess_left_region_variant(plate_img.left(classifier.ratio), classifier.variant)
+        if strip is not None and strip.size > 0:
+            classifier_result = classifier.classify(strip)
+            code = classifier_result['digit']
+            if classifier_result['sure'] and code in gov_mapping:
+                classifier_read = {
+                    'raw_text': code,
+                    'digits': code,
+                    'confidence': classifier_result['score'],
+                    'source': 'classifier',
+                    'region_ratio': classifier.ratio,
+                    'variant': classifier.variant
+                }
+                all_raw_reads.append(classifier_read)
+                all_candidates.append((code, classifier_result['score'], 10 + classifier_result['score'], classifier_read))
+    
+    # Shared EasyOCR reader (loaded once per process), only needed without a sure
+    # classification; with the OCR pool enabled the worker processes hold the reader
+    reader = None
+    use_ocr = False
+    if not all_candidates:
+        if ocr_pool.enabled():
+            use_ocr = True
+        else:
+            try:
+                reader = ocr_engine.get_profile_reader()
+                use_ocr = True
+            except ImportError:
+                reader = None
+    
+    def run_stage(passes):
+        ratios = sorted({ratio for ratio, _variant in passes} - set(regions))
+        regions.update(extract_left_regions(plate_img, ratios))
+        
+        # Preprocess every region/variant combination first so that EasyOCR can
+        # recognize them together in one batch
+        prepared = []
+        for ratio, variant in passes:
+            region = regions.get(ratio)
+            if region is None or region.size == 0:
+                continue
             try:
                 # Apply preprocessing
                 processed = preprocess_left_region_variant(region, variant)
                 if processed is None or processed.size == 0:
                     continue
-                
+            
                 # Save debug image if debug_dir provided
+                debug_path = None
                 if debug_dir and timestamp:
                     debug_filename = f"left_ratio_{ratio}_variant_{variant}_{uuid.uuid4().hex[:8]}.png"
                     debug_path = Path(debug_dir) / debug_filename
                     cv2.imwrite(str(debug_path), processed)
                     debug_images.append(str(debug_path))
-                
-                # EasyOCR
-                ocr_results = []
-                if reader:
-                    try:
-                        rgb_img = cv2.cvtColor(processed, cv2.COLOR_GRAY2RGB)
-                        ocr_results = reader.readtext(rgb_img, detail=1, paragraph=False)
-                    except Exception as e:
-                        print(f"EasyOCR error: {e}")
-                        ocr_results = []
-                
-                # Tesseract as fallback
-                tesseract_text = None
-                try:
-                    import pytesseract
-                    config = '--psm 7 -c tessedit_char_whitelist=0123456789'
-                    tesseract_text = pytesseract.image_to_string(processed, config=config).strip()
-                except:
-                    pass
-                
+            
+                prepared.append((ratio, variant, processed, debug_path))
+            
+            except Exception as e:
+                debug_tries.append({
+                    'ratio': ratio,
+                    'variant': variant,
+                    'error': str(e)
+                })
+                continue
+            
+        # EasyOCR (batched over all prepared images)
+        batch_results = [[] for _ in prepared]
+        if use_ocr and prepared:
+            try:
+                batch_results = ocr_engine.read_regions([p[2] for p in prepared], reader=reader)
+            except Exception as e:
+                logger.warning("EasyOCR error: %s", e)
+    
+        for (ratio, variant, processed, debug_path), ocr_results in zip(prepared, batch_results):
+            try:
                 # Process EasyOCR results
                 for bbox, text, conf in ocr_results:
                     if text and len(text.strip()) > 0:
                         cleaned_text = text.strip()
                         digits_only = extract_digits_only(cleaned_text)
-                        
+                    
                         # Convert to integer string to remove leading zeros
                         if digits_only and digits_only.isdigit():
                             cleaned_digits = str(int(digits_only))
                         else:
                             cleaned_digits = digits_only
-                        
+                    
                         raw_read = {
                             'raw_text': cleaned_text,
                             'digits': cleaned_digits,
@@ -250,41 +286,23 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
                             'variant': variant
                         }
                         all_raw_reads.append(raw_read)
-                        
+                    
                         # الرقم الأيسر فقط: رقم واحد فقط من منطقة اليسار
                         if cleaned_digits and len(cleaned_digits) == 1 and cleaned_digits in gov_mapping:
                             score = 10 + float(conf)
                             all_candidates.append((cleaned_digits, float(conf), score, raw_read))
-                
-                # Process Tesseract result
-                if tesseract_text:
-                    tesseract_digits = extract_digits_only(tesseract_text)
-                    if tesseract_digits and tesseract_digits.isdigit():
-                        cleaned_tesseract = str(int(tesseract_digits))
-                        
-                        tesseract_read = {
-                            'raw_text': tesseract_text,
-                            'digits': cleaned_tesseract,
-                            'confidence': 0.7,
-                            'source': 'tesseract',
-                            'region_ratio': ratio,
-                            'variant': variant
-                        }
-                        all_raw_reads.append(tesseract_read)
-                        
-                        if len(cleaned_tesseract) == 1 and cleaned_tesseract in gov_mapping:
-                            score = 10 + 0.7
-                            all_candidates.append((cleaned_tesseract, 0.7, score, tesseract_read))
-                
+            
                 # Record this try
-                debug_tries.append({
+                debug_try = {
                     'ratio': ratio,
                     'variant': variant,
                     'easyocr_results': len(ocr_results),
-                    'tesseract_text': tesseract_text,
-                    'debug_image': str(debug_path) if debug_dir and timestamp else None
-                })
-                
+                    'tesseract_text': None,
+                    'debug_image': str(debug_path) if debug_path else None
+                }
+                debug_tries.append(debug_try)
+                tried.append((ratio, variant, processed, debug_try))
+            
             except Exception as e:
                 debug_tries.append({
                     'ratio': ratio,
@@ -293,11 +311,61 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
                 })
                 continue
     
+    if all_candidates:
+        # Classifier was sure: no OCR pass needed
+        decision = {
+            'target': 'governorate',
+            'passes_run': 0,
+            'passes_available': len(policy.get('passes', [])[: policy.get('max_passes') or None]),
+            'early_exit': True,
+            'passes': [],
+            'stop': policy.get('stop')
+        }
+    else:
+        decision = ocr_policy.run_passes('governorate', policy, run_stage, all_candidates)
+    decision['classifier'] = classifier_result
+    
+    # Tesseract only when EasyOCR produced no valid governorate digit
+    tesseract_debug = None
+    digit_engine = digit_engines.get_digit_engine() if not all_candidates and tried else None
+    if digit_engine:
+        started = time.perf_counter()
+        texts = digit_engine.read_many([t[2] for t in tried])
+        tesseract_debug = {
+            'engine': digit_engine.name,
+            'calls': len(tried),
+            'seconds': round(time.perf_counter() - started, 4)
+        }
+        for (ratio, variant, _processed, debug_try), tesseract_text in zip(tried, texts):
+            debug_try['tesseract_text'] = tesseract_text
+            if not tesseract_text:
+                continue
+            tesseract_digits = extract_digits_only(tesseract_text)
+            if tesseract_digits and tesseract_digits.isdigit():
+                cleaned_tesseract = str(int(tesseract_digits))
+                
+                tesseract_read = {
+                    'raw_text': tesseract_text,
+                    'digits': cleaned_tesseract,
+                    'confidence': 0.7,
+                    'source': 'tesseract',
+                    'region_ratio': ratio,
+                    'variant': variant
+                }
+                all_raw_reads.append(tesseract_read)
+                
+                if len(cleaned_tesseract) == 1 and cleaned_tesseract in gov_mapping:
+                    score = 10 + 0.7
+                    all_candidates.append((cleaned_tesseract, 0.7, score, tesseract_read))
+    
     # Select best candidate based on score
     best_result = None
+    winner = None
     if all_candidates:
         all_candidates.sort(key=lambda x: x[2], reverse=True)
         best_code, best_conf, best_score, best_read = all_candidates[0]
+        if best_read.get('source') == 'easyocr':
+            winner = [best_read['region_ratio'], best_read['variant']]
         best_result = {
             'governorate_code': best_code,
             'governorate_name': gov_mapping[best_code],
@@ -305,6 +373,7 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
             'confidence': best_conf,
             'score': best_score
         }
+    ocr_policy.record_winner(decision, winner)
     
     # Create debug JSON if debug_dir provided
     debug_json_path = None
@@ -324,6 +393,8 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
                 for code, conf, score, read in all_candidates
             ],
             'best_result': best_result,
+            'early_exit': decision,
+            'tesseract': tesseract_debug,
             'total_raw_reads': len(all_raw_reads),
             'debug_images': debug_images
         }
@@ -334,24 +405,26 @@ def extract_left_code_strong(plate_img, debug_dir=None, **kwargs):
     
     # Return result
     if best_result:
-        return {
+        result = {
             'governorate_code': best_result['governorate_code'],
             'governorate_name': best_result['governorate_name'],
             'governorate_source': best_result['governorate_source'],
-            'raw_reads': all_raw_reads,
-            'debug': {
-                'debug_json': str(debug_json_path) if debug_json_path else None,
-                'debug_images': debug_images
-            }
         }
-    # المحافظة غير معروفة عند عدم إمكانية استخراج الرقم الأيسر
-    return {
-        'governorate_code': None,
-        'governorate_name': None,
-        'governorate_source': None,
-        'raw_reads': all_raw_reads,
-        'debug': {
-            'debug_json': str(debug_json_path) if debug_json_path else None,
-            'debug_images': debug_images
+    else:
+        # المحافظة غير معروفة عند عدم إمكانية استخراج الرقم الأيسر
+        result = {
+            'governorate_code': None,
+            'governorate_name': None,
+            'governorate_source': None,
         }
-    }
\ No newline at end of file
+    result['raw_reads'] = all_raw_reads
+    result['debug'] = {
+        'debug_json': str(debug_json_path) if debug_json_path else None,
+        'debug_images': debug_images,
+        'early_exit': decision,
+        'tesseract': tesseract_debug,
+        'cache_hit': False
+    }
+    if cache_key:
+        cache.put(cache_key, result)
+    return result
@@ -1,24 +1,8 @@
 """
-<<<<<<< HEAD
-YOLOv8-Seg Vehicle Segmentation Inference (Singleton).
-Load model once; segment vehicles and crop by mask.
-"""
-from pathlib import Path
-import cv2
-import numpy as np
-
-_SEG_MODEL = None
-
-
-def _model_path() -> Path:
-    repo = Path(__file__).resolve().parents[1]
-    candidates = [
-        Path(__file__).resolve().parent / "models" / "vehicle_segmentation.pt",
-        Path(__file__).resolve().parent / "models" / "best.pt",
-=======
 Yemen LPR - Vehicle Segmentation Module
 Safe model loading with graceful error handling.
-YOLOv8-Seg for vehicle segmentation (singleton pattern).
+YOLOv8-Seg for vehicle segmentation (singleton pattern), plus box-only
+vehicle detection for the plates-first pipeline modes.
 """
 from pathlib import Path
 import os
@@ -32,6 +16,12 @@ logger = logging.getLogger(__name__)
 # Singleton instances
 _SEG_MODEL = None
 _MODEL_ERROR = None
+_BOX_MODEL = None
+_BOX_MODEL_ERROR = None
+_BOX_FALLBACK_WARNED = False
+
+# Class-name keywords that count as vehicles for box-only detectors (e.g. COCO)
+VEHICLE_CLASS_KEYWORDS = ("car", "sedan", "pickup", "pick-up", "truck", "bus", "van", "vehicle", "motorcycle")
 
 
 def _model_path():
@@ -55,55 +45,10 @@ def _model_path():
         Path(__file__).resolve().parent / "models" / "vehicle_segmentation.pt",
         Path(__file__).resolve().parent / "models" / "best.pt",
         Path(__file__).resolve().parent / "vehicle_segmentation.pt",
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
         Path(__file__).resolve().parent / "best.pt",
         repo / "model" / "vehicle_segmentation.pt",
         repo / "models" / "vehicle_segmentation.pt",
     ]
-<<<<<<< HEAD
-    for p in candidates:
-        if p.exists():
-            return p
-    raise FileNotFoundError(
-        "YOLOv8-Seg model not found. Add ai/models/vehicle_segmentation.pt or ai/best.pt."
-    )
-
-
-def get_seg_model():
-    """Load YOLOv8-Seg model once (singleton) with CUDA fallback."""
-    global _SEG_MODEL
-    if _SEG_MODEL is not None:
-        return _SEG_MODEL
-    
-    from ultralytics import YOLO
-    import torch
-    
-    path = _model_path()
-    try:
-        model = YOLO(str(path))
-        
-        # device selection with fallback
-        if torch.cuda.is_available():
-            try:
-                model.to("cuda")
-                print(f"Vehicle Seg Model loaded on CUDA: {path}")
-            except Exception as e:
-                print(f"CUDA load failed, falling back to CPU: {e}")
-                model.to("cpu")
-        else:
-            model.to("cpu")
-            print(f"Vehicle Seg Model loaded on CPU: {path}")
-            
-        _SEG_MODEL = model
-        return _SEG_MODEL
-    except Exception as e:
-        print(f"CRITICAL ERROR loading Vehicle Seg Model: {e}")
-        # Return None or raise? pipeline should handle it. 
-        # Raising is better to detect configuration issues early, 
-        # but requirements say "Do not fail request". 
-        # However, without model we can't segment. 
-        raise e
-=======
     
     for p in candidates:
         if p.exists():
@@ -132,9 +77,8 @@ def get_seg_model():
             logger.error(_MODEL_ERROR)
             return None
         
-        from ultralytics import YOLO
-        model = YOLO(str(path))
-        model.to("cpu")
+        from ai.yolo_backend import load_model
+        model = load_model(path, "YOLO_SEG_ONNX_PATH")
         
         _SEG_MODEL = model
         logger.info(f"Vehicle segmentation model loaded from: {path}")
@@ -154,88 +98,163 @@ def is_model_available() -> bool:
 def get_model_error() -> str:
     """Get the last model loading error message."""
     return _MODEL_ERROR
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
 
 
-def segment_vehicles(img_bgr, conf=0.4):
+def _get_vehicle_type(cls_id, class_names):
+    if cls_id is not None:
+        class_name = class_names.get(int(cls_id), "").lower()
+        if "car" in class_name or "sedan" in class_name:
+            return "car"
+        elif "pickup" in class_name or "pick-up" in class_name:
+            return "pickup"
+        elif "truck" in class_name:
+            return "truck"
+    return "vehicle"
+
+
+def get_vehicle_box_model():
     """
-<<<<<<< HEAD
-    Run YOLOv8-Seg on image. Return list of (crop_bgr, mask, bbox_xyxy, conf, vehicle_type).
-    crop_bgr: vehicle cropped using mask (rest blacked out or masked region only).
-    bbox_xyxy: [x1,y1,x2,y2] in image coords.
-    vehicle_type: "car", "pickup", "truck", or "vehicle" (default).
-    
-    Returns:
-        List of tuples: (crop, mask_binary, bbox, conf, vehicle_type, seg_metrics)
-        where seg_metrics = {
-            "mask_area": int,
-            "bbox_area": int,
-            "coverage_ratio": float,
-            "quality": str  # "high", "medium", "low"
-        }
+    Load the box-only vehicle detector once (singleton).
+    YOLO_VEHICLE_BOX_MODEL_PATH (e.g. a YOLOv8n detect model); without it the
+    segmentation model is reused. The ONNX backend then skips mask decoding,
+    but Ultralytics still computes the masks, so there is no speedup.
+    Returns None if no model is available.
     """
-    model = get_seg_model()
-    h, w = img_bgr.shape[:2]
-    results = model.predict(source=img_bgr, device="cpu", conf=conf, verbose=False)
-    out = []
-    if not results:
-        return out
-    r = results[0]
-    
-    # Get class names from model if available
-    class_names = getattr(model, 'names', {})
-    
-    def _get_vehicle_type(box, class_names):
-        """Determine vehicle type from detection class."""
-        if hasattr(box, 'cls') and box.cls is not None:
-            cls_id = int(box.cls[0].cpu().numpy())
-            class_name = class_names.get(cls_id, "").lower()
-            if "car" in class_name or "sedan" in class_name:
-                return "car"
-            elif "pickup" in class_name or "pick-up" in class_name:
-                return "pickup"
-            elif "truck" in class_name:
-                return "truck"
-        # Default based on aspect ratio
-        return "vehicle"
-    
-    def _calculate_segmentation_metrics(mask_binary, bbox):
-        """Calculate segmentation quality metrics."""
-        x1, y1, x2, y2 = bbox
-        bbox_area = (x2 - x1) * (y2 - y1)
-        
-        if mask_binary is not None:
-            # Calculate mask area within bbox
-            mask_roi = mask_binary[y1:y2, x1:x2]
-            mask_area = int(np.sum(mask_roi > 0))
-        else:
-            mask_area = 0
-        
-        # Calculate coverage ratio
-        coverage_ratio = mask_area / bbox_area if bbox_area > 0 else 0.0
-        
-        # Classify quality
-        if coverage_ratio >= 0.85:
-            quality = "high"
-        elif coverage_ratio >= 0.65:
-            quality = "medium"
-        else:
-            quality = "low"
-        
-        return {
-            "mask_area": mask_area,
-            "bbox_area": bbox_area,
-            "coverage_ratio": round(float(coverage_ratio), 4),
-            "quality": quality
+    global _BOX_MODEL, _BOX_MODEL_ERROR, _BOX_FALLBACK_WARNED
+
+    if _BOX_MODEL is not None:
+        return _BOX_MODEL
+
+    if _BOX_MODEL_ERROR is not None:
+        return None
+
+    env_path = os.getenv("YOLO_VEHICLE_BOX_MODEL_PATH")
+    if not env_path:
+        model = get_seg_model()
+        if model is not None and not _BOX_FALLBACK_WARNED:
+            from ai.yolo_backend import OnnxYOLO
+            if not isinstance(model, OnnxYOLO):
+                logger.warning(
+                    "plates_first without YOLO_VEHICLE_BOX_MODEL_PATH reuses the segmentation model; "
+                    "Ultralytics still computes its masks, so vehicle detection is not cheaper"
+                )
+            _BOX_FALLBACK_WARNED = True
+        return model
+
+    try:
+        p = Path(env_path)
+        if not p.is_absolute():
+            p = Path(__file__).resolve().parents[1] / env_path
+        if not p.exists():
+            _BOX_MODEL_ERROR = f"YOLO_VEHICLE_BOX_MODEL_PATH set but file not found: {env_path}"
+            logger.error(_BOX_MODEL_ERROR)
+            return None
+
+        from ai.yolo_backend import load_model
+        _BOX_MODEL = load_model(p, "YOLO_VEHICLE_BOX_ONNX_PATH")
+        logger.info(f"Vehicle box model loaded from: {p}")
+        return _BOX_MODEL
+
+    except Exception as e:
+        _BOX_MODEL_ERROR = f"Failed to load vehicle box model: {str(e)}"
+        logger.error(_BOX_MODEL_ERROR)
+        return None
+
+
+def get_vehicle_box_model_error() -> str:
+    """Get the last vehicle box model loading error message."""
+    return _BOX_MODEL_ERROR
+
+
+def detect_vehicle_boxes(img_bgr, conf=0.4):
+    """
+    Box-only vehicle detection (no masks, no crops).
+    Returns: list of (bbox_xyxy, conf, vehicle_type); empty if no model.
+    Detections of non-vehicle classes (persons etc. in COCO models) are dropped.
+    """
+    model = get_vehicle_box_model()
+    if model is None:
+        logger.warning("Vehicle detection skipped: model not available")
+        return []
+
+    try:
+        from ai.yolo_backend import predict
+        h, w = img_bgr.shape[:2]
+        dets = predict(model, img_bgr, conf=conf, masks=False)[0]
+        class_names = getattr(model, 'names', {}) or {}
+        vehicle_ids = {
+            int(i) for i, name in class_names.items()
+            if any(k in str(name).lower() for k in VEHICLE_CLASS_KEYWORDS)
         }
-    
-    if r.masks is None:
-        boxes = r.boxes
-        if boxes is None:
-            return out
-=======
+        out = []
+        for xyxy, conf_val, cls_id in zip(dets.boxes, dets.confs, dets.classes):
+            if vehicle_ids and int(cls_id) not in vehicle_ids:
+                continue
+            x1, y1, x2, y2 = map(int, xyxy[:4])
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w, x2), min(h, y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            out.append(([x1, y1, x2, y2], float(conf_val), _get_vehicle_type(cls_id, class_names)))
+        return out
+
+    except Exception as e:
+        logger.error(f"Vehicle detection failed: {str(e)}")
+        return []
+
+
+def mask_roi(mask, bbox, image_shape):
+    """
+    Binary uint8 mask of one vehicle, upsampled only inside its bbox.
+
+    mask covers the whole image at any resolution (mh, mw); the result equals
+    cv2.resize(mask, (w, h))[y1:y2, x1:x2] > 0.5 (bilinear, pixel centers
+    aligned) without allocating full-frame arrays, except for pixels whose
+    interpolated value is 0.5 up to rounding (see test_mask_roi.py).
+    """
+    x1, y1, x2, y2 = bbox
+    h, w = image_shape[:2]
+    mh, mw = mask.shape[:2]
+    sx, sy = mw / w, mh / h
+    # Destination pixel (x, y) of the ROI samples the mask at the same point
+    # as pixel (x1 + x, y1 + y) of a full-frame resize
+    m = np.array([
+        [sx, 0.0, (x1 + 0.5) * sx - 0.5],
+        [0.0, sy, (y1 + 0.5) * sy - 0.5],
+    ])
+    roi = cv2.warpAffine(
+        np.ascontiguousarray(mask, dtype=np.float32), m, (x2 - x1, y2 - y1),
+        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE,
+    )
+    return (roi > 0.5).astype(np.uint8)
+
+
+def _segmentation_metrics(mask_area, bbox):
+    x1, y1, x2, y2 = bbox
+    bbox_area = (x2 - x1) * (y2 - y1)
+    coverage_ratio = mask_area / bbox_area if bbox_area > 0 else 0.0
+
+    if coverage_ratio >= 0.85:
+        quality = "high"
+    elif coverage_ratio >= 0.65:
+        quality = "medium"
+    else:
+        quality = "low"
+
+    return {
+        "mask_area": mask_area,
+        "bbox_area": bbox_area,
+        "coverage_ratio": round(float(coverage_ratio), 4),
+        "quality": quality
+    }
+
+
+def segment_vehicles(img_bgr, conf=0.4):
+    """
     Run YOLOv8-Seg on image.
     Returns: list of (crop_bgr, mask, bbox_xyxy, conf, vehicle_type, seg_metrics)
+    crop_bgr is the bbox crop with background outside the mask zeroed; mask is
+    the bbox-local binary mask (same size as the crop), or None without masks.
     Returns empty list if model not available (graceful degradation).
     """
     model = get_seg_model()
@@ -244,140 +263,38 @@ def segment_vehicles(img_bgr, conf=0.4):
         return []
     
     try:
+        from ai.yolo_backend import predict
         h, w = img_bgr.shape[:2]
-        results = model.predict(source=img_bgr, device="cpu", conf=conf, verbose=False)
+        dets = predict(model, img_bgr, conf=conf)[0]
         out = []
         
-        if not results:
-            return out
-        
-        r = results[0]
         class_names = getattr(model, 'names', {})
+        masks = dets.masks if dets.masks is not None else []
         
-        def _get_vehicle_type(box, class_names):
-            if hasattr(box, 'cls') and box.cls is not None:
-                cls_id = int(box.cls[0].cpu().numpy())
-                class_name = class_names.get(cls_id, "").lower()
-                if "car" in class_name or "sedan" in class_name:
-                    return "car"
-                elif "pickup" in class_name or "pick-up" in class_name:
-                    return "pickup"
-                elif "truck" in class_name:
-                    return "truck"
-            return "vehicle"
-        
-        def _calculate_segmentation_metrics(mask_binary, bbox):
-            x1, y1, x2, y2 = bbox
-            bbox_area = (x2 - x1) * (y2 - y1)
-            
-            if mask_binary is not None:
-                mask_roi = mask_binary[y1:y2, x1:x2]
-                mask_area = int(np.sum(mask_roi > 0))
-            else:
-                mask_area = 0
-            
-            coverage_ratio = mask_area / bbox_area if bbox_area > 0 else 0.0
-            
-            if coverage_ratio >= 0.85:
-                quality = "high"
-            elif coverage_ratio >= 0.65:
-                quality = "medium"
-            else:
-                quality = "low"
-            
-            return {
-                "mask_area": mask_area,
-                "bbox_area": bbox_area,
-                "coverage_ratio": round(float(coverage_ratio), 4),
-                "quality": quality
-            }
-        
-        if r.masks is None:
-            boxes = r.boxes
-            if boxes is None:
-                return out
-            for i, box in enumerate(boxes):
-                xyxy = box.xyxy[0].cpu().numpy()
-                x1, y1, x2, y2 = map(int, xyxy[:4])
-                x1, y1 = max(0, x1), max(0, y1)
-                x2, y2 = min(w, x2), min(h, y2)
-                crop = img_bgr[y1:y2, x1:x2].copy()
-                if crop.size == 0:
-                    continue
-                vehicle_type = _get_vehicle_type(box, class_names)
-                seg_metrics = _calculate_segmentation_metrics(None, [x1, y1, x2, y2])
-                out.append((crop, None, [x1, y1, x2, y2], float(box.conf[0]), vehicle_type, seg_metrics))
-            return out
-        
-        masks = r.masks
-        boxes = r.boxes
-        if boxes is None:
-            return out
-        
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
-        for i, box in enumerate(boxes):
-            xyxy = box.xyxy[0].cpu().numpy()
+        for i, (xyxy, conf_val, cls_id) in enumerate(zip(dets.boxes, dets.confs, dets.classes)):
             x1, y1, x2, y2 = map(int, xyxy[:4])
             x1, y1 = max(0, x1), max(0, y1)
             x2, y2 = min(w, x2), min(h, y2)
-<<<<<<< HEAD
-            crop = img_bgr[y1:y2, x1:x2].copy()
-            if crop.size == 0:
+            if x2 <= x1 or y2 <= y1:
                 continue
-            vehicle_type = _get_vehicle_type(box, class_names)
-            seg_metrics = _calculate_segmentation_metrics(None, [x1, y1, x2, y2])
-            out.append((crop, None, [x1, y1, x2, y2], float(box.conf[0]), vehicle_type, seg_metrics))
-        return out
-    masks = r.masks
-    boxes = r.boxes
-    if boxes is None:
-        return out
-    for i, box in enumerate(boxes):
-        xyxy = box.xyxy[0].cpu().numpy()
-        x1, y1, x2, y2 = map(int, xyxy[:4])
-        x1, y1 = max(0, x1), max(0, y1)
-        x2, y2 = min(w, x2), min(h, y2)
-        mask_binary = None
-        if i < len(masks.data):
-            mask_data = masks.data[i].cpu().numpy()
-            mask_img = cv2.resize(
-                mask_data, (w, h), interpolation=cv2.INTER_LINEAR
-            )
-            mask_binary = (mask_img > 0.5).astype(np.uint8)
-            masked = cv2.bitwise_and(img_bgr, img_bgr, mask=mask_binary)
-            crop = masked[y1:y2, x1:x2].copy()
-        else:
-            crop = img_bgr[y1:y2, x1:x2].copy()
-        if crop.size == 0:
-            continue
-        conf_val = float(box.conf[0])
-        vehicle_type = _get_vehicle_type(box, class_names)
-        seg_metrics = _calculate_segmentation_metrics(mask_binary, [x1, y1, x2, y2])
-        out.append((crop, mask_binary, [x1, y1, x2, y2], conf_val, vehicle_type, seg_metrics))
-    return out
-=======
-            mask_binary = None
+            bbox = [x1, y1, x2, y2]
+            roi = img_bgr[y1:y2, x1:x2]
             
-            if i < len(masks.data):
-                mask_data = masks.data[i].cpu().numpy()
-                mask_img = cv2.resize(mask_data, (w, h), interpolation=cv2.INTER_LINEAR)
-                mask_binary = (mask_img > 0.5).astype(np.uint8)
-                masked = cv2.bitwise_and(img_bgr, img_bgr, mask=mask_binary)
-                crop = masked[y1:y2, x1:x2].copy()
+            if i < len(masks):
+                mask_binary = mask_roi(masks[i], bbox, img_bgr.shape)
+                crop = cv2.bitwise_and(roi, roi, mask=mask_binary)
+                mask_area = int(cv2.countNonZero(mask_binary))
             else:
-                crop = img_bgr[y1:y2, x1:x2].copy()
-            
-            if crop.size == 0:
-                continue
+                mask_binary = None
+                crop = roi.copy()
+                mask_area = 0
             
-            conf_val = float(box.conf[0])
-            vehicle_type = _get_vehicle_type(box, class_names)
-            seg_metrics = _calculate_segmentation_metrics(mask_binary, [x1, y1, x2, y2])
-            out.append((crop, mask_binary, [x1, y1, x2, y2], conf_val, vehicle_type, seg_metrics))
+            vehicle_type = _get_vehicle_type(cls_id, class_names)
+            seg_metrics = _segmentation_metrics(mask_area, bbox)
+            out.append((crop, mask_binary, bbox, float(conf_val), vehicle_type, seg_metrics))
         
         return out
         
     except Exception as e:
         logger.error(f"Vehicle segmentation failed: {str(e)}")
         return []
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
@@ -0,0 +1,374 @@
+"""
+Yemen LPR - Pipeline Metrics
+Per-request stage timings (StageTimer, returned as processing_metadata) and
+process-level counters, gauges and histograms aggregating them over all
+requests. Collectors add the statistics other modules keep (OCR cache, pool
+and readers, Tesseract digit engine, models). render() produces the
+Prometheus text format served at /api/v1/metrics/. Everything is in-process and thread-safe; nothing is sent
+to an external service.
+
+Each gunicorn worker keeps its own registry: a scrape reports the worker
+that served it (its pid is in lpr_process_info).
+"""
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers one OCR pass up to a full video frame
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 12, 16, 32)
+
+_registry = {}
+_collectors = []
+_registry_lock = threading.Lock()
+
+
+def _label_key(label_names, labels):
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text="", labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        """[(labels dict, value)] per label set."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(dict(zip(self.labels, key)), value) for key, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. requests in flight)."""
+
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text="", buckets=TIME_BUCKETS, labels=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labels, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self):
+        """[(labels dict, cumulative bucket counts, sum, count)] per label set."""
+        with self._lock:
+            series = [(key, list(s["counts"]), s["sum"], s["count"]) for key, s in self._series.items()]
+        out = []
+        for key, counts, total, count in sorted(series):
+            cumulative, running = [], 0
+            for c in counts[:-1]:
+                running += c
+                cumulative.append(running)
+            out.append((dict(zip(self.labels, key)), cumulative, total, count))
+        return out
+
+
+def _get_or_create(name, factory):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = factory()
+        return metric
+
+
+def counter(name, help_text="", labels=()):
+    """Process-wide counter name, created on first use."""
+    return _get_or_create(name, lambda: Counter(name, help_text, labels))
+
+
+def gauge(name, help_text="", labels=()):
+    """Process-wide gauge name, created on first use."""
+    return _get_or_create(name, lambda: Gauge(name, help_text, labels))
+
+
+def histogram(name, help_text="", buckets=TIME_BUCKETS, labels=()):
+    """Process-wide histogram name, created on first use."""
+    return _get_or_create(name, lambda: Histogram(name, help_text, buckets, labels))
+
+
+def registry():
+    with _registry_lock:
+        return dict(_registry)
+
+
+def register_collector(collect):
+    """
+    Add a function called at every render(). It returns metric families
+    (name, kind, help, [(labels dict, value)]) read from state kept elsewhere,
+    e.g. cache or pool statistics.
+    """
+    with _registry_lock:
+        _collectors.append(collect)
+
+
+STAGE_SECONDS = histogram(
+    "lpr_pipeline_stage_seconds", "Time spent per pipeline stage", TIME_BUCKETS, ("pipeline", "stage")
+)
+REQUEST_SECONDS = histogram(
+    "lpr_pipeline_seconds", "Total pipeline time per image or video", TIME_BUCKETS, ("pipeline",)
+)
+PER_REQUEST_COUNTS = histogram(
+    "lpr_pipeline_items", "Vehicles, plates and OCR passes per image or video", COUNT_BUCKETS, ("pipeline", "item")
+)
+OCR_PASSES = histogram(
+    "lpr_ocr_passes_per_plate", "OCR passes run per plate and target", COUNT_BUCKETS, ("target",)
+)
+
+
+class StageTimer:
+    """
+    Monotonic timers and counters for one pipeline run.
+
+        timer = StageTimer("image")
+        with timer.stage("detect_plates"):
+            ...
+        timer.count("plates", len(plates))
+        metadata = timer.finish()
+    """
+
+    def __init__(self, pipeline="image"):
+        self.pipeline = pipeline
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, calls = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, calls + 1)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def ocr_passes(self, target, decision, cache_hit=False):
+        """Record the OCR passes run for one plate (an ocr_policy decision)."""
+        if cache_hit:
+            self.count(f"ocr_{target}_cache_hits")
+            passes = 0
+        else:
+            passes = (decision or {}).get("passes_run", 0)
+        self.count(f"ocr_{target}_passes", passes)
+        OCR_PASSES.observe(passes, target=target)
+
+    def finish(self):
+        """Aggregate into the process histograms; returns processing_metadata."""
+        total = time.perf_counter() - self.started
+        with self._lock:
+            stages = dict(self.stages)
+            counts = dict(self.counts)
+        REQUEST_SECONDS.observe(total, pipeline=self.pipeline)
+        for name, (seconds, _calls) in stages.items():
+            STAGE_SECONDS.observe(seconds, pipeline=self.pipeline, stage=name)
+        for name, n in counts.items():
+            PER_REQUEST_COUNTS.observe(n, pipeline=self.pipeline, item=name)
+        return {
+            "total_ms": round(1000 * total, 2),
+            "stages": {
+                name: {"ms": round(1000 * seconds, 2), "calls": calls}
+                for name, (seconds, calls) in stages.items()
+            },
+            "counts": counts,
+        }
+
+
+def _escape(value, quotes=True):
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value):
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() else repr(value)
+
+
+def _families():
+    """(name, kind, help, samples) for every metric; histogram samples are snapshot() rows."""
+    with _registry_lock:
+        metrics, collectors = list(_registry.values()), list(_collectors)
+    for metric in metrics:
+        yield metric.name, metric.kind, metric.help, metric
+    for collect in collectors:
+        try:
+            for name, kind, help_text, samples in collect():
+                yield name, kind, help_text, samples
+        except Exception as e:
+            logger.warning(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+
+
+def render():
+    """All metrics of this process in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, kind, help_text, source in _families():
+        lines.append(f"# HELP {name} {_escape(help_text, quotes=False)}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for labels, cumulative, total, count in source.snapshot():
+                for bound, n in zip(source.buckets, cumulative):
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {n}")
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            continue
+        samples = source.snapshot() if hasattr(source, "snapshot") else source
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _collect_process():
+    yield "lpr_process_info", "gauge", "Process serving this scrape", [({"pid": os.getpid()}, 1)]
+    try:
+        import psutil
+
+        proc = psutil.Process()
+        yield "lpr_process_resident_memory_bytes", "gauge", "Resident set size", [({}, proc.memory_info().rss)]
+        yield "lpr_process_cpu_seconds_total", "counter", "User and system CPU time", [
+            ({}, sum(proc.cpu_times()[:2]))
+        ]
+        yield "lpr_process_threads", "gauge", "OS threads", [({}, proc.num_threads())]
+    except ImportError:
+        pass
+
+
+def _collect_ocr():
+    from ai import ocr_cache, ocr_pool
+
+    cache = ocr_cache.get_stats()
+    yield "lpr_ocr_cache_hits_total", "counter", "OCR cache hits", [({}, cache["hits"])]
+    yield "lpr_ocr_cache_misses_total", "counter", "OCR cache misses", [({}, cache["misses"])]
+    yield "lpr_ocr_cache_hit_ratio", "gauge", "OCR cache hits / lookups", [({}, cache["hit_rate"])]
+    yield "lpr_ocr_cache_entries", "gauge", "Entries in the OCR cache", [({}, cache["size"])]
+    yield "lpr_ocr_cache_evictions_total", "counter", "OCR cache evictions", [({}, cache["evictions"])]
+
+    pool = ocr_pool.get_stats()
+    if pool.get("started"):
+        yield "lpr_ocr_pool_in_flight", "gauge", "OCR batches queued or running in the pool", [
+            ({}, pool["in_flight"])
+        ]
+        yield "lpr_ocr_pool_queue_capacity", "gauge", "OCR_POOL_QUEUE_DEPTH", [({}, pool["queue_depth"])]
+        for field in ("submitted", "completed", "failed", "rejected", "restarts"):
+            yield f"lpr_ocr_pool_{field}_total", "counter", f"OCR pool batches {field}", [({}, pool[field])]
+
+
+def _collect_ocr_engines():
+    from ai import ocr_engine
+
+    stats = ocr_engine.get_stats()
+    load, rss = [], []
+    for engine in stats["engines"]:
+        labels = {
+            "langs": "+".join(engine["langs"]),
+            "options": ",".join(f"{k}={v}" for k, v in sorted(engine["options"].items())),
+            "backend": engine["backend"],
+            "precision": engine["precision"],
+        }
+        load.append((labels, engine["load_seconds"]))
+        if engine["rss_delta_bytes"] is not None:
+            rss.append((labels, engine["rss_delta_bytes"]))
+    yield "lpr_ocr_reader_load_seconds", "gauge", "EasyOCR reader load time in this process", load
+    yield "lpr_ocr_reader_rss_delta_bytes", "gauge", "RSS growth while loading the EasyOCR reader", rss
+    yield "lpr_ocr_engine_calls_total", "counter", "EasyOCR recognize/detect calls made in this process", [
+        ({"call": name.removesuffix("_calls")}, n) for name, n in sorted(stats["calls"].items())
+    ]
+
+
+def _collect_digit_engine():
+    from ai import digit_engines
+
+    stats = digit_engines.get_stats()
+    if stats["engine"] is None:
+        return
+    labels = {"engine": stats["engine"]}
+    yield "lpr_digit_engine_calls_total", "counter", "Tesseract governorate digit reads", [(labels, stats["calls"])]
+    yield "lpr_digit_engine_errors_total", "counter", "Tesseract digit reads that failed", [(labels, stats["errors"])]
+    yield "lpr_digit_engine_seconds_total", "counter", "Time spent in Tesseract digit reads", [
+        (labels, stats["total_seconds"])
+    ]
+
+
+def _collect_models():
+    from ai import warmup
+
+    status = warmup.status()
+    load, warm, ready = [], [], []
+    for name, info in status["models"].items():
+        labels = {"model": name}
+        if info.get("load_seconds") is not None:
+            load.append((labels, info["load_seconds"]))
+        if info.get("warmup_ms") is not None:
+            warm.append((labels, info["warmup_ms"] / 1000))
+        ready.append((labels, 1 if info.get("state") == "ready" else 0))
+    yield "lpr_model_load_seconds", "gauge", "Model load time", load
+    yield "lpr_model_warmup_seconds", "gauge", "First (warmup) inference time", warm
+    yield "lpr_model_ready", "gauge", "1 once the model is loaded and warmed up", ready
+    yield "lpr_ready", "gauge", "1 once this worker is ready to serve", [({}, 1 if status["ready"] else 0)]
+
+
+for _collect in (
+    _collect_process, _collect_ocr, _collect_ocr_engines, _collect_digit_engine, _collect_models
+):
+    register_collector(_collect)
@@ -5,17 +5,12 @@ Uses EasyOCR with Arabic and English support
 
 import re
 import cv2
-import easyocr
 
-# Initialize reader (lazy loading)
-_reader = None
+from ai import ocr_engine
 
-def get_reader():
-    """Get or create EasyOCR reader (singleton)"""
-    global _reader
-    if _reader is None:
-        _reader = easyocr.Reader(['ar', 'en'], gpu=False)
-    return _reader
+def get_reader(lang=ocr_engine.DEFAULT_LANGS):
+    """Get the shared EasyOCR reader (see ai.ocr_engine)"""
+    return ocr_engine.get_reader(tuple(lang))
 
 # Arabic-Indic digits mapping
 ARABIC_DIGITS = {
@@ -65,7 +60,7 @@ def read_text(image, lang=['ar', 'en']):
     if image is None or image.size == 0:
         return "", 0.0
     
-    reader = get_reader()
+    reader = get_reader(lang)
     
     # Convert to RGB for EasyOCR
     if len(image.shape) == 2:
@@ -0,0 +1,122 @@
+"""
+Yemen LPR - OCR Result Cache
+Bounded LRU cache (with TTL) of OCR results, keyed by a perceptual hash of the
+normalized grayscale plate crop plus a coarse size bucket. Consecutive video
+frames, repeated uploads and overlapping vehicle crops of the same plate then
+skip the OCR networks entirely.
+
+Settings: OCR_CACHE (true/false), OCR_CACHE_SIZE (entries), OCR_CACHE_TTL
+(seconds), OCR_CACHE_HASH_SIZE (difference-hash grid, bits = size * size).
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+ENABLED = os.getenv("OCR_CACHE", "true").lower() == "true"
+MAX_ENTRIES = int(os.getenv("OCR_CACHE_SIZE", "2048"))
+TTL_SECONDS = float(os.getenv("OCR_CACHE_TTL", "300"))
+HASH_SIZE = int(os.getenv("OCR_CACHE_HASH_SIZE", "16"))
+SIZE_BUCKET = 16  # pixels
+
+
+def dhash(gray, hash_size=HASH_SIZE):
+    """Difference hash of a grayscale image as a hex string (hash_size**2 bits)."""
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits).tobytes().hex()
+
+
+def make_key(gray, *parts):
+    """
+    Cache key for a grayscale crop: dHash + size bucket + extra parts
+    (target, region name, policy...) so that different OCR settings never share entries.
+    """
+    if gray is None or gray.size == 0:
+        return None
+    h, w = gray.shape[:2]
+    extra = hashlib.sha1(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{dhash(gray)}:{h // SIZE_BUCKET}x{w // SIZE_BUCKET}:{extra}"
+
+
+class OCRCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key):
+        """Copy of the cached value, or None."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        if key is None or self.max_entries <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": ENABLED,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+_cache = OCRCache()
+
+
+def get_cache():
+    """Process-wide OCR cache, or None when OCR_CACHE=false."""
+    return _cache if ENABLED else None
+
+
+def get_stats():
+    return _cache.stats()
@@ -0,0 +1,374 @@
+"""
+Yemen LPR - Shared OCR Engine Registry
+One EasyOCR reader per (languages, options) key for the whole process,
+shared by ai.pipeline, ai.ocr and ai.gov_detect (thread-safe lazy loading).
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGS = ("ar", "en")
+
+# Recognize-only mode: regions are already localized (YOLO + fixed crops), so
+# CRAFT detection is skipped unless the recognizer is not confident enough.
+RECOGNIZE_ONLY = os.getenv("OCR_RECOGNIZE_ONLY", "true").lower() == "true"
+RECOGNIZE_FALLBACK_CONF = float(os.getenv("OCR_RECOGNIZE_FALLBACK_CONF", "0.4"))
+
+# Network backend: "torch" (EasyOCR as shipped) or "onnx" (ONNX Runtime sessions
+# exported by scripts/export_ocr_onnx.py, see ai.ocr_onnx). A relative
+# OCR_ONNX_DIR is relative to the repository root.
+BACKEND = os.getenv("OCR_BACKEND", "torch").lower()
+ONNX_DIR = os.getenv("OCR_ONNX_DIR", "")
+ONNX_THREADS = int(os.getenv("OCR_ONNX_THREADS", "0"))
+
+# Recognizer precision: "default" (EasyOCR's own load-time quantization),
+# "int8" (LSTM/Linear int8, cached to disk by ai.ocr_quant) or "float"
+PRECISION = os.getenv("OCR_PRECISION", "default").lower()
+
+# Both digit scripts; plate numbers and governorate codes use nothing else
+DIGIT_ALLOWLIST = "0123456789٠١٢٣٤٥٦٧٨٩"
+
+# OCR profile used by the pipeline:
+# - full: ['ar', 'en'] reader, full character set, CRAFT loaded for fallback
+# - digits: Arabic recognizer only (it covers both digit scripts), decoding
+#   restricted to DIGIT_ALLOWLIST, no CRAFT detector (recognize-only, no fallback)
+PROFILE = os.getenv("OCR_PROFILE", "full").lower()
+PROFILES = {
+    "full": {"langs": DEFAULT_LANGS, "options": {}, "allowlist": None},
+    "digits": {"langs": ("ar",), "options": {"detector": False}, "allowlist": DIGIT_ALLOWLIST},
+}
+
+# Loaded readers and their load statistics, keyed by _engine_key()
+_READERS = {}
+_STATS = {}
+_LOAD_LOCK = threading.Lock()
+
+# Default allowlist of readers created through get_profile_reader(), by id()
+_ALLOWLISTS = {}
+
+_COUNTERS = {"recognize_calls": 0, "detect_calls": 0, "detect_fallbacks": 0}
+_COUNTER_LOCK = threading.Lock()
+
+
+def _count(name, n=1):
+    with _COUNTER_LOCK:
+        _COUNTERS[name] += n
+
+
+def _rss_bytes():
+    """Current process RSS in bytes, or None when psutil is unavailable."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def _engine_key(langs, options):
+    return (tuple(langs), tuple(sorted(options.items())))
+
+
+def _install_backend(reader, langs):
+    """
+    Swap ONNX Runtime sessions into reader if OCR_BACKEND=onnx.
+    Returns the backend in use and the names of the swapped networks.
+    """
+    if BACKEND != "onnx":
+        return "torch", []
+    try:
+        from ai import ocr_onnx
+
+        onnx_dir = Path(ONNX_DIR) if ONNX_DIR else ocr_onnx.DEFAULT_ONNX_DIR
+        if not onnx_dir.is_absolute():
+            onnx_dir = Path(__file__).resolve().parents[1] / onnx_dir
+        swapped = ocr_onnx.install(reader, langs, onnx_dir=onnx_dir, intra_op_threads=ONNX_THREADS)
+    except Exception as e:
+        logger.error(f"ONNX backend unavailable, using PyTorch: {e}")
+        return "torch", []
+    return (f"onnx ({', '.join(swapped)})" if swapped else "torch"), swapped
+
+
+def _load_reader(key, langs, options, precision):
+    import easyocr
+
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    reader_options = dict(options)
+    if precision in ("int8", "float"):
+        reader_options["quantize"] = False
+    reader = easyocr.Reader(list(langs), **reader_options)
+    backend, swapped = _install_backend(reader, langs)
+    # int8 applies to the PyTorch recognizer, also when only the detector runs on ONNX
+    if precision == "int8" and "recognizer" not in swapped:
+        from ai import ocr_quant
+
+        precision = f"int8 ({ocr_quant.quantize_recognizer(reader, langs)})"
+    load_seconds = time.perf_counter() - started
+    rss_after = _rss_bytes()
+
+    _READERS[key] = reader
+    _STATS[key] = {
+        "langs": list(langs),
+        "options": dict(options),
+        "load_seconds": round(load_seconds, 3),
+        "rss_delta_bytes": (
+            rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        ),
+        "loaded_at": time.time(),
+        "backend": backend,
+        "precision": precision,
+    }
+    logger.info(f"EasyOCR reader {list(langs)} loaded in {load_seconds:.2f}s ({backend})")
+    return reader
+
+
+def get_reader(langs=DEFAULT_LANGS, precision=None, **options):
+    """
+    Get or create the shared EasyOCR reader for (langs, precision, options).
+    Readers default to gpu=False and OCR_PRECISION; construction happens at
+    most once per key, even with several request threads asking concurrently.
+    """
+    options.setdefault("gpu", False)
+    precision = precision or PRECISION
+    key = _engine_key(langs, dict(options, precision=precision))
+    reader = _READERS.get(key)
+    if reader is not None:
+        return reader
+    with _LOAD_LOCK:
+        reader = _READERS.get(key)
+        if reader is None:
+            reader = _load_reader(key, langs, options, precision)
+    return reader
+
+
+def get_profile_reader(profile=None):
+    """Shared reader for an OCR profile (default OCR_PROFILE, see PROFILES)."""
+    spec = PROFILES.get(profile or PROFILE, PROFILES["full"])
+    reader = get_reader(spec["langs"], **spec["options"])
+    _ALLOWLISTS[id(reader)] = spec["allowlist"]
+    return reader
+
+
+def _allowlist(reader, allowlist):
+    return allowlist if allowlist is not None else _ALLOWLISTS.get(id(reader))
+
+
+def _has_detector(reader):
+    # Readers built with detector=False have no CRAFT model to fall back to
+    return getattr(reader, "detector", None) is not None
+
+
+def loaded_readers():
+    """All readers loaded in this process (never loads)."""
+    return list(_READERS.values())
+
+
+def is_loaded(langs=DEFAULT_LANGS, precision=None, **options):
+    """Check whether a reader is already loaded without loading it."""
+    options.setdefault("gpu", False)
+    return _engine_key(langs, dict(options, precision=precision or PRECISION)) in _READERS
+
+
+def readtext(image, reader=None, **kwargs):
+    """Full EasyOCR pass (CRAFT text detection + recognition)."""
+    if reader is None:
+        reader = get_reader()
+    _count("detect_calls")
+    return reader.readtext(image, detail=1, paragraph=False, **kwargs)
+
+
+def recognize(image, reader=None, allowlist=None, fallback_conf=None):
+    """
+    Recognize-only OCR for an already-localized region.
+
+    The whole image is fed to the recognition network as a single text box,
+    skipping CRAFT detection. If nothing is read, or the best confidence is
+    below fallback_conf (default OCR_RECOGNIZE_FALLBACK_CONF), a full
+    readtext() pass is run instead. Pass fallback_conf=0 to disable fallback.
+
+    Args:
+        image: Grayscale (preferred) or BGR image of the region
+        reader: EasyOCR reader (default: shared ['ar', 'en'] reader)
+        allowlist: Optional string of allowed characters
+
+    Returns:
+        [(box, text, conf)] in the same format as reader.readtext()
+    """
+    if image is None or image.size == 0:
+        return []
+    if reader is None:
+        reader = get_reader()
+    if fallback_conf is None:
+        fallback_conf = RECOGNIZE_FALLBACK_CONF
+    allowlist = _allowlist(reader, allowlist)
+
+    _count("recognize_calls")
+    results = reader.recognize(image, allowlist=allowlist, detail=1, paragraph=False)
+    best = max((float(conf) for _box, text, conf in results if text and text.strip()), default=0.0)
+    if best >= fallback_conf or not _has_detector(reader):
+        return results
+
+    _count("detect_fallbacks")
+    return readtext(image, reader=reader, allowlist=allowlist)
+
+
+def _ignore_char(reader, allowlist):
+    # Same rule as easyocr.Reader.recognize()
+    if allowlist:
+        return "".join(set(reader.character) - set(allowlist))
+    return "".join(set(reader.character) - set(reader.lang_char))
+
+
+def _padded_width_key(img):
+    # Recognizer input width is ceil(aspect ratio) * imgH, with the ratio
+    # inverted for tall images (easyocr.utils.calculate_ratio)
+    h, w = img.shape[:2]
+    ratio = w / h
+    if ratio < 1.0:
+        ratio = 1.0 / ratio
+    return max(int(np.ceil(ratio)), 1)
+
+
+def _recognize_group(reader, images, allowlist):
+    """
+    Run the EasyOCR recognizer once over a list of grayscale images.
+    Mirrors Reader.recognize() for a single full-image box per image, but
+    hands every image to get_text() as one batch instead of one at a time.
+    """
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list
+
+    model_height = 64  # easyocr.config.imgH
+    image_list = []
+    max_width = 0
+    for img in images:
+        h, w = img.shape[:2]
+        items, width = get_image_list([[0, w, 0, h]], [], img, model_height=model_height)
+        image_list.extend(items)
+        max_width = max(max_width, width)
+
+    results = get_text(
+        reader.character, model_height, int(max_width), reader.recognizer, reader.converter,
+        image_list, _ignore_char(reader, allowlist), "greedy", 5, len(image_list),
+        0.1, 0.5, 0.003, 0, reader.device,
+    )
+    if getattr(reader, "model_lang", None) == "arabic":
+        from bidi.algorithm import get_display
+        results = [(box, get_display(text), conf) for box, text, conf in results]
+    return [[tuple(r)] for r in results]
+
+
+def recognize_batch(images, reader=None, allowlist=None, fallback_conf=None):
+    """
+    Batched recognize-only OCR for several already-localized regions.
+
+    Images sharing the same padded recognizer width (e.g. all preprocessing
+    variants of one region) go through the recognition network in a single
+    forward pass; mixing widths in one batch would pad the narrower images
+    and change their reads, so each distinct width gets its own batch.
+    Per-image fallback to full readtext() follows the same rule as recognize().
+
+    Returns:
+        List with one [(box, text, conf)] list per input image, in input order
+    """
+    if reader is None:
+        reader = get_reader()
+    if fallback_conf is None:
+        fallback_conf = RECOGNIZE_FALLBACK_CONF
+    allowlist = _allowlist(reader, allowlist)
+
+    grays = []
+    for img in images:
+        if img is not None and img.size > 0 and img.ndim == 3:
+            import cv2
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        grays.append(img)
+
+    out = [[] for _ in grays]
+    groups = {}
+    for i, img in enumerate(grays):
+        if img is None or img.size == 0:
+            continue
+        groups.setdefault(_padded_width_key(img), []).append(i)
+
+    for indices in groups.values():
+        _count("recognize_calls", len(indices))
+        try:
+            group_results = _recognize_group(reader, [grays[i] for i in indices], allowlist)
+        except Exception as e:
+            # Internal EasyOCR API mismatch: recognize one by one instead
+            logger.warning(f"Batched recognition unavailable, falling back: {e}")
+            group_results = [
+                reader.recognize(grays[i], allowlist=allowlist, detail=1, paragraph=False)
+                for i in indices
+            ]
+        for i, results in zip(indices, group_results):
+            out[i] = results
+
+    if not _has_detector(reader):
+        return out
+    for i, results in enumerate(out):
+        if grays[i] is None or grays[i].size == 0:
+            continue
+        best = max((float(conf) for _box, text, conf in results if text and text.strip()), default=0.0)
+        if best < fallback_conf:
+            _count("detect_fallbacks")
+            out[i] = readtext(grays[i], reader=reader, allowlist=allowlist)
+    return out
+
+
+def read_region(image, reader=None, allowlist=None):
+    """OCR a localized region using the configured mode (recognize-only or full detection)."""
+    if reader is None:
+        from ai import ocr_pool
+
+        if ocr_pool.enabled():
+            return ocr_pool.get_pool().read_regions([image], allowlist=allowlist)[0]
+        reader = get_profile_reader()
+    if RECOGNIZE_ONLY or not _has_detector(reader):
+        return recognize(image, reader=reader, allowlist=allowlist)
+    return readtext(image, reader=reader, allowlist=allowlist)
+
+
+def read_regions(images, reader=None, allowlist=None):
+    """
+    Batched read_region(): one result list per image, in input order.
+    Without an explicit reader, the OCR profile's reader is used, or the
+    regions are sent to the OCR worker processes when OCR_POOL_WORKERS > 0.
+    """
+    if reader is None:
+        from ai import ocr_pool
+
+        if ocr_pool.enabled():
+            return ocr_pool.get_pool().read_regions(images, allowlist=allowlist)
+        reader = get_profile_reader()
+    if RECOGNIZE_ONLY or not _has_detector(reader):
+        return recognize_batch(images, reader=reader, allowlist=allowlist)
+    return [
+        readtext(img, reader=reader, allowlist=_allowlist(reader, allowlist))
+        if img is not None and img.size > 0 else []
+        for img in images
+    ]
+
+
+def get_stats():
+    """Load time and memory statistics for all loaded readers, plus call counters."""
+    from ai import ocr_pool
+
+    with _COUNTER_LOCK:
+        counters = dict(_COUNTERS)
+    return {
+        "pool": ocr_pool.get_stats(),
+        "engines": [dict(s) for s in _STATS.values()],
+        "rss_bytes": _rss_bytes(),
+        "recognize_only": RECOGNIZE_ONLY,
+        "profile": PROFILE,
+        "backend": BACKEND,
+        "calls": counters,
+    }
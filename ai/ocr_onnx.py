@@ -0,0 +1,173 @@
+"""
+Yemen LPR - ONNX Runtime backend for EasyOCR
+Exports the CRAFT text detector and the recognition network of an EasyOCR
+reader to ONNX, and swaps ONNX Runtime sessions into a loaded reader in place
+of the PyTorch modules. The sessions are called exactly like the modules they
+replace, so reader.readtext()/recognize() and ai.ocr_engine's batched path
+return the same (box, text, confidence) tuples.
+
+Export once with scripts/export_ocr_onnx.py; select at runtime with
+OCR_BACKEND=onnx (see ai.ocr_engine).
+"""
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_DIR = Path(__file__).resolve().parent / "models" / "onnx"
+DETECTOR_FILE = "craft.onnx"
+META_FILE = "meta.json"
+OPSET = 17
+
+
+def recognizer_file(langs):
+    return f"recognizer_{'_'.join(langs)}.onnx"
+
+
+def _onnx_export(module, args, path, **kwargs):
+    import inspect
+
+    import torch
+
+    # Newer PyTorch defaults to the dynamo exporter; the TorchScript one
+    # handles EasyOCR's LSTMs and dynamic widths (torch 2.1 has no such flag)
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+    torch.onnx.export(module, args, path, **kwargs)
+
+
+def export(out_dir=DEFAULT_ONNX_DIR, langs=("ar", "en"), model_storage_directory=None):
+    """
+    Export the detector and recognizer of an EasyOCR reader for langs to ONNX.
+
+    The reader is loaded without dynamic quantization (quantized PyTorch
+    modules cannot be exported). Returns the paths written.
+    """
+    import easyocr
+    import torch
+
+    options = {"gpu": False, "quantize": False, "verbose": False}
+    if model_storage_directory:
+        options["model_storage_directory"] = model_storage_directory
+    reader = easyocr.Reader(list(langs), **options)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    recognizer = reader.recognizer
+    recognizer = getattr(recognizer, "module", recognizer)
+    recognizer.eval()
+
+    class MeanPoolWidth(torch.nn.Module):
+        # Same as nn.AdaptiveAvgPool2d((None, 1)), but exports with a dynamic width
+        def forward(self, x):
+            return x.mean(dim=3, keepdim=True)
+
+    if isinstance(getattr(recognizer, "AdaptiveAvgPool", None), torch.nn.AdaptiveAvgPool2d):
+        recognizer.AdaptiveAvgPool = MeanPoolWidth()
+
+    class RecognizerOnly(torch.nn.Module):
+        # The decoder input ("text") is unused by EasyOCR's CTC models
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, image):
+            return self.model(image, None)
+
+    recognizer_path = out_dir / recognizer_file(langs)
+    with torch.no_grad():
+        _onnx_export(
+            RecognizerOnly(recognizer),
+            (torch.zeros(2, 1, 64, 256),),
+            str(recognizer_path),
+            input_names=["image"],
+            output_names=["preds"],
+            dynamic_axes={"image": {0: "batch", 3: "width"}, "preds": {0: "batch", 1: "steps"}},
+            opset_version=OPSET,
+        )
+
+    detector = getattr(reader.detector, "module", reader.detector)
+    detector.eval()
+    detector_path = out_dir / DETECTOR_FILE
+    with torch.no_grad():
+        _onnx_export(
+            detector,
+            (torch.zeros(1, 3, 320, 320),),
+            str(detector_path),
+            input_names=["image"],
+            output_names=["score", "feature"],
+            dynamic_axes={
+                "image": {0: "batch", 2: "height", 3: "width"},
+                "score": {0: "batch", 1: "h2", 2: "w2"},
+                "feature": {0: "batch", 2: "h2", 3: "w2"},
+            },
+            opset_version=OPSET,
+        )
+
+    meta = {
+        "langs": list(langs),
+        "model_lang": reader.model_lang,
+        "easyocr_version": getattr(easyocr, "__version__", None),
+        "recognizer": recognizer_path.name,
+        "detector": detector_path.name,
+    }
+    with open(out_dir / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return [recognizer_path, detector_path]
+
+
+class OnnxModule:
+    """
+    ONNX Runtime session with the call interface of the PyTorch module it
+    replaces: takes and returns torch tensors, eval() is a no-op.
+    """
+
+    def __init__(self, path, intra_op_threads=0, n_inputs=1):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            opts.intra_op_num_threads = int(intra_op_threads)
+        opts.inter_op_num_threads = 1
+        self.path = str(path)
+        self.session = ort.InferenceSession(self.path, opts, providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self.session.get_inputs()][:n_inputs]
+
+    def eval(self):
+        return self
+
+    def __call__(self, *inputs):
+        import torch
+
+        feed = {
+            name: np.ascontiguousarray(x.detach().cpu().numpy(), dtype=np.float32)
+            for name, x in zip(self._input_names, inputs)
+        }
+        outputs = [torch.from_numpy(o) for o in self.session.run(None, feed)]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+def install(reader, langs, onnx_dir=DEFAULT_ONNX_DIR, intra_op_threads=0):
+    """
+    Replace reader.recognizer / reader.detector with ONNX Runtime sessions.
+
+    Each network is swapped only if its exported file exists, so a missing
+    export leaves that network on PyTorch. Returns the names of the swapped networks.
+    """
+    onnx_dir = Path(onnx_dir)
+    swapped = []
+    recognizer_path = onnx_dir / recognizer_file(langs)
+    if recognizer_path.exists():
+        reader.recognizer = OnnxModule(recognizer_path, intra_op_threads)
+        swapped.append("recognizer")
+    detector_path = onnx_dir / DETECTOR_FILE
+    if detector_path.exists() and getattr(reader, "detector", None) is not None:
+        reader.detector = OnnxModule(detector_path, intra_op_threads)
+        swapped.append("detector")
+    if not swapped:
+        logger.warning(f"No ONNX models found in {onnx_dir}; run scripts/export_ocr_onnx.py")
+    return swapped
@@ -0,0 +1,150 @@
+"""
+Yemen LPR - OCR Early-Exit Policy
+Ordered OCR passes per target with confidence-based stop rules, so an easy
+plate costs one OCR pass instead of running every preprocessing variant.
+Defaults live in config/ocr_policy.json.
+
+With "adaptive" enabled, passes are reordered (and passes that rarely win
+when they run are pruned, re-tried every "explore_every" calls) from the win
+statistics collected by ai.variant_stats.
+"""
+import copy
+import json
+import logging
+from pathlib import Path
+
+from ai import variant_stats
+
+logger = logging.getLogger(__name__)
+
+POLICY_PATH = Path(__file__).resolve().parents[1] / "config" / "ocr_policy.json"
+
+# Used when config/ocr_policy.json is missing or incomplete
+DEFAULT_POLICY = {
+    "number": {
+        "passes": ["standard", "clahe", "otsu", "adaptive"],
+        "max_passes": 4,
+        "probe_passes": 1,
+        "stop": {"min_confidence": 0.9, "min_digits": 5, "max_digits": 6},
+        "adaptive": {"enabled": True, "min_runs": 200, "prune_below": 0.01, "explore_every": 50},
+    },
+    "governorate": {
+        "passes": [
+            [ratio, variant]
+            for ratio in (0.22, 0.28, 0.36)
+            for variant in ("resize_clahe", "adaptive_threshold", "bilateral_otsu", "invert")
+        ],
+        "max_passes": 12,
+        "probe_passes": 1,
+        "stop": {"min_confidence": 0.85},
+        "adaptive": {"enabled": True, "min_runs": 500, "prune_below": 0.01, "explore_every": 50},
+    },
+}
+
+_POLICY = None
+
+
+def _load():
+    global _POLICY
+    if _POLICY is None:
+        policy = copy.deepcopy(DEFAULT_POLICY)
+        try:
+            with open(POLICY_PATH, "r", encoding="utf-8") as f:
+                for target, values in json.load(f).items():
+                    policy.setdefault(target, {}).update(values)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Invalid OCR policy config, using defaults: {e}")
+        _POLICY = policy
+    return _POLICY
+
+
+def get_policy(target, overrides=None):
+    """
+    Policy dict for target ("number" or "governorate").
+    overrides: optional dict merged on top (e.g. from a pipeline profile).
+    """
+    policy = copy.deepcopy(_load()[target])
+    if overrides:
+        stop = dict(policy.get("stop", {}))
+        stop.update(overrides.get("stop", {}))
+        policy.update(overrides)
+        policy["stop"] = stop
+    return policy
+
+
+def stop_reached(target, candidates, policy):
+    """
+    True when a candidate satisfies the stop rule for target.
+    candidates: tuples starting with (digits, confidence, ...).
+    """
+    stop = policy.get("stop") or {}
+    min_conf = stop.get("min_confidence")
+    if min_conf is None:
+        return False
+    min_digits = stop.get("min_digits", 1)
+    max_digits = stop.get("max_digits", 1 if target == "governorate" else 99)
+    return any(
+        c[1] >= min_conf and min_digits <= len(c[0]) <= max_digits
+        for c in candidates
+    )
+
+
+def ordered_passes(target, policy):
+    """Passes to run for target: adaptively reordered if enabled, capped at max_passes."""
+    passes = list(policy.get("passes", []))
+    adaptive = policy.get("adaptive") or {}
+    if adaptive.get("enabled"):
+        passes = variant_stats.order_passes(
+            target,
+            passes,
+            min_runs=adaptive.get("min_runs", 200),
+            prune_below=adaptive.get("prune_below", 0.0),
+            explore_every=adaptive.get("explore_every", 0),
+        )
+    return passes[: policy.get("max_passes") or None]
+
+
+def record_winner(decision, winner=None):
+    """Record which pass (if any) produced the selected result of a run_passes() decision."""
+    variant_stats.record(decision["target"], decision["passes"], winner)
+
+
+def run_passes(target, policy, run_stage, candidates):
+    """
+    Run the policy's ordered passes until the stop rule is met.
+
+    The first probe_passes passes run alone; if they do not satisfy the stop
+    rule, the remaining passes (up to max_passes) run together as one batch.
+
+    Args:
+        run_stage: callable(list_of_passes) that appends to candidates
+        candidates: list shared with run_stage
+
+    Returns:
+        Decision dict for debug output
+    """
+    passes = ordered_passes(target, policy)
+    probe = max(int(policy.get("probe_passes", 1)), 0)
+    stages = [passes[:probe], passes[probe:]] if probe else [passes]
+
+    run = []
+    early_exit = False
+    for stage in stages:
+        if not stage:
+            continue
+        run_stage(stage)
+        run.extend(stage)
+        if len(run) < len(passes) and stop_reached(target, candidates, policy):
+            early_exit = True
+            break
+
+    return {
+        "target": target,
+        "passes_run": len(run),
+        "passes_available": len(passes),
+        "early_exit": early_exit,
+        "passes": run,
+        "stop": policy.get("stop"),
+    }
@@ -0,0 +1,203 @@
+"""
+Yemen LPR - OCR Worker Processes
+Runs OCR in N separate worker processes, each holding one reader of the
+configured OCR profile, instead of sharing one in-process reader between all
+request threads (which contend for the GIL and oversubscribe CPU cores).
+
+Request threads submit the preprocessed regions of one plate and wait for
+the reads; at most OCR_POOL_QUEUE_DEPTH batches are queued or running at once.
+
+Settings: OCR_POOL_WORKERS (0 = OCR in the request process), OCR_POOL_TORCH_THREADS
+(torch threads per worker), OCR_POOL_QUEUE_DEPTH, OCR_POOL_TIMEOUT (seconds).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("OCR_POOL_WORKERS", "0"))
+TORCH_THREADS = int(os.getenv("OCR_POOL_TORCH_THREADS", "1"))
+QUEUE_DEPTH = int(os.getenv("OCR_POOL_QUEUE_DEPTH", "32"))
+TIMEOUT = float(os.getenv("OCR_POOL_TIMEOUT", "60"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_init(torch_threads):
+    """Runs once in each worker process: limit torch/OpenCV threads and load the reader."""
+    from ai import ocr_engine, runtime
+
+    runtime.set_threads(torch_threads, 1, torch_threads, torch_threads)
+    ocr_engine.get_profile_reader()
+
+
+def _worker_read(images, allowlist):
+    from ai import ocr_engine
+
+    return os.getpid(), ocr_engine.read_regions(
+        images, reader=ocr_engine.get_profile_reader(), allowlist=allowlist
+    )
+
+
+class OCRPool:
+    """Process pool with a bounded submission queue and usage counters."""
+
+    def __init__(self, workers=WORKERS, torch_threads=TORCH_THREADS,
+                 queue_depth=QUEUE_DEPTH, timeout=TIMEOUT):
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.worker_pids = set()
+
+    def _new_executor(self):
+        # spawn: forking a process that already runs torch threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.torch_threads,),
+        )
+
+    def read_regions(self, images, allowlist=None):
+        """
+        Same contract as ocr_engine.read_regions(); blocks while the queue is full.
+
+        A batch holds its queue slot until the worker is done with it: on
+        timeout the batch is cancelled if it has not started yet, otherwise
+        the slot is freed when the worker finishes, so timed-out batches
+        still count against OCR_POOL_QUEUE_DEPTH.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.rejected += 1
+            raise TimeoutError(f"OCR queue full ({self.queue_depth} batches pending)")
+        started = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        executor = self._executor
+        try:
+            future = executor.submit(_worker_read, list(images), allowlist)
+        except BaseException as exc:
+            self._release(started)
+            with self._lock:
+                self.failed += 1
+            if isinstance(exc, BrokenProcessPool):
+                self._restart(executor)
+            raise
+        future.add_done_callback(lambda _f: self._release(started))
+        ok = False
+        try:
+            pid, results = future.result(timeout=self.timeout)
+            ok = True
+            with self._lock:
+                self.worker_pids.add(pid)
+            return results
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+        except TimeoutError:
+            future.cancel()
+            raise
+        finally:
+            with self._lock:
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def _release(self, started):
+        """Free the queue slot of a batch once its future is done (or cancelled)."""
+        with self._lock:
+            self.in_flight -= 1
+            self.busy_seconds += time.perf_counter() - started
+        self._slots.release()
+
+    def warmup(self, images, allowlist=None):
+        """
+        Start every worker and run one batch on each (tasks are submitted
+        together, so the executor spawns all workers instead of reusing one).
+        """
+        futures = [
+            self._executor.submit(_worker_read, list(images), allowlist) for _ in range(self.workers)
+        ]
+        for future in futures:
+            pid, _ = future.result(timeout=self.timeout)
+            with self._lock:
+                self.worker_pids.add(pid)
+
+    def _restart(self, failed_executor):
+        """
+        Replace failed_executor with a fresh pool. Every batch in flight on a
+        broken pool fails at once; only the first caller swaps it, the others
+        find a new executor already in place and leave it alone.
+        """
+        with self._lock:
+            if self._executor is not failed_executor:
+                return
+            logger.error("OCR worker process died, restarting the pool")
+            self._executor = self._new_executor()
+            self.restarts += 1
+            self.worker_pids.clear()
+        failed_executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "torch_threads": self.torch_threads,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "avg_ms": round(1000 * self.busy_seconds / self.submitted, 2) if self.submitted else 0.0,
+                "worker_pids": sorted(self.worker_pids),
+            }
+
+
+def enabled():
+    """True when OCR should run in worker processes (never inside a worker itself)."""
+    return WORKERS > 0 and multiprocessing.parent_process() is None
+
+
+def get_pool():
+    """Process-wide OCR pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OCRPool()
+                logger.info(f"OCR pool started: {WORKERS} workers x {TORCH_THREADS} torch threads")
+    return _pool
+
+
+def get_stats():
+    if _pool is None:
+        return {"workers": WORKERS, "started": False}
+    return {"started": True, **_pool.stats()}
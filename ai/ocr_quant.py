@@ -0,0 +1,154 @@
+"""
+Yemen LPR - Quantized OCR Profile
+Dynamic int8 quantization of the EasyOCR recognizer's LSTM and Linear layers.
+The int8 weights are cached to disk on first use as plain tensors (int8
+values, scale, zero point and float biases, never a pickled module or
+torch.ScriptObject), so further workers and restarts read them with
+weights_only=True into empty quantized layers instead of re-quantizing.
+
+Validate with scripts/check_ocr_quantization.py on a labeled plate set before
+enabling OCR_PRECISION=int8 (see ai.ocr_engine).
+"""
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Relative to the repository root
+CACHE_DIR = Path(os.getenv("OCR_QUANT_CACHE_DIR", "ai/models/quantized"))
+if not CACHE_DIR.is_absolute():
+    CACHE_DIR = Path(__file__).resolve().parents[1] / CACHE_DIR
+
+
+def cache_path(langs, cache_dir=CACHE_DIR):
+    """Cache file for langs; tied to the torch/easyocr versions that produced it."""
+    import easyocr
+    import torch
+
+    torch_version = torch.__version__.split("+")[0]
+    easyocr_version = getattr(easyocr, "__version__", "unknown")
+    name = f"recognizer_{'_'.join(langs)}_int8_torch{torch_version}_easyocr{easyocr_version}.pt"
+    return Path(cache_dir) / name
+
+
+def _pack(qweight):
+    """Per-tensor int8 weight as plain tensors and numbers."""
+    import torch
+
+    if qweight.qscheme() not in (torch.per_tensor_affine, torch.per_tensor_symmetric):
+        raise ValueError(f"Unsupported weight quantization {qweight.qscheme()}")
+    return {
+        "int8": qweight.int_repr(),
+        "scale": float(qweight.q_scale()),
+        "zero_point": int(qweight.q_zero_point()),
+    }
+
+
+def _unpack(packed):
+    import torch
+
+    return torch._make_per_tensor_quantized_tensor(packed["int8"], packed["scale"], packed["zero_point"])
+
+
+def _float_layers(model):
+    """{name: module} of the layers quantize_dynamic replaces."""
+    import torch
+
+    return {
+        name: module
+        for name, module in model.named_modules()
+        if type(module) in (torch.nn.Linear, torch.nn.LSTM)
+    }
+
+
+def save_weights(model, path):
+    """Write the int8 weights of a quantize_dynamic() model to path (atomically)."""
+    import torch
+    import torch.ao.nn.quantized.dynamic as nnqd
+
+    layers = {}
+    for name, module in model.named_modules():
+        if isinstance(module, nnqd.LSTM):
+            layers[name] = {
+                "weights": {k: _pack(w) for k, w in module.get_weight().items()},
+                "biases": module.get_bias(),
+            }
+        elif isinstance(module, nnqd.Linear):
+            layers[name] = {"weight": _pack(module.weight()), "bias": module.bias()}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    torch.save({"layers": layers}, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_weights(model, path):
+    """
+    Replace the Linear/LSTM layers of float model, in place, by int8 layers
+    holding the weights saved at path. Raises (leaving model unchanged) when
+    the file does not match the model.
+    """
+    import torch
+    import torch.ao.nn.quantized.dynamic as nnqd
+
+    layers = torch.load(path, map_location="cpu", weights_only=True)["layers"]
+    float_layers = _float_layers(model)
+    if set(layers) != set(float_layers):
+        raise ValueError("cached layers do not match the recognizer")
+
+    quantized = {}
+    for name, module in float_layers.items():
+        saved = layers[name]
+        if isinstance(module, torch.nn.LSTM):
+            layer = nnqd.LSTM(
+                module.input_size, module.hidden_size, num_layers=module.num_layers, bias=module.bias,
+                batch_first=module.batch_first, dropout=module.dropout,
+                bidirectional=module.bidirectional, dtype=torch.qint8,
+            )
+            layer.set_weight_bias({
+                **{k: _unpack(w) for k, w in saved["weights"].items()},
+                **saved["biases"],
+            })
+        else:
+            layer = nnqd.Linear(
+                module.in_features, module.out_features, bias_=module.bias is not None, dtype=torch.qint8
+            )
+            layer.set_weight_bias(_unpack(saved["weight"]), saved["bias"])
+        quantized[name] = layer
+
+    for name, layer in quantized.items():
+        parent_name, _, attr = name.rpartition(".")
+        parent = model.get_submodule(parent_name) if parent_name else model
+        setattr(parent, attr, layer)
+    return model
+
+
+def quantize_recognizer(reader, langs, cache_dir=CACHE_DIR):
+    """
+    Replace reader.recognizer (loaded with quantize=False) by its int8 version.
+
+    Returns "cache" when the int8 weights were loaded from disk, "quantized"
+    when they were quantized now (and written to the cache).
+    """
+    import torch
+
+    path = cache_path(langs, cache_dir)
+    if path.exists():
+        try:
+            reader.recognizer = load_weights(reader.recognizer, path)
+            reader.recognizer.eval()
+            return "cache"
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized recognizer cache {path}: {e}")
+
+    model = torch.quantization.quantize_dynamic(
+        reader.recognizer, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+    )
+    model.eval()
+    reader.recognizer = model
+    try:
+        save_weights(model, path)
+    except Exception as e:
+        logger.warning(f"Could not cache quantized recognizer: {e}")
+    return "quantized"
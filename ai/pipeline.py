@@ -3,10 +3,13 @@ Yemen Vehicle License Plate Recognition & Vehicle Segmentation Pipeline.
 
 Flow: Vehicle Seg (YOLOv8-Seg) -> Crop vehicle by mask -> Plate Detection (inside vehicle)
       -> OCR -> Governorate from left -> JSON output.
+Plates-first modes (PIPELINE_MODE / mode=): Plate Detection on the full frame
+      -> OCR -> optional box-only vehicle association.
 """
 import os
 import sys
 import cv2
+import numpy as np
 import uuid
 import json
 import re
@@ -15,18 +18,26 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from ai.inference import get_seg_model, segment_vehicles
+from ai.inference import detect_vehicle_boxes, get_seg_model, segment_vehicles
 from ai.gov_detect import extract_left_code_strong
+from ai import metrics, ocr_cache, ocr_engine, ocr_policy, pipeline_profiles, yolo_backend
+from ai.preprocess import PlateContext
 
-_reader = None
+
+# Upper bound on vehicle crops per plate-detector forward pass (bounds memory)
+PLATE_DETECT_BATCH_SIZE = int(os.getenv("PLATE_DETECT_BATCH_SIZE", "8"))
+
+# Image pipeline modes, see process_image()
+PIPELINE_MODES = ("vehicles_first", "plates_first", "plates_only")
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "vehicles_first")
+
+# Long-edge cap of the working copy used for segmentation and plate detection
+# (0 = detect at native resolution); plates are always cropped at full resolution
+PIPELINE_MAX_SIDE = int(os.getenv("PIPELINE_MAX_SIDE", "1920"))
 
 
 def get_reader():
-    global _reader
-    if _reader is None:
-        import easyocr
-        _reader = easyocr.Reader(["ar", "en"], gpu=False)
-    return _reader
+    return ocr_engine.get_profile_reader()
 
 
 ARABIC_DIGITS = {
@@ -78,25 +89,7 @@ def clean_text_for_analysis(text):
 def preprocess_plate_crop(img, variant="standard"):
     if img is None or img.size == 0:
         return None
-    if len(img.shape) == 3:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = img.copy()
-    target_h = 100
-    scale = target_h / gray.shape[0]
-    nw = int(gray.shape[1] * scale)
-    resized = cv2.resize(gray, (nw, target_h), interpolation=cv2.INTER_CUBIC)
-    if variant == "clahe":
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        return clahe.apply(resized)
-    if variant == "otsu":
-        _, b = cv2.threshold(resized, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        return b
-    if variant == "adaptive":
-        return cv2.adaptiveThreshold(
-            resized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-    return resized
+    return PlateContext.of(img).number_variant(variant)
 
 
 def extract_bottom_region(crop, top_ratio=0.35):
@@ -115,21 +108,47 @@ def extract_left_region(crop, width_ratio=0.28):
     return crop[:, :lw]
 
 
-def multi_pass_ocr(crop, region_name="full"):
-    reader = get_reader()
+def multi_pass_ocr(crop, region_name="full", policy=None, debug=None):
+    """
+    OCR the plate number with ordered preprocessing variants.
+    crop: BGR/grayscale image or PlateContext (shares preprocessing with gov OCR).
+    policy: optional overrides for the "number" OCR policy (see ai.ocr_policy).
+    debug: optional dict; receives the early-exit decision under "early_exit"
+    and whether the result came from the OCR cache under "cache_hit".
+    """
+    policy = ocr_policy.get_policy("number", policy)
+    plate = PlateContext.of(crop)
+
+    # Same crop seen recently (video frames, repeated uploads): reuse its result
+    cache = ocr_cache.get_cache()
+    cache_key = ocr_cache.make_key(plate.gray, "number", region_name, policy, ocr_engine.PROFILE) if cache else None
+    cached = cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        if debug is not None:
+            debug["early_exit"] = cached["early_exit"]
+            debug["cache_hit"] = True
+        return cached["text"], cached["confidence"], cached["raw_reads"]
+
     candidates = []
     raw_reads = []
-    variants = ["standard", "clahe", "otsu", "adaptive"]
-    for v in variants:
-        try:
-            proc = preprocess_plate_crop(crop, v)
-            if proc is None or proc.size == 0:
+
+    def run_stage(variants):
+        prepared = []
+        for v in variants:
+            try:
+                proc = preprocess_plate_crop(plate, v)
+                if proc is None or proc.size == 0:
+                    continue
+                prepared.append((v, proc))
+            except Exception:
                 continue
-            if len(proc.shape) == 2:
-                rgb = cv2.cvtColor(proc, cv2.COLOR_GRAY2RGB)
-            else:
-                rgb = cv2.cvtColor(proc, cv2.COLOR_BGR2RGB)
-            results = reader.readtext(rgb, detail=1, paragraph=False)
+        # All variants share one size, so they are recognized in one batch
+        # (in this process, or in an OCR worker process when the pool is enabled)
+        try:
+            batch_results = ocr_engine.read_regions([p for _v, p in prepared])
+        except Exception:
+            batch_results = [[] for _ in prepared]
+        for (v, _proc), results in zip(prepared, batch_results):
             for _box, text, conf in results:
                 if not text or not text.strip():
                     continue
@@ -143,16 +162,24 @@ def multi_pass_ocr(crop, region_name="full"):
                 if digits and len(digits) >= 2:
                     lb = 2.0 if 5 <= len(digits) <= 6 else 1.0
                     score = len(digits) * float(conf) * lb
-                    candidates.append((digits, float(conf), score))
-        except Exception:
-            continue
-    if not candidates:
-        return "", 0.0, raw_reads
-    pref = [c for c in candidates if 5 <= len(c[0]) <= 6]
-    pool = pref if pref else candidates
-    pool.sort(key=lambda x: x[2], reverse=True)
-    best = pool[0]
-    return best[0], best[1], raw_reads
+                    candidates.append((digits, float(conf), score, v))
+
+    decision = ocr_policy.run_passes("number", policy, run_stage, candidates)
+    if debug is not None:
+        debug["early_exit"] = decision
+        debug["cache_hit"] = False
+    text, conf, winner = "", 0.0, None
+    if candidates:
+        pref = [c for c in candidates if 5 <= len(c[0]) <= 6]
+        pool = pref if pref else candidates
+        pool.sort(key=lambda x: x[2], reverse=True)
+        text, conf, _score, winner = pool[0]
+    ocr_policy.record_winner(decision, winner)
+    if cache_key:
+        cache.put(cache_key, {
+            "text": text, "confidence": conf, "raw_reads": raw_reads, "early_exit": decision,
+        })
+    return text, conf, raw_reads
 
 
 def _ensure_model_loaded():
@@ -164,37 +191,239 @@ def _plate_detector():
     return get_model()
 
 
-def detect_plates_on_image(img_bgr, conf_thres=0.4):
-    """Run plate detection on image (full or vehicle crop). Returns [(crop, conf, bbox)]."""
-    model = _plate_detector()
-    results = model.predict(source=img_bgr, device="cpu", conf=conf_thres, verbose=False)[0]
+def _plates_from_detections(img_bgr, dets):
     plates = []
     h, w = img_bgr.shape[:2]
-    if results.boxes is None:
-        return plates
-    for box in results.boxes:
-        xyxy = box.xyxy[0].cpu().numpy()
+    for xyxy, conf in zip(dets.boxes, dets.confs):
         x1, y1, x2, y2 = map(int, xyxy[:4])
         x1, y1 = max(0, x1), max(0, y1)
         x2, y2 = min(w, x2), min(h, y2)
         crop = img_bgr[y1:y2, x1:x2].copy()
         if crop.size == 0:
             continue
-        plates.append((crop, float(box.conf[0]), [x1, y1, x2, y2]))
+        plates.append((crop, float(conf), [x1, y1, x2, y2]))
     return plates
 
 
+def detect_plates_on_images(images, conf_thres=0.4, max_batch=None):
+    """
+    Run plate detection on several images (e.g. all vehicle crops of a frame)
+    in batched forward passes of at most max_batch images (PLATE_DETECT_BATCH_SIZE).
+    Returns one [(crop, conf, bbox)] list per image, bbox in that image's coordinates.
+    """
+    images = list(images)
+    if not images:
+        return []
+    model = _plate_detector()
+    if model is None:
+        return [[] for _ in images]
+    max_batch = max(int(max_batch or PLATE_DETECT_BATCH_SIZE), 1)
+    out = []
+    for start in range(0, len(images), max_batch):
+        chunk = images[start:start + max_batch]
+        for img, dets in zip(chunk, yolo_backend.predict(model, chunk, conf=conf_thres)):
+            out.append(_plates_from_detections(img, dets))
+    return out
+
+
+def detect_plates_on_image(img_bgr, conf_thres=0.4):
+    """Run plate detection on image (full or vehicle crop). Returns [(crop, conf, bbox)]."""
+    return detect_plates_on_images([img_bgr], conf_thres=conf_thres)[0]
+
+
+def load_image(image):
+    """
+    BGR image from a file path, encoded image bytes (decoded in memory with
+    cv2.imdecode) or an already decoded ndarray (grayscale / BGRA converted).
+    Raises ValueError when the input cannot be decoded.
+    """
+    if isinstance(image, np.ndarray):
+        img = image
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        elif img.ndim == 3 and img.shape[2] == 4:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+        if img.ndim != 3 or img.shape[2] != 3 or img.size == 0:
+            raise ValueError(f"Unsupported image array of shape {image.shape}")
+        return img
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR) if len(image) else None
+        if img is None:
+            raise ValueError("Cannot decode image bytes")
+        return img
+    img = cv2.imread(str(image))
+    if img is None:
+        raise ValueError(f"Cannot read image: {image}")
+    return img
+
+
+def working_copy(img_bgr, max_side=None):
+    """
+    Downscaled copy of img_bgr with its long edge at most max_side
+    (PIPELINE_MAX_SIDE). Returns (work, scale), scale = original / working size.
+    """
+    max_side = PIPELINE_MAX_SIDE if max_side is None else max_side
+    h, w = img_bgr.shape[:2]
+    if not max_side or max(h, w) <= max_side:
+        return img_bgr, 1.0
+    scale = max(h, w) / max_side
+    size = (max(int(round(w / scale)), 1), max(int(round(h / scale)), 1))
+    return cv2.resize(img_bgr, size, interpolation=cv2.INTER_AREA), scale
+
+
+def _to_original(bbox, scale, shape):
+    """Map a working-copy bbox to original image coordinates (clipped)."""
+    h, w = shape[:2]
+    x1, y1, x2, y2 = bbox
+    return [
+        max(0, int(x1 * scale)), max(0, int(y1 * scale)),
+        min(w, int(round(x2 * scale))), min(h, int(round(y2 * scale))),
+    ]
+
+
+def _full_res_plates(img_bgr, plates, scale, offset=(0, 0)):
+    """
+    Re-crop plates detected on the working copy (in a region at offset) from
+    the full-resolution image. Returns [(crop, conf, bbox_orig)].
+    """
+    ox, oy = offset
+    out = []
+    for p_crop, p_conf, (px1, py1, px2, py2) in plates:
+        if scale == 1.0:
+            out.append((p_crop, p_conf, [ox + px1, oy + py1, ox + px2, oy + py2]))
+            continue
+        x1, y1, x2, y2 = _to_original([ox + px1, oy + py1, ox + px2, oy + py2], scale, img_bgr.shape)
+        crop = img_bgr[y1:y2, x1:x2].copy()
+        if crop.size == 0:
+            continue
+        out.append((crop, p_conf, [x1, y1, x2, y2]))
+    return out
+
+
+def _save_artifact(img, directory, prefix, fmt, profile):
+    """Write img as <prefix>_<id>.<fmt> (png | jpg) into directory. Returns the path."""
+    path = Path(directory) / f"{prefix}_{uuid.uuid4().hex[:8]}.{fmt}"
+    params = pipeline_profiles.imwrite_params(profile) if fmt == "jpg" else []
+    cv2.imwrite(str(path), img, params)
+    return path
+
+
+def _read_plate(p_crop, p_conf, bbox_orig, crops_dir, debug_dir, profile, timer=None):
+    """
+    OCR one detected plate (number + governorate) with the profile's OCR
+    passes. Saves the crop into crops_dir unless it is None. Returns the
+    plate's result entry; stage timings and OCR pass counts go to timer.
+    """
+    timer = timer or metrics.StageTimer()
+    crop_path = None
+    if crops_dir is not None:
+        with timer.stage("write_crops"):
+            crop_path = _save_artifact(p_crop, crops_dir, "plate", profile["artifacts"]["crops"], profile)
+
+    plate = PlateContext(p_crop)
+    bottom = plate.bottom(0.35)
+    number_debug = {}
+    with timer.stage("ocr_number"):
+        plate_number, ocr_conf, raw_reads = multi_pass_ocr(
+            bottom if bottom.size > 0 else plate,
+            "bottom_region",
+            policy=profile["number_ocr"],
+            debug=number_debug,
+        )
+    with timer.stage("ocr_governorate"):
+        gov_result = extract_left_code_strong(plate, debug_dir=debug_dir, policy=profile["governorate_ocr"])
+    gov_debug = gov_result.get("debug", {})
+    timer.ocr_passes("number", number_debug.get("early_exit"), number_debug.get("cache_hit", False))
+    timer.ocr_passes("governorate", gov_debug.get("early_exit"), gov_debug.get("cache_hit", False))
+
+    governorate_name = gov_result.get("governorate_name") or "غير متوفر"
+    governorate_code = gov_result.get("governorate_code") or ""
+
+    return {
+        "plate_number": plate_number or "",
+        "raw_ocr": plate_number or "",
+        "detection_confidence": round(float(p_conf), 4),
+        "ocr_confidence": round(float(ocr_conf), 4),
+        "governorate_name": governorate_name,
+        "governorate_code": governorate_code,
+        "governorate": governorate_name,
+        "vehicle_type": "vehicle",
+        "bbox": bbox_orig,
+        "crop_path": str(crop_path) if crop_path else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "raw_reads": gov_result.get("raw_reads", []) + raw_reads,
+        "confidence": round(float(p_conf), 4), # Mapping for viz
+        "debug_info": {
+            "number_ocr": number_debug.get("early_exit"),
+            "governorate_ocr": gov_debug.get("early_exit"),
+            "cache_hit": {
+                "number": number_debug.get("cache_hit", False),
+                "governorate": gov_debug.get("cache_hit", False),
+            },
+        },
+    }
+
+
+def _containing_vehicle(plate_bbox, vehicle_results):
+    """Index of the smallest vehicle box containing the plate center, or None."""
+    px1, py1, px2, py2 = plate_bbox
+    cx, cy = (px1 + px2) / 2, (py1 + py2) / 2
+    best, best_area = None, None
+    for i, v in enumerate(vehicle_results):
+        vx1, vy1, vx2, vy2 = v["bbox"]
+        if vx1 <= cx <= vx2 and vy1 <= cy <= vy2:
+            area = (vx2 - vx1) * (vy2 - vy1)
+            if best_area is None or area < best_area:
+                best, best_area = i, area
+    return best
+
+
 def process_image(
     image_path,
-    save_crops=True,
+    save_crops=None,
     crops_dir=None,
     logs_dir=None,
-    debug_gov=True,
+    debug_gov=None,
+    mode=None,
+    profile=None,
 ):
     """
     Main pipeline: Vehicle Seg -> crop vehicle -> Plate Detection (inside vehicle)
     -> OCR -> Governorate from left -> JSON.
+
+    image_path: file path, encoded image bytes or BGR ndarray (see load_image()),
+    so uploads can be processed without a round trip through the disk.
+
+    Segmentation and plate detection run on a working copy capped at
+    PIPELINE_MAX_SIDE; boxes are mapped back and plates are cropped from the
+    full-resolution image for OCR.
+
+    mode (default PIPELINE_MODE):
+      vehicles_first - the flow above (vehicle masks and segmentation metrics)
+      plates_first   - plate detection on the full frame, then each plate is
+                       associated with the smallest vehicle box containing it
+                       (box-only detector, no masks)
+      plates_only    - plate detection on the full frame, no vehicle stage
+
+    profile (default PIPELINE_PROFILE, see config/pipeline_profiles.json):
+    thresholds, resolution cap, OCR passes, debug output and artifact formats.
+    save_crops / debug_gov, when given, override the profile.
+
+    The result's "processing_metadata" holds per-stage timings and counts
+    (see ai.metrics.StageTimer); they are also added to the process histograms.
     """
+    timer = metrics.StageTimer("image")
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode: {mode!r} (expected one of {', '.join(PIPELINE_MODES)})")
+    profile = pipeline_profiles.get_profile(profile)
+    if save_crops is None:
+        save_crops = profile["artifacts"]["crops"] != "none"
+    if debug_gov is None:
+        debug_gov = profile["debug_gov"]
+    if save_crops and profile["artifacts"]["crops"] == "none":
+        profile["artifacts"]["crops"] = "png"
+
     repo = Path(__file__).resolve().parent.parent
     if crops_dir is None:
         crops_dir = repo / "media" / "crops"
@@ -203,23 +432,30 @@ def process_image(
     os.makedirs(crops_dir, exist_ok=True)
     os.makedirs(logs_dir, exist_ok=True)
     debug_dir = str(repo / "output" / "debug_gov") if debug_gov else None
+    if not save_crops:
+        crops_dir = None
+    vehicle_conf, plate_conf = profile["vehicle_conf"], profile["plate_conf"]
 
-    img = cv2.imread(str(image_path))
-    if img is None:
-        raise ValueError(f"Cannot read image: {image_path}")
+    with timer.stage("decode"):
+        img = load_image(image_path)
 
-    import uuid
     from ai.visualization import draw_detections
 
-    # ... (imports)
-
-    vehicles = segment_vehicles(img, conf=0.4)
+    with timer.stage("resize"):
+        work, scale = working_copy(img, profile["max_side"])
     vehicle_results = []
     plate_results = []
-    
+
+    if mode == "vehicles_first":
+        with timer.stage("segment_vehicles"):
+            vehicles = segment_vehicles(work, conf=vehicle_conf)
+    else:
+        vehicles = []
+
     # Track which vehicles have plates to avoid duplicates if needed, 
     # but requirement implies simply listing what's found.
     
+    parsed_vehicles = []
     for vehicle_data in vehicles:
         # Handle new format with segmentation metrics
         if len(vehicle_data) == 6:
@@ -232,7 +468,14 @@ def process_image(
             v_type = "vehicle"
             seg_metrics = None
         
-        vx1, vy1, vx2, vy2 = v_bbox
+        vx1, vy1, vx2, vy2 = _to_original(v_bbox, scale, img.shape)
+        if seg_metrics and scale != 1.0:
+            # Areas were measured on the working copy
+            seg_metrics = dict(
+                seg_metrics,
+                mask_area=int(round(seg_metrics.get("mask_area", 0) * scale * scale)),
+                bbox_area=(vx2 - vx1) * (vy2 - vy1),
+            )
         
         # Add to vehicle results with segmentation metrics
         vehicle_result = {
@@ -246,50 +489,22 @@ def process_image(
             vehicle_result["segmentation"] = seg_metrics
         
         vehicle_results.append(vehicle_result)
+        parsed_vehicles.append((v_crop, v_bbox, v_conf, v_type, seg_metrics))
 
-        # Plate detection on vehicle crop
-        plate_detections = detect_plates_on_image(v_crop, conf_thres=0.4)
+    # Plate detection on all vehicle crops, batched through the detector
+    with timer.stage("detect_plates"):
+        plates_per_vehicle = detect_plates_on_images([v[0] for v in parsed_vehicles], conf_thres=plate_conf)
 
-        for p_crop, p_conf, p_bbox in plate_detections:
-            px1, py1, px2, py2 = p_bbox
-            # Map plate bbox to original image coordinates
-            bbox_orig = [
-                vx1 + px1, vy1 + py1,
-                vx1 + px2, vy1 + py2,
-            ]
-            
-            crop_path = None
-            if save_crops:
-                fn = f"plate_{uuid.uuid4().hex[:8]}.png"
-                crop_path = crops_dir / fn
-                cv2.imwrite(str(crop_path), p_crop)
-
-            bottom = extract_bottom_region(p_crop, top_ratio=0.35)
-            plate_number, ocr_conf, raw_reads = multi_pass_ocr(
-                bottom if bottom is not None and bottom.size > 0 else p_crop,
-                "bottom_region",
-            )
-            gov_result = extract_left_code_strong(p_crop, debug_dir=debug_dir)
-
-            governorate_name = gov_result.get("governorate_name") or "غير متوفر"
-            governorate_code = gov_result.get("governorate_code") or ""
-
-            res_entry = {
-                "plate_number": plate_number or "",
-                "raw_ocr": plate_number or "",
-                "detection_confidence": round(float(p_conf), 4),
-                "ocr_confidence": round(float(ocr_conf), 4),
-                "governorate_name": governorate_name,
-                "governorate_code": governorate_code,
-                "governorate": governorate_name,
-                "vehicle_type": v_type,
-                "vehicle_confidence": float(v_conf) if v_conf else 0.0,
-                "bbox": bbox_orig,
-                "crop_path": str(crop_path) if crop_path else None,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "raw_reads": gov_result.get("raw_reads", []) + raw_reads,
-                "confidence": round(float(p_conf), 4), # Mapping for viz
-            }
+    for (v_crop, v_bbox, v_conf, v_type, seg_metrics), plate_detections in zip(
+        parsed_vehicles, plates_per_vehicle
+    ):
+        vx1, vy1, vx2, vy2 = v_bbox
+
+        # Map plate bboxes to original image coordinates, crop at full resolution
+        for p_crop, p_conf, bbox_orig in _full_res_plates(img, plate_detections, scale, (vx1, vy1)):
+            res_entry = _read_plate(p_crop, p_conf, bbox_orig, crops_dir, debug_dir, profile, timer)
+            res_entry["vehicle_type"] = v_type
+            res_entry["vehicle_confidence"] = float(v_conf) if v_conf else 0.0
             
             # Add segmentation quality if available
             if seg_metrics:
@@ -299,65 +514,54 @@ def process_image(
             
             plate_results.append(res_entry)
 
-    # Fallback: if no vehicles found (or maybe always?), check full image for plates?
-    # Logic implies: Image -> Vehicle -> Plate. 
-    # If no vehicles, we might miss plates. 
-    # Current code had fallback: "if not vehicles and not results: detect_plates_on_image(img)"
-    # We should keep this fallback to not regress capability.
-    
-    if not vehicles and not plate_results:
-        plate_detections = detect_plates_on_image(img, conf_thres=0.4)
+    # Plates-first modes, and the vehicles-first fallback: if no vehicles were
+    # found we would otherwise miss plates, so check the full image.
+    if mode != "vehicles_first" or (not vehicles and not plate_results):
+        with timer.stage("detect_plates"):
+            plate_detections = _full_res_plates(img, detect_plates_on_image(work, conf_thres=plate_conf), scale)
+
+        if mode == "plates_first" and plate_detections:
+            with timer.stage("detect_vehicle_boxes"):
+                vehicle_boxes = detect_vehicle_boxes(work, conf=vehicle_conf)
+            for v_bbox, v_conf, v_type in vehicle_boxes:
+                vehicle_results.append({
+                    "bbox": _to_original(v_bbox, scale, img.shape), "type": v_type, "confidence": v_conf,
+                })
+
         for p_crop, p_conf, p_bbox in plate_detections:
-            bbox_orig = list(p_bbox)
-            
-            crop_path = None
-            if save_crops:
-                fn = f"plate_{uuid.uuid4().hex[:8]}.png"
-                crop_path = crops_dir / fn
-                cv2.imwrite(str(crop_path), p_crop)
-                
-            bottom = extract_bottom_region(p_crop, top_ratio=0.35)
-            plate_number, ocr_conf, raw_reads = multi_pass_ocr(
-                bottom if bottom is not None and bottom.size > 0 else p_crop,
-                "bottom_region",
+            res_entry = _read_plate(p_crop, p_conf, p_bbox, crops_dir, debug_dir, profile, timer)
+            idx = _containing_vehicle(p_bbox, vehicle_results)
+            if idx is not None:
+                res_entry["vehicle_type"] = vehicle_results[idx]["type"]
+                res_entry["vehicle_confidence"] = vehicle_results[idx]["confidence"]
+            plate_results.append(res_entry)
+
+    # Visualization: processed image in the profile's overlay format
+    processed_path = processed_filename = None
+    if profile["artifacts"]["overlay"] != "none":
+        with timer.stage("draw_detections"):
+            annotated_img = draw_detections(img, vehicle_results, plate_results)
+        results_dir = repo / "media" / "results"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        with timer.stage("write_overlay"):
+            processed_path = _save_artifact(
+                annotated_img, results_dir, "processed", profile["artifacts"]["overlay"], profile
             )
-            gov_result = extract_left_code_strong(p_crop, debug_dir=debug_dir)
-            
-            governorate_name = gov_result.get("governorate_name") or "غير متوفر"
-            governorate_code = gov_result.get("governorate_code") or ""
-            
-            plate_results.append({
-                "plate_number": plate_number or "",
-                "raw_ocr": plate_number or "",
-                "detection_confidence": round(float(p_conf), 4),
-                "ocr_confidence": round(float(ocr_conf), 4),
-                "governorate_name": governorate_name,
-                "governorate_code": governorate_code,
-                "governorate": governorate_name,
-                "vehicle_type": "vehicle",
-                "bbox": bbox_orig,
-                "crop_path": str(crop_path) if crop_path else None,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "raw_reads": gov_result.get("raw_reads", []) + raw_reads,
-                "confidence": round(float(p_conf), 4),
-            })
-
-    # Visualization
-    annotated_img = draw_detections(img, vehicle_results, plate_results)
-    
-    # Save processed image
-    processed_filename = f"processed_{uuid.uuid4().hex[:8]}.png"
-    processed_path = repo / "media" / "results" / processed_filename
-    processed_path.parent.mkdir(parents=True, exist_ok=True)
-    cv2.imwrite(str(processed_path), annotated_img)
+        processed_filename = processed_path.name
+
+    timer.count("vehicles", len(vehicle_results))
+    timer.count("plates", len(plate_results))
 
     # Consolidate response
     return {
         "vehicles": vehicle_results,
         "plates": plate_results,
         "text": " ".join([p["plate_number"] for p in plate_results if p["plate_number"]]),
-        "processed_image": str(processed_path),
+        "processed_image": str(processed_path) if processed_path else None,
         "processed_image_filename": processed_filename, # Helper for services
+        "mode": mode,
+        "profile": profile["name"],
+        "processing_metadata": timer.finish(),
         "confidence": {
             "vehicle": max([v["confidence"] for v in vehicle_results]) if vehicle_results else 0.0,
             "plate": max([p["detection_confidence"] for p in plate_results]) if plate_results else 0.0,
@@ -370,12 +574,49 @@ def process_video(
     video_path,
     output_dir,
     skip_frames=2,
-    conf_threshold=0.4,
-    save_annotated=True,
-    debug_gov=False,
+    conf_threshold=None,
+    save_annotated=None,
+    debug_gov=None,
+    profile=None,
+    save_crops=None,
+    crops_dir=None,
 ):
+    """
+    Run the vehicles-first pipeline on every (skip_frames + 1)th frame.
+
+    profile: as for process_image(): thresholds, resolution cap, OCR passes
+    and artifacts (overlay "none" skips the annotated video). Governorate
+    debug output and plate crops come from the profile's "video" settings,
+    off by default since they are written for every processed frame.
+    conf_threshold, save_annotated, debug_gov and save_crops, when given,
+    override the profile.
+    Stage timings are summed over frames in "processing_metadata".
+    """
     from collections import defaultdict
 
+    timer = metrics.StageTimer("video")
+    profile = pipeline_profiles.get_profile(profile)
+    vehicle_conf = conf_threshold if conf_threshold is not None else profile["vehicle_conf"]
+    plate_conf = conf_threshold if conf_threshold is not None else profile["plate_conf"]
+    if save_annotated is None:
+        save_annotated = profile["artifacts"]["overlay"] != "none"
+    video = profile["video"]
+    if save_crops is None:
+        save_crops = video["crops"] != "none"
+    if debug_gov is None:
+        debug_gov = video["debug_gov"]
+    if save_crops:
+        profile["artifacts"]["crops"] = video["crops"] if video["crops"] != "none" else "png"
+
+    repo = Path(__file__).resolve().parent.parent
+    if not save_crops:
+        crops_dir = None
+    elif crops_dir is None:
+        crops_dir = repo / "media" / "crops"
+    if crops_dir is not None:
+        os.makedirs(crops_dir, exist_ok=True)
+    debug_dir = str(repo / "output" / "debug_gov") if debug_gov else None
+
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video not found: {video_path}")
     cap = cv2.VideoCapture(video_path)
@@ -393,104 +634,82 @@ def process_video(
         fourcc = cv2.VideoWriter_fourcc(*"mp4v")
         writer = cv2.VideoWriter(out_path, fourcc, fps, (w, h))
 
-    debug_dir = str(Path(__file__).resolve().parent.parent / "output" / "debug_gov") if debug_gov else None
     all_detections = []
     unique_plates = defaultdict(lambda: {"count": 0, "max_conf": 0.0, "first_frame": None})
     frame_idx = 0
     processed_count = 0
 
+    def read_plate(p_crop, det_conf, bbox, annotated=None):
+        entry = _read_plate(p_crop, det_conf, bbox, crops_dir, debug_dir, profile, timer)
+        timer.count("plates")
+        plate_number = entry["plate_number"]
+        if plate_number:
+            unique_plates[plate_number]["count"] += 1
+            unique_plates[plate_number]["max_conf"] = max(
+                unique_plates[plate_number]["max_conf"], float(det_conf)
+            )
+            if unique_plates[plate_number]["first_frame"] is None:
+                unique_plates[plate_number]["first_frame"] = frame_idx
+        all_detections.append({
+            "frame": frame_idx,
+            "plate_number": plate_number,
+            "raw_ocr": plate_number,
+            "detection_confidence": round(float(det_conf), 3),
+            "ocr_confidence": round(entry["ocr_confidence"], 3),
+            "bbox": bbox,
+            "governorate_code": entry["governorate_code"] or None,
+            "governorate_name": entry["governorate_name"] if entry["governorate_code"] else None,
+            "crop_path": entry["crop_path"],
+        })
+        if annotated is None:
+            return
+        x1, y1, x2, y2 = bbox
+        color = (0, 255, 0) if plate_number else (0, 165, 255)
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+        label = plate_number if plate_number else "—"
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+        cv2.rectangle(annotated, (x1, y1 - th - 10), (x1 + tw + 10, y1), color, -1)
+        cv2.putText(annotated, label, (x1 + 5, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+
     try:
         while True:
-            ret, frame = cap.read()
+            with timer.stage("decode"):
+                ret, frame = cap.read()
             if not ret:
                 break
             frame_idx += 1
-            annotated = frame.copy()
             if frame_idx % (skip_frames + 1) != 0:
                 if writer:
-                    writer.write(annotated)
+                    with timer.stage("write_video"):
+                        writer.write(frame)
                 continue
+            # Boxes are drawn on a copy: later plates are cropped from frame
+            annotated = frame.copy() if writer else None
             processed_count += 1
 
-            vehicles = segment_vehicles(frame, conf=conf_threshold)
-            for vehicle_data in vehicles:
-                if len(vehicle_data) == 5:
-                    v_crop, _m, v_bbox, _vc, v_type = vehicle_data
-                else:
-                    v_crop, _m, v_bbox, _vc = vehicle_data[:4]
-                    v_type = "vehicle"
-                vx1, vy1, _vx2, _vy2 = v_bbox
-                plates = detect_plates_on_image(v_crop, conf_thres=conf_threshold)
-                for p_crop, det_conf, p_bbox in plates:
-                    px1, py1, px2, py2 = p_bbox
-                    bbox = [vx1 + px1, vy1 + py1, vx1 + px2, vy1 + py2]
-                    bottom = extract_bottom_region(p_crop, top_ratio=0.35)
-                    plate_number, ocr_conf, _ = multi_pass_ocr(
-                        bottom if bottom is not None and bottom.size > 0 else p_crop,
-                        "video_bottom",
-                    )
-                    gov_result = extract_left_code_strong(p_crop, debug_dir=debug_dir)
-                    if plate_number:
-                        unique_plates[plate_number]["count"] += 1
-                        unique_plates[plate_number]["max_conf"] = max(
-                            unique_plates[plate_number]["max_conf"], float(det_conf)
-                        )
-                        if unique_plates[plate_number]["first_frame"] is None:
-                            unique_plates[plate_number]["first_frame"] = frame_idx
-                    all_detections.append({
-                        "frame": frame_idx,
-                        "plate_number": plate_number or "",
-                        "raw_ocr": plate_number or "",
-                        "detection_confidence": round(float(det_conf), 3),
-                        "ocr_confidence": round(float(ocr_conf), 3),
-                        "bbox": bbox,
-                        "governorate_code": gov_result.get("governorate_code"),
-                        "governorate_name": gov_result.get("governorate_name"),
-                    })
-                    x1, y1, x2, y2 = bbox
-                    color = (0, 255, 0) if plate_number else (0, 165, 255)
-                    cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-                    label = plate_number if plate_number else "—"
-                    (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-                    cv2.rectangle(annotated, (x1, y1 - th - 10), (x1 + tw + 10, y1), color, -1)
-                    cv2.putText(annotated, label, (x1 + 5, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+            with timer.stage("resize"):
+                work, scale = working_copy(frame, profile["max_side"])
+            with timer.stage("segment_vehicles"):
+                vehicles = segment_vehicles(work, conf=vehicle_conf)
+            timer.count("vehicles", len(vehicles))
+            with timer.stage("detect_plates"):
+                plates_per_vehicle = detect_plates_on_images(
+                    [v[0] for v in vehicles], conf_thres=plate_conf
+                )
+            for vehicle_data, plates in zip(vehicles, plates_per_vehicle):
+                vx1, vy1, _vx2, _vy2 = vehicle_data[2]
+                for p_crop, det_conf, bbox in _full_res_plates(frame, plates, scale, (vx1, vy1)):
+                    read_plate(p_crop, det_conf, bbox, annotated)
 
             if not vehicles:
-                plates = detect_plates_on_image(frame, conf_thres=conf_threshold)
+                with timer.stage("detect_plates"):
+                    plates = _full_res_plates(frame, detect_plates_on_image(work, conf_thres=plate_conf), scale)
                 for p_crop, det_conf, bbox in plates:
-                    bottom = extract_bottom_region(p_crop, top_ratio=0.35)
-                    plate_number, ocr_conf, _ = multi_pass_ocr(
-                        bottom if bottom is not None and bottom.size > 0 else p_crop,
-                        "video_bottom",
-                    )
-                    gov_result = extract_left_code_strong(p_crop, debug_dir=debug_dir)
-                    if plate_number:
-                        unique_plates[plate_number]["count"] += 1
-                        unique_plates[plate_number]["max_conf"] = max(
-                            unique_plates[plate_number]["max_conf"], float(det_conf)
-                        )
-                        if unique_plates[plate_number]["first_frame"] is None:
-                            unique_plates[plate_number]["first_frame"] = frame_idx
-                    all_detections.append({
-                        "frame": frame_idx,
-                        "plate_number": plate_number or "",
-                        "raw_ocr": plate_number or "",
-                        "detection_confidence": round(float(det_conf), 3),
-                        "ocr_confidence": round(float(ocr_conf), 3),
-                        "bbox": bbox,
-                        "governorate_code": gov_result.get("governorate_code"),
-                        "governorate_name": gov_result.get("governorate_name"),
-                    })
-                    x1, y1, x2, y2 = bbox
-                    color = (0, 255, 0) if plate_number else (0, 165, 255)
-                    cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-                    label = plate_number if plate_number else "—"
-                    (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-                    cv2.rectangle(annotated, (x1, y1 - th - 10), (x1 + tw + 10, y1), color, -1)
-                    cv2.putText(annotated, label, (x1 + 5, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+                    read_plate(p_crop, det_conf, bbox, annotated)
 
             if writer:
-                writer.write(annotated)
+                with timer.stage("write_video"):
+                    writer.write(annotated)
     finally:
         cap.release()
         if writer:
@@ -517,5 +736,7 @@ def process_video(
         "unique_plates": len(unique_plates),
         "plates_summary": plates_summary,
         "output_video": out_path if save_annotated else None,
+        "profile": profile["name"],
+        "processing_metadata": timer.finish(),
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
@@ -0,0 +1,92 @@
+"""
+Yemen LPR - Pipeline Speed/Accuracy Profiles
+Named profiles (fast, balanced, accurate) bundling the per-request pipeline
+settings: detection thresholds, input resolution cap, OCR pass sets (as
+ai.ocr_policy overrides), debug output and artifact formats. Video requests
+take governorate debug output and plate crops from the profile's "video"
+settings instead (both off by default: they would be written for every frame).
+Defined in config/pipeline_profiles.json; "balanced" is the classic pipeline.
+
+Settings: PIPELINE_PROFILE (default profile, else the config's "default").
+"""
+import copy
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROFILES_PATH = Path(__file__).resolve().parents[1] / "config" / "pipeline_profiles.json"
+
+# Values of a profile that does not set them (the classic pipeline)
+BASE_PROFILE = {
+    "vehicle_conf": 0.4,
+    "plate_conf": 0.4,
+    "max_side": None,  # None = PIPELINE_MAX_SIDE
+    "number_ocr": {},
+    "governorate_ocr": {},
+    "debug_gov": True,
+    "artifacts": {"overlay": "png", "crops": "png", "jpeg_quality": 90},
+    "video": {"debug_gov": False, "crops": "none"},
+}
+
+# Used when config/pipeline_profiles.json is missing
+DEFAULT_CONFIG = {"default": "balanced", "profiles": {"balanced": {}}}
+
+ARTIFACT_FORMATS = ("png", "jpg", "none")
+
+_CONFIG = None
+
+
+def _load():
+    global _CONFIG
+    if _CONFIG is None:
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        try:
+            with open(PROFILES_PATH, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            config["default"] = loaded.get("default", config["default"])
+            config["profiles"].update(loaded.get("profiles", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Invalid pipeline profiles config, using defaults: {e}")
+        _CONFIG = config
+    return _CONFIG
+
+
+def names():
+    return tuple(_load()["profiles"])
+
+
+def default_name():
+    return os.getenv("PIPELINE_PROFILE") or _load()["default"]
+
+
+def get_profile(name=None):
+    """
+    Resolved settings of profile name (default: default_name()), with
+    "name" set. Raises ValueError for unknown profiles.
+    """
+    name = name or default_name()
+    profiles = _load()["profiles"]
+    if name not in profiles:
+        raise ValueError(f"Unknown pipeline profile: {name!r} (expected one of {', '.join(profiles)})")
+    profile = copy.deepcopy(BASE_PROFILE)
+    values = copy.deepcopy(profiles[name])
+    for group in ("artifacts", "video"):
+        profile[group].update(values.pop(group, {}))
+    profile.update(values)
+    profile["name"] = name
+    for group, kind in (("artifacts", "overlay"), ("artifacts", "crops"), ("video", "crops")):
+        if profile[group][kind] not in ARTIFACT_FORMATS:
+            raise ValueError(f"Profile {name!r}: {group}.{kind} must be one of {', '.join(ARTIFACT_FORMATS)}")
+    return profile
+
+
+def imwrite_params(profile):
+    """cv2.imwrite parameters for the profile's JPEG artifacts."""
+    import cv2
+
+    return [cv2.IMWRITE_JPEG_QUALITY, int(profile["artifacts"].get("jpeg_quality", 90))]
@@ -0,0 +1,134 @@
+"""
+Yemen LPR - Per-plate Preprocessing Context
+Grayscale conversion and resizes are computed once per plate and shared by
+number OCR (ai.pipeline) and governorate OCR (ai.gov_detect); sub-regions are
+numpy views of the same grayscale image and CLAHE objects are reused.
+"""
+import threading
+
+import cv2
+
+# Number band: height the plate is scaled to before OCR
+NUMBER_TARGET_HEIGHT = 100
+# Governorate strip: fixed size of the normalized left strip
+GOV_TARGET_SIZE = (60, 80)  # (width, height)
+
+_local = threading.local()
+
+
+def get_clahe(clip_limit, tile_grid):
+    """Reusable CLAHE object (one per thread, since CLAHE objects keep state)."""
+    cache = getattr(_local, "clahe", None)
+    if cache is None:
+        cache = _local.clahe = {}
+    key = (clip_limit, tuple(tile_grid))
+    clahe = cache.get(key)
+    if clahe is None:
+        clahe = cache[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tuple(tile_grid))
+    return clahe
+
+
+class PlateContext:
+    """
+    Grayscale plate image plus cached derived images.
+
+    Sub-regions (bottom band, left strips) are views of the parent's
+    grayscale image, so no pixel data is copied until a variant is built.
+    """
+
+    def __init__(self, img):
+        if img is not None and img.size > 0 and len(img.shape) == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        self.gray = img
+        self._cache = {}
+
+    @classmethod
+    def of(cls, img):
+        """Wrap an image, or return it unchanged if it already is a PlateContext."""
+        return img if isinstance(img, PlateContext) else cls(img)
+
+    @property
+    def size(self):
+        return 0 if self.gray is None else self.gray.size
+
+    @property
+    def shape(self):
+        return self.gray.shape
+
+    def _cached(self, key, build):
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = build()
+        return value
+
+    def _view(self, rows, cols):
+        ctx = PlateContext.__new__(PlateContext)
+        ctx.gray = self.gray[rows, cols]
+        ctx._cache = {}
+        return ctx
+
+    def bottom(self, top_ratio=0.35):
+        """Bottom band (plate number), as a view."""
+        def build():
+            start = int(self.gray.shape[0] * top_ratio)
+            return self._view(slice(start, None), slice(None))
+        return self._cached(("bottom", top_ratio), build)
+
+    def left(self, width_ratio=0.28):
+        """Left strip (governorate code), as a view."""
+        def build():
+            lw = int(self.gray.shape[1] * width_ratio)
+            return self._view(slice(None), slice(None, lw))
+        return self._cached(("left", width_ratio), build)
+
+    def resized(self, width, height):
+        return self._cached(
+            ("resized", width, height),
+            lambda: cv2.resize(self.gray, (width, height), interpolation=cv2.INTER_CUBIC),
+        )
+
+    def resized_to_height(self, height):
+        scale = height / self.gray.shape[0]
+        return self.resized(int(self.gray.shape[1] * scale), height)
+
+    def number_variant(self, variant="standard"):
+        """Preprocessing variant for plate-number OCR (see preprocess_plate_crop)."""
+        if self.size == 0:
+            return None
+        return self._cached(("number", variant), lambda: self._number_variant(variant))
+
+    def _number_variant(self, variant):
+        resized = self.resized_to_height(NUMBER_TARGET_HEIGHT)
+        if variant == "clahe":
+            return get_clahe(2.0, (8, 8)).apply(resized)
+        if variant == "otsu":
+            _, b = cv2.threshold(resized, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return b
+        if variant == "adaptive":
+            return cv2.adaptiveThreshold(
+                resized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            )
+        return resized
+
+    def governorate_variant(self, variant="resize_clahe"):
+        """Preprocessing variant for governorate-code OCR (see preprocess_left_region_variant)."""
+        if self.size == 0:
+            return None
+        return self._cached(("governorate", variant), lambda: self._governorate_variant(variant))
+
+    def _governorate_variant(self, variant):
+        resized = self.resized(*GOV_TARGET_SIZE)
+        if variant == "resize_clahe":
+            return get_clahe(3.0, (4, 4)).apply(resized)
+        if variant == "adaptive_threshold":
+            enhanced = get_clahe(2.0, (4, 4)).apply(resized)
+            return cv2.adaptiveThreshold(
+                enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            )
+        if variant == "bilateral_otsu":
+            bilateral = cv2.bilateralFilter(resized, 9, 75, 75)
+            _, binary = cv2.threshold(bilateral, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return binary
+        if variant == "invert":
+            return get_clahe(2.0, (4, 4)).apply(cv2.bitwise_not(resized))
+        return resized
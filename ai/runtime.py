@@ -0,0 +1,114 @@
+"""
+Yemen LPR - Runtime Thread Budget
+PyTorch (YOLO, EasyOCR), OpenCV and ONNX Runtime each default to one thread
+per core. With several gunicorn workers, each serving several request threads,
+that oversubscribes the CPU: concurrent requests thrash and tail latency
+explodes. apply() divides the cores between all request threads that can run
+inference at once and sets every library's thread count from that budget.
+
+Called at worker start from backend/gunicorn.conf.py (and in the master
+before preloading models). Compare settings with scripts/bench_thread_budget.py.
+
+Settings: CPU_CORES (default: cores available to the process), WEB_CONCURRENCY
+(gunicorn workers), GUNICORN_THREADS (threads per worker); explicit overrides
+RUNTIME_TORCH_THREADS, RUNTIME_TORCH_INTEROP_THREADS, RUNTIME_CV2_THREADS.
+YOLO_ONNX_THREADS / OCR_ONNX_THREADS, when set, still win for ONNX Runtime.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_applied = {}
+
+
+def _env_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def available_cores():
+    """Cores this process may run on (CPU_CORES overrides, e.g. for cgroup quotas)."""
+    cores = _env_int("CPU_CORES")
+    if cores:
+        return cores
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def budget(workers=None, threads=None, cores=None):
+    """
+    Thread counts for one worker process.
+
+    Every request thread of every worker may run inference concurrently, so
+    each gets cores / (workers * threads) intra-op threads (at least 1).
+    """
+    workers = max(int(workers or _env_int("WEB_CONCURRENCY", 1)), 1)
+    threads = max(int(threads or _env_int("GUNICORN_THREADS", 1)), 1)
+    cores = max(int(cores or available_cores()), 1)
+    per_thread = max(cores // (workers * threads), 1)
+    return {
+        "cores": cores,
+        "workers": workers,
+        "threads": threads,
+        "torch_threads": _env_int("RUNTIME_TORCH_THREADS", per_thread),
+        "torch_interop_threads": _env_int("RUNTIME_TORCH_INTEROP_THREADS", 1),
+        "cv2_threads": _env_int("RUNTIME_CV2_THREADS", per_thread),
+        "onnx_threads": per_thread,
+    }
+
+
+def set_threads(torch_threads, torch_interop_threads=None, cv2_threads=None, onnx_threads=None):
+    """Apply thread counts to torch, OpenCV and the ONNX Runtime sessions created from now on."""
+    import cv2
+
+    from ai import ocr_engine, yolo_backend
+
+    try:
+        import torch
+
+        torch.set_num_threads(max(int(torch_threads), 1))
+        if torch_interop_threads:
+            try:
+                torch.set_num_interop_threads(int(torch_interop_threads))
+            except RuntimeError:
+                # Only allowed before the first inter-op parallel work in the process
+                pass
+    except ImportError:
+        pass
+
+    if cv2_threads is not None:
+        cv2.setNumThreads(int(cv2_threads))
+
+    if onnx_threads:
+        if not os.getenv("YOLO_ONNX_THREADS"):
+            yolo_backend.ONNX_THREADS = int(onnx_threads)
+        if not os.getenv("OCR_ONNX_THREADS"):
+            ocr_engine.ONNX_THREADS = int(onnx_threads)
+
+
+def apply(workers=None, threads=None, cores=None):
+    """Compute the budget for this worker and apply it. Returns the budget."""
+    plan = budget(workers, threads, cores)
+    with _lock:
+        set_threads(
+            plan["torch_threads"], plan["torch_interop_threads"], plan["cv2_threads"], plan["onnx_threads"]
+        )
+        _applied.clear()
+        _applied.update(plan, pid=os.getpid())
+    logger.info(
+        f"Thread budget: {plan['cores']} cores / ({plan['workers']} workers x {plan['threads']} threads) -> "
+        f"torch {plan['torch_threads']} (+{plan['torch_interop_threads']} inter-op), "
+        f"cv2 {plan['cv2_threads']}, onnx {plan['onnx_threads']}"
+    )
+    return plan
+
+
+def get_stats():
+    """The budget applied in this process ({} if apply() was never called)."""
+    with _lock:
+        return dict(_applied)
@@ -0,0 +1,179 @@
+"""
+Yemen LPR - OCR Variant Win Statistics
+Counts, per OCR target, how often each preprocessing pass ran and how often it
+produced the selected result. Counters are persisted to JSON and used by
+ai.ocr_policy to run the most productive passes first and to drop passes that
+rarely win when they run (still re-tried now and then, so they can recover).
+
+Persistence: output/variant_stats.json (OCR_VARIANT_STATS_PATH, relative to
+the repository root), flushed every OCR_VARIANT_STATS_FLUSH records and at
+exit. Several worker processes can share the file: each flush merges this
+process's new counts into it under a lock.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("OCR_VARIANT_STATS", "true").lower() == "true"
+STATS_PATH = Path(os.getenv("OCR_VARIANT_STATS_PATH", "output/variant_stats.json"))
+if not STATS_PATH.is_absolute():
+    STATS_PATH = Path(__file__).resolve().parents[1] / STATS_PATH
+FLUSH_EVERY = int(os.getenv("OCR_VARIANT_STATS_FLUSH", "50"))
+
+_lock = threading.Lock()
+_persisted = None  # {target: {pass_key: {"runs": n, "wins": n}}} as last read from disk
+_pending = {}  # counts recorded since the last flush
+_pending_records = 0
+_order_calls = {}  # order_passes() calls per target, for re-trying pruned passes
+
+
+def pass_key(p):
+    """Stable string key for a policy pass ("standard" or [0.28, "invert"] -> "0.28/invert")."""
+    if isinstance(p, (list, tuple)):
+        return "/".join(str(x) for x in p)
+    return str(p)
+
+
+def _read_file():
+    try:
+        with open(STATS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Invalid variant stats file, starting fresh: {e}")
+        return {}
+
+
+def _merge(into, counts):
+    for target, passes in counts.items():
+        dst = into.setdefault(target, {})
+        for key, c in passes.items():
+            d = dst.setdefault(key, {"runs": 0, "wins": 0})
+            d["runs"] += c.get("runs", 0)
+            d["wins"] += c.get("wins", 0)
+    return into
+
+
+def _ensure_loaded():
+    global _persisted
+    if _persisted is None:
+        _persisted = _read_file()
+
+
+def snapshot(target=None):
+    """Current counters (persisted + not yet flushed), optionally for one target."""
+    with _lock:
+        _ensure_loaded()
+        merged = _merge(_merge({}, _persisted), _pending)
+    return merged.get(target, {}) if target else merged
+
+
+def record(target, passes_run, winner=None):
+    """
+    Record one OCR decision.
+
+    Args:
+        target: "number" or "governorate"
+        passes_run: passes that were executed (ai.ocr_policy decision["passes"])
+        winner: pass that produced the selected result, or None
+    """
+    global _pending_records
+    if not ENABLED or not passes_run:
+        return
+    with _lock:
+        counts = _pending.setdefault(target, {})
+        for p in passes_run:
+            counts.setdefault(pass_key(p), {"runs": 0, "wins": 0})["runs"] += 1
+        if winner is not None:
+            counts.setdefault(pass_key(winner), {"runs": 0, "wins": 0})["wins"] += 1
+        _pending_records += 1
+        should_flush = _pending_records >= FLUSH_EVERY
+    if should_flush:
+        flush()
+
+
+def flush():
+    """Merge pending counts into the stats file (atomic replace, file-locked where supported)."""
+    global _persisted, _pending, _pending_records
+    with _lock:
+        if not _pending:
+            return
+        pending, _pending, _pending_records = _pending, {}, 0
+        try:
+            STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(str(STATS_PATH) + ".lock", "w") as lock_file:
+                try:
+                    import fcntl
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                except ImportError:
+                    pass
+                data = _merge(_read_file(), pending)
+                tmp_path = STATS_PATH.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, STATS_PATH)
+            _persisted = data
+        except Exception as e:
+            # Keep the counts for the next attempt
+            _merge(_pending, pending)
+            logger.warning(f"Could not save variant stats: {e}")
+
+
+def order_passes(target, passes, min_runs=200, prune_below=0.0, explore_every=0):
+    """
+    Reorder passes by observed win rate, most productive first.
+
+    Nothing changes until min_runs pass runs have been recorded for target.
+    Win rates (wins / runs of the pass itself) are Laplace-smoothed, so passes
+    without statistics rank like a 50% pass and are still tried. Passes that
+    ran at least min_runs times and win less than prune_below of their own
+    runs are dropped; the best pass is always kept. Because fallback passes
+    only run when earlier ones did not stop early, their share of all wins is
+    always small, so it is deliberately not used for pruning.
+
+    Every explore_every-th call (0 = never) the pruned passes are appended
+    at the end, so their statistics keep updating and they come back if they
+    start winning. Ties keep their configured order.
+    """
+    if not ENABLED or not passes:
+        return list(passes)
+    counts = snapshot(target)
+    total_runs = sum(c["runs"] for c in counts.values())
+    if total_runs < min_runs:
+        return list(passes)
+
+    def win_rate(p):
+        c = counts.get(pass_key(p))
+        if not c or not c["runs"]:
+            return None
+        return (c["wins"] + 1) / (c["runs"] + 2)
+
+    def sort_key(p):
+        rate = win_rate(p)
+        return -(0.5 if rate is None else rate)
+
+    ranked = sorted(passes, key=sort_key)
+    if prune_below > 0:
+        kept, pruned = [ranked[0]], []
+        for p in ranked[1:]:
+            c = counts.get(pass_key(p))
+            if c and c["runs"] >= min_runs and c["wins"] / c["runs"] < prune_below:
+                pruned.append(p)
+            else:
+                kept.append(p)
+        if pruned and explore_every > 0:
+            with _lock:
+                calls = _order_calls[target] = _order_calls.get(target, 0) + 1
+            if calls % explore_every == 0:
+                kept.extend(pruned)
+        ranked = kept
+    return ranked
+
+
+atexit.register(flush)
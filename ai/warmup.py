@@ -0,0 +1,257 @@
+"""
+Yemen LPR - Model Warmup
+Loads the YOLO models and the OCR reader before the first request and runs one
+dummy inference through each, so the first user after a deploy or worker
+restart does not pay model loading and first-inference costs.
+
+backend/gunicorn.conf.py calls this at boot: with preload_app the models are
+loaded once in the master (load_models) and each worker only runs the dummy
+inference after fork; otherwise every worker loads and warms up in post_fork.
+status() backs the readiness endpoint and never loads anything itself.
+
+Before fork, share_memory() can move the torch weights of the loaded models
+into shared memory (PRELOAD_SHARE_MEMORY); by default workers share them
+through copy-on-write, which measured lower with scripts/report_worker_memory.py.
+
+Settings: WARMUP_MODELS (background | blocking | off), PRELOAD_SHARE_MEMORY.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODE = os.getenv("WARMUP_MODELS", "background").lower()
+SHARE_MEMORY = os.getenv("PRELOAD_SHARE_MEMORY", "false").lower() == "true"
+
+# Without these the service cannot answer requests; vehicle models are optional
+REQUIRED = ("plate_detector", "ocr")
+
+_lock = threading.Lock()
+_run_lock = threading.Lock()
+_thread = None
+_status = {"state": "not_started", "started_at": None, "finished_at": None}
+_models = {}
+
+
+def _set(name, **fields):
+    with _lock:
+        _models.setdefault(name, {"state": "not_loaded"}).update(fields)
+
+
+def _components():
+    """name -> (load, last_error, dummy inference) for every configured model."""
+    from ai import detector, inference, ocr_engine, ocr_pool, pipeline
+
+    components = {
+        "vehicle_seg": (
+            inference.get_seg_model,
+            inference.get_model_error,
+            lambda img, band: inference.segment_vehicles(img),
+        ),
+        "plate_detector": (
+            detector.get_model,
+            detector.get_model_error,
+            lambda img, band: pipeline.detect_plates_on_image(img),
+        ),
+    }
+    if os.getenv("YOLO_VEHICLE_BOX_MODEL_PATH"):
+        components["vehicle_box"] = (
+            inference.get_vehicle_box_model,
+            inference.get_vehicle_box_model_error,
+            lambda img, band: inference.detect_vehicle_boxes(img),
+        )
+    if ocr_pool.enabled():
+        # Readers live in the OCR worker processes and are loaded by the warmup
+        # batch; the pool itself must not be created before gunicorn forks
+        components["ocr"] = (
+            lambda: ocr_pool,
+            lambda: None,
+            lambda img, band: ocr_pool.get_pool().warmup([band]),
+        )
+    else:
+        components["ocr"] = (
+            ocr_engine.get_profile_reader,
+            lambda: None,
+            lambda img, band: ocr_engine.read_regions([band]),
+        )
+    return components
+
+
+def _dummy_inputs():
+    import cv2
+    import numpy as np
+
+    img = np.full((640, 640, 3), 114, np.uint8)
+    band = np.full((60, 220), 255, np.uint8)
+    cv2.putText(band, "12345", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3)
+    return img, band
+
+
+def load_models():
+    """Load every configured model without running inference (safe to repeat)."""
+    for name, (load, last_error, _) in _components().items():
+        if _models.get(name, {}).get("state") in ("loaded", "ready"):
+            continue
+        _set(name, state="loading")
+        started = time.perf_counter()
+        try:
+            model, error = load(), None
+        except Exception as e:
+            model, error = None, str(e)
+        seconds = round(time.perf_counter() - started, 3)
+        if model is None:
+            _set(name, state="unavailable", error=error or last_error(), load_seconds=seconds)
+            logger.warning(f"Warmup: {name} unavailable: {error or last_error()}")
+        else:
+            _set(name, state="loaded", error=None, load_seconds=seconds, pid=os.getpid())
+
+
+def _torch_modules():
+    """(component, torch module) for every loaded model that runs on PyTorch."""
+    from ai import ocr_engine
+
+    modules, seen = [], set()
+    for name, (load, _, _) in _components().items():
+        if name == "ocr" or _models.get(name, {}).get("state") not in ("loaded", "ready"):
+            continue
+        module = getattr(load(), "model", None)  # Ultralytics YOLO; None for ONNX Runtime
+        if hasattr(module, "share_memory") and id(module) not in seen:
+            seen.add(id(module))
+            modules.append((name, module))
+    for reader in ocr_engine.loaded_readers():
+        for part in ("detector", "recognizer"):
+            module = getattr(reader, part, None)
+            if hasattr(module, "share_memory"):
+                modules.append(("ocr", module))
+    return modules
+
+
+def _release_free_heap():
+    # Return the freed private weight copies to the OS; otherwise workers
+    # allocate into those inherited pages and copy them on first write
+    try:
+        import ctypes
+
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except Exception:
+        pass
+
+
+def share_memory():
+    """
+    Move parameters and buffers of the loaded torch models into shared memory.
+    Called in a preloading master before fork: workers then map the same
+    weight pages instead of relying on copy-on-write of private heap pages.
+    Returns the number of bytes moved; models that fail (e.g. /dev/shm too
+    small) are left as they are.
+    """
+    import itertools
+
+    total = 0
+    for name, module in _torch_modules():
+        try:
+            module.share_memory()
+        except Exception as e:
+            logger.warning(f"Could not move {name} to shared memory: {e}")
+            continue
+        size = sum(t.numel() * t.element_size() for t in itertools.chain(module.parameters(), module.buffers()))
+        total += size
+        _set(name, shared_bytes=_models.get(name, {}).get("shared_bytes", 0) + size)
+    _release_free_heap()
+    logger.info(f"Moved {total / 2 ** 20:.1f} MiB of model weights to shared memory")
+    return total
+
+
+def run_inference():
+    """One dummy inference per loaded model; records the warmup latency."""
+    img, band = _dummy_inputs()
+    for name, (_, _, infer) in _components().items():
+        if _models.get(name, {}).get("state") not in ("loaded", "ready"):
+            continue
+        started = time.perf_counter()
+        try:
+            infer(img, band)
+        except Exception as e:
+            _set(name, state="failed", error=str(e))
+            logger.error(f"Warmup: {name} inference failed: {e}")
+            continue
+        _set(name, state="ready", warmup_ms=round(1000 * (time.perf_counter() - started), 1))
+
+
+def warmup():
+    """Load all models and run the dummy inferences. Returns status()."""
+    with _run_lock:
+        with _lock:
+            _status.update(state="running", started_at=time.time(), finished_at=None)
+        try:
+            load_models()
+            run_inference()
+        except Exception as e:
+            logger.error(f"Warmup failed: {e}")
+        with _lock:
+            ready = all(_models.get(name, {}).get("state") == "ready" for name in REQUIRED)
+            _status.update(state="ready" if ready else "degraded", finished_at=time.time())
+        logger.info(
+            f"Warmup {_status['state']} in {_status['finished_at'] - _status['started_at']:.1f}s: "
+            + ", ".join(f"{n}={m['state']}" for n, m in sorted(_models.items()))
+        )
+    return status()
+
+
+def start(mode=None):
+    """
+    Run warmup according to WARMUP_MODELS: "background" returns immediately
+    (the readiness endpoint reports progress), "blocking" returns when done.
+    """
+    global _thread
+    mode = (mode or MODE).lower()
+    if mode == "off":
+        return None
+    if mode == "blocking":
+        warmup()
+        return None
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=warmup, name="model-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def after_fork():
+    """Reset per-process state inherited from a preloading master."""
+    global _thread
+    with _lock:
+        _thread = None
+        for info in _models.values():
+            if info.get("state") == "ready":
+                info["state"] = "loaded"  # inference state (threads, JIT) is per process
+        _status.update(state="not_started", started_at=None, finished_at=None)
+
+
+def is_ready():
+    return _status["state"] == "ready"
+
+
+def models_loaded():
+    """True once the required models are loaded in this process (never loads)."""
+    with _lock:
+        return all(_models.get(name, {}).get("state") in ("loaded", "ready") for name in REQUIRED)
+
+
+def status():
+    """Readiness report: overall state plus per-model load state and timings."""
+    from ai import runtime
+
+    with _lock:
+        started, finished = _status["started_at"], _status["finished_at"]
+        return {
+            "ready": _status["state"] == "ready",
+            "state": _status["state"],
+            "mode": MODE,
+            "pid": os.getpid(),
+            "duration_seconds": round(finished - started, 3) if started and finished else None,
+            "models": {name: dict(info) for name, info in sorted(_models.items())},
+            "threads": runtime.get_stats(),
+        }
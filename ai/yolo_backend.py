@@ -0,0 +1,249 @@
+"""
+Yemen LPR - YOLO Model Backends
+Plate detection and vehicle segmentation run either through Ultralytics
+(PyTorch .pt weights) or through ONNX Runtime on models exported with
+scripts/export_yolo_onnx.py. Both backends return the same Detections, so
+ai.detector, ai.inference and ai.pipeline do not depend on the backend.
+
+Settings: YOLO_BACKEND (ultralytics | onnx), YOLO_DETECT_ONNX_PATH,
+YOLO_SEG_ONNX_PATH (default: the .pt path with an .onnx suffix),
+YOLO_ONNX_THREADS (intra-op threads, 0 = ONNX Runtime default).
+"""
+import ast
+import logging
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("YOLO_BACKEND", "ultralytics").lower()
+ONNX_THREADS = int(os.getenv("YOLO_ONNX_THREADS", "0"))
+
+# Same defaults as Ultralytics predict()
+IOU_THRESHOLD = 0.7
+MAX_DET = 300
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+class Detections:
+    """
+    Detections of one image in original image coordinates.
+
+    boxes: (N, 4) float xyxy; confs: (N,); classes: (N,) int;
+    masks: (N, mh, mw) float masks covering the whole image (any resolution),
+    or None for detection-only models.
+    """
+
+    def __init__(self, boxes, confs, classes, masks=None):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.confs = np.asarray(confs, dtype=np.float32).reshape(-1)
+        self.classes = np.asarray(classes, dtype=np.int64).reshape(-1)
+        self.masks = masks
+
+    def __len__(self):
+        return len(self.boxes)
+
+    @classmethod
+    def from_ultralytics(cls, result):
+        boxes = result.boxes
+        if boxes is None:
+            return cls(np.zeros((0, 4)), [], [])
+        masks = None
+        if result.masks is not None:
+            masks = _strip_letterbox(result.masks.data.cpu().numpy(), result.orig_shape)
+        return cls(
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy(),
+            masks,
+        )
+
+
+def _strip_letterbox(masks, orig_shape):
+    """
+    Crop the letterbox padding off masks at model input resolution (as
+    Ultralytics returns them), so they cover exactly the original image.
+    """
+    if masks.ndim != 3 or not len(masks):
+        return masks
+    mh, mw = masks.shape[1:]
+    h, w = orig_shape[:2]
+    gain = min(mh / h, mw / w)
+    pad_x, pad_y = (mw - w * gain) / 2, (mh - h * gain) / 2
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    bottom, right = mh - int(round(pad_y + 0.1)), mw - int(round(pad_x + 0.1))
+    return masks[:, top:bottom, left:right]
+
+
+def letterbox(img, size):
+    """Resize keeping aspect ratio and pad to size x size. Returns (image, ratio, (pad_x, pad_y))."""
+    h, w = img.shape[:2]
+    r = min(size / h, size / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    if (nw, nh) != (w, h):
+        img = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - nw) / 2, (size - nh) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return img, r, (left, top)
+
+
+def _nms(boxes, scores, classes, iou):
+    # Class-aware NMS: offset boxes per class so classes never suppress each other
+    offset = classes[:, None].astype(np.float32) * 7680.0
+    b = boxes + offset
+    rects = np.column_stack([b[:, 0], b[:, 1], b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]])
+    keep = cv2.dnn.NMSBoxes(rects.tolist(), scores.tolist(), 0.0, iou)
+    keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+    return keep[np.argsort(-scores[keep], kind="stable")][:MAX_DET]
+
+
+class OnnxYOLO:
+    """YOLOv8 detect/segment model exported to ONNX, run with ONNX Runtime."""
+
+    def __init__(self, path, intra_op_threads=None):
+        import onnxruntime as ort
+
+        if intra_op_threads is None:
+            intra_op_threads = ONNX_THREADS
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.inter_op_num_threads = 1
+        if intra_op_threads:
+            opts.intra_op_num_threads = int(intra_op_threads)
+        self.path = str(path)
+        self.session = ort.InferenceSession(self.path, opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+        imgsz = ast.literal_eval(meta["imgsz"]) if "imgsz" in meta else [640, 640]
+        self.imgsz = int(max(imgsz))
+        self.task = meta.get("task") or ("segment" if len(self.session.get_outputs()) > 1 else "detect")
+
+    def __repr__(self):
+        return f"OnnxYOLO({self.path!r}, task={self.task!r})"
+
+    def predict(self, images, conf=0.25, iou=IOU_THRESHOLD, masks=True):
+        """
+        Run on a list of BGR images (one batch). Returns one Detections per image.
+        masks=False skips mask decoding of segment models (boxes only).
+        """
+        batch, metas = [], []
+        for img in images:
+            lb, r, pad = letterbox(img, self.imgsz)
+            batch.append(lb[:, :, ::-1].transpose(2, 0, 1))  # BGR HWC -> RGB CHW
+            metas.append((img.shape[:2], r, pad))
+        x = np.ascontiguousarray(np.stack(batch), dtype=np.float32) / 255.0
+        outputs = self.session.run(None, {self.input_name: x})
+        preds = outputs[0]  # (B, 4 + nc [+ nm], anchors)
+        protos = outputs[1] if len(outputs) > 1 else None
+        nm = protos.shape[1] if protos is not None else 0
+        if not masks:
+            protos = None
+        nc = preds.shape[1] - 4 - nm
+        return [
+            self._postprocess(preds[i].T, protos[i] if protos is not None else None, nc, conf, iou, metas[i])
+            for i in range(len(images))
+        ]
+
+    def _postprocess(self, pred, proto, nc, conf, iou, meta):
+        (h, w), r, (pad_x, pad_y) = meta
+        scores_all = pred[:, 4:4 + nc]
+        classes = scores_all.argmax(axis=1)
+        scores = scores_all[np.arange(len(pred)), classes]
+        keep = scores > conf
+        pred, scores, classes = pred[keep], scores[keep], classes[keep]
+        if not len(pred):
+            return Detections(np.zeros((0, 4)), [], [], None if proto is None else np.zeros((0, 1, 1)))
+
+        cx, cy, bw, bh = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+        boxes_in = np.column_stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2])
+        keep = _nms(boxes_in, scores, classes, iou)
+        boxes_in, scores, classes = boxes_in[keep], scores[keep], classes[keep]
+
+        boxes = boxes_in.copy()
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / r).clip(0, w)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / r).clip(0, h)
+
+        masks = None
+        if proto is not None:
+            masks = self._masks(proto, pred[keep, 4 + nc:], boxes_in, r, (pad_x, pad_y), (h, w))
+        return Detections(boxes, scores, classes, masks)
+
+    def _masks(self, proto, coeffs, boxes_in, r, pad, shape):
+        """Binary masks at input resolution, cropped to their boxes, letterbox padding removed."""
+        nm, mh, mw = proto.shape
+        masks = 1.0 / (1.0 + np.exp(-(coeffs @ proto.reshape(nm, -1))))
+        masks = masks.reshape(-1, mh, mw)
+        size = self.imgsz
+        (h, w), (pad_x, pad_y) = shape, pad
+        x1, y1 = int(pad_x), int(pad_y)
+        x2, y2 = x1 + int(round(w * r)), y1 + int(round(h * r))
+        rows, cols = np.arange(size)[:, None], np.arange(size)[None, :]
+        out = np.zeros((len(masks), y2 - y1, x2 - x1), dtype=np.float32)
+        for i, m in enumerate(masks):
+            m = cv2.resize(m, (size, size), interpolation=cv2.INTER_LINEAR)
+            bx1, by1, bx2, by2 = boxes_in[i]
+            m = m * ((cols >= bx1) & (cols < bx2) & (rows >= by1) & (rows < by2))
+            out[i] = (m[y1:y2, x1:x2] > 0.5)
+        return out
+
+
+def onnx_path_for(pt_path, env_var):
+    """ONNX model for a .pt weights file: env override, else the sibling .onnx file."""
+    env_path = os.getenv(env_var)
+    if env_path:
+        p = Path(env_path)
+        if not p.is_absolute():
+            p = Path(__file__).resolve().parents[1] / env_path
+        return p
+    return Path(pt_path).with_suffix(".onnx") if pt_path else None
+
+
+def load_model(pt_path, onnx_env_var):
+    """
+    Load a YOLO model with the configured backend.
+    With YOLO_BACKEND=onnx and no exported model, falls back to Ultralytics.
+    """
+    if BACKEND == "onnx" or str(pt_path).endswith(".onnx"):
+        onnx_path = Path(pt_path) if str(pt_path).endswith(".onnx") else onnx_path_for(pt_path, onnx_env_var)
+        if onnx_path is not None and onnx_path.exists():
+            model = OnnxYOLO(onnx_path)
+            logger.info(f"YOLO ONNX model loaded from: {onnx_path}")
+            return model
+        logger.warning(
+            f"YOLO_BACKEND=onnx but {onnx_path} not found (run scripts/export_yolo_onnx.py); using Ultralytics"
+        )
+    from ultralytics import YOLO
+
+    model = YOLO(str(pt_path))
+    model.to("cpu")
+    return model
+
+
+def predict(model, images, conf=0.25, masks=True):
+    """
+    Run a loaded model (Ultralytics or OnnxYOLO) on one image or a list of
+    images. Returns one Detections per image; masks=False drops the masks
+    (and skips decoding them on the ONNX backend).
+    """
+    batch = [images] if isinstance(images, np.ndarray) else list(images)
+    if isinstance(model, OnnxYOLO):
+        return model.predict(batch, conf=conf, masks=masks)
+    results = model.predict(source=batch, device="cpu", conf=conf, verbose=False)
+    dets = [Detections.from_ultralytics(r) for r in results]
+    if not masks:
+        for d in dets:
+            d.masks = None
+    return dets
+
+
+def class_names(model):
+    return getattr(model, "names", {}) or {}
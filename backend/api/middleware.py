@@ -1,9 +1,11 @@
 """
-<<<<<<< HEAD
 API Key Authentication and Rate Limiting for Yemen LPR System
+Also: safe JSON responses for unhandled errors, and request metrics for
+/api/v1/metrics/.
 """
 
 import logging
+import time
 from datetime import datetime
 
 from django.conf import settings
@@ -19,22 +21,10 @@ logger = logging.getLogger(__name__)
 class SecurityHeadersMiddleware:
     """Add X-Frame-Options, CSP when not DEBUG."""
 
-=======
-Safe Exception Handling Middleware
-Catches 500 errors and returns safe JSON responses.
-"""
-from django.http import JsonResponse
-import logging
-
-logger = logging.getLogger(__name__)
-
-class SafeExceptionMiddleware:
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-<<<<<<< HEAD
         response = self.get_response(request)
         if not settings.DEBUG and hasattr(response, "headers"):
             response.setdefault("X-Frame-Options", "DENY")
@@ -62,7 +52,7 @@ class RateLimitMiddleware:
         path = request.path
         if not path.startswith("/api/"):
             return self.get_response(request)
-        if path.startswith("/api/v1/health") or path.startswith("/api/v1/docs") or path.startswith("/api/v1/api-keys/"):
+        if path.startswith(("/api/v1/health", "/api/v1/ready", "/api/v1/metrics", "/api/v1/docs", "/api/v1/api-keys/")):
             return self.get_response(request)
         ip = _get_client_ip(request)
         if is_rate_limited(ip, limit=self.limit):
@@ -129,7 +119,12 @@ class APIKeyMiddleware:
 
         return self.get_response(request)
 
-=======
+
+class SafeExceptionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
         return self.get_response(request)
 
     def process_exception(self, request, exception):
@@ -138,4 +133,42 @@ class APIKeyMiddleware:
             "error": "internal_error",
             "message": "An internal error occurred. Our team has been notified."
         }, status=500)
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
+
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-endpoint request counts, latency histogram and in-flight gauge
+    (ai.metrics). Endpoints are labelled by URL route, not raw path, so
+    label cardinality stays bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        from . import services  # noqa: F401 - puts the repo root (ai package) on sys.path
+        from ai import metrics
+
+        self.requests = metrics.counter(
+            "lpr_http_requests_total", "API requests", ("method", "endpoint", "status")
+        )
+        self.latency = metrics.histogram(
+            "lpr_http_request_duration_seconds", "API request latency", labels=("method", "endpoint")
+        )
+        self.in_flight = metrics.gauge("lpr_http_requests_in_flight", "API requests being served")
+
+    def __call__(self, request):
+        if not request.path.startswith("/api/"):
+            return self.get_response(request)
+        started = time.perf_counter()
+        status = 500
+        self.in_flight.inc()
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self.in_flight.dec()
+            match = getattr(request, "resolver_match", None)
+            endpoint = "/" + match.route if match and match.route else "unmatched"
+            self.requests.inc(method=request.method, endpoint=endpoint, status=status)
+            self.latency.observe(time.perf_counter() - started, method=request.method, endpoint=endpoint)
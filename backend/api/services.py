@@ -5,6 +5,8 @@ Separated from views for better organization and testability
 import os
 import uuid
 import cv2
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -15,19 +17,19 @@ from django.conf import settings
 # Add parent directory to path for AI imports
 sys.path.insert(0, str(settings.BASE_DIR.parent))
 
-<<<<<<< HEAD
-from ai.pipeline import process_image, process_video
+logger = logging.getLogger(__name__)
+
+# Writes original uploads off the request path (thread started on first use)
+_upload_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-writer")
 
-=======
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
 
 class PlateRecognitionService:
     """Service for handling plate recognition operations"""
     
     def __init__(self):
-        self.upload_dir = settings.MEDIA_ROOT / 'uploads'
-        self.results_dir = settings.MEDIA_ROOT / 'results'
-        self.videos_dir = settings.MEDIA_ROOT / 'results'
+        self.upload_dir = Path(settings.MEDIA_ROOT) / 'uploads'
+        self.results_dir = Path(settings.MEDIA_ROOT) / 'results'
+        self.videos_dir = Path(settings.MEDIA_ROOT) / 'results'
         
         # Create directories if they don't exist
         for dir_path in [self.upload_dir, self.results_dir, self.videos_dir]:
@@ -46,6 +48,24 @@ class PlateRecognitionService:
             for chunk in uploaded_file.chunks():
                 f.write(chunk)
         return path, filename
+
+    def persist_original(self, data: bytes, name: str) -> str:
+        """
+        Write an upload's original bytes into uploads/ in the background.
+        Returns the filename it is written to.
+        """
+        ext = os.path.splitext(name)[1] or ".jpg"
+        filename = f"original_{uuid.uuid4().hex}{ext}"
+        _upload_writer.submit(self._write_file, self.upload_dir / filename, data)
+        return filename
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes):
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning(f"Could not keep original upload {path.name}: {e}")
     
     def draw_overlay(self, image_path: Path, detections: List[Dict]) -> Optional[str]:
         """
@@ -83,70 +103,77 @@ class PlateRecognitionService:
         self, 
         uploaded_file, 
         overlay: bool = True,
-        save_crops: bool = True
+        save_crops: Optional[bool] = None,
+        mode: Optional[str] = None,
+        profile: Optional[str] = None
     ) -> Dict:
         """
         Process uploaded image file for plate detection
         
+        mode: one of ai.pipeline.PIPELINE_MODES, None for the server default (PIPELINE_MODE)
+        profile: pipeline profile name (config/pipeline_profiles.json), None for
+        the default; save_crops None leaves crops to the profile
+
+        The upload is decoded in memory (cv2.imdecode in ai.pipeline.load_image);
+        with KEEP_ORIGINAL_UPLOADS the original is written to uploads/ in the
+        background once the request succeeded.
+        
         Returns:
             Dictionary with results and metadata
         """
-<<<<<<< HEAD
-=======
         # Lazy import inside the method to prevent startup loading
         from ai.pipeline import process_image
         
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
-        path, _ = self.save_uploaded_file(uploaded_file, keep_original=True)
-        try:
-            results = process_image(
-                str(path),
-                save_crops=save_crops,
-                crops_dir=self.upload_dir.parent / "crops",
-                logs_dir=Path(__file__).resolve().parents[2] / "output" / "logs",
-                debug_gov=True,
-            )
-            
-            # New structure handling
-            response_data = {
-                "success": True,
-                "results": results.get("plates", []),
-                "vehicles": results.get("vehicles", []),
-                "confidence_summary": results.get("confidence", {}),
-                "plates_found": len(results.get("plates", [])),
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-            }
+        data = uploaded_file.read()
+        results = process_image(
+            data,
+            save_crops=save_crops,
+            crops_dir=self.upload_dir.parent / "crops",
+            logs_dir=Path(__file__).resolve().parents[2] / "output" / "logs",
+            mode=mode,
+            profile=profile,
+        )
+        if getattr(settings, "KEEP_ORIGINAL_UPLOADS", True):
+            self.persist_original(data, uploaded_file.name)
+        
+        # New structure handling
+        response_data = {
+            "success": True,
+            "results": results.get("plates", []),
+            "vehicles": results.get("vehicles", []),
+            "confidence_summary": results.get("confidence", {}),
+            "plates_found": len(results.get("plates", [])),
+            "mode": results.get("mode"),
+            "profile": results.get("profile"),
+            "processing_metadata": results.get("processing_metadata"),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        }
+        
+        if overlay and results.get("processed_image_filename"):
+            response_data["overlay_image_url"] = f"/media/results/{results['processed_image_filename']}"
             
-            if overlay and results.get("processed_image_filename"):
-                response_data["overlay_image_url"] = f"/media/results/{results['processed_image_filename']}"
-                
-            return response_data
-        except Exception:
-            if path.exists():
-                try:
-                    os.remove(path)
-                except Exception:
-                    pass
-            raise
+        return response_data
     
     def process_video_file(
         self,
         uploaded_file,
         skip_frames: int = 2,
-        save_annotated: bool = True
+        save_annotated: Optional[bool] = None,
+        profile: Optional[str] = None
     ) -> Dict:
         """
         Process uploaded video file for plate detection
         
+        profile: pipeline profile name, None for the default; it decides the
+        governorate debug output, plate crops and (with save_annotated None)
+        the annotated video
+        
         Returns:
             Dictionary with results and metadata
         """
-<<<<<<< HEAD
-=======
         # Lazy import inside the method
         from ai.pipeline import process_video
 
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
         ext = os.path.splitext(uploaded_file.name)[1] or ".mp4"
         fn = f"original_video_{uuid.uuid4().hex}{ext}"
         tmp_path = self.upload_dir / fn
@@ -159,7 +186,8 @@ class PlateRecognitionService:
                 output_dir=str(self.videos_dir),
                 skip_frames=skip_frames,
                 save_annotated=save_annotated,
-                debug_gov=False,
+                crops_dir=self.upload_dir.parent / "crops",
+                profile=profile,
             )
             response_data = {
                 "success": True,
@@ -167,6 +195,8 @@ class PlateRecognitionService:
                 "detections_count": result["detections_count"],
                 "unique_plates": result["unique_plates"],
                 "plates_summary": result["plates_summary"],
+                "profile": result.get("profile"),
+                "processing_metadata": result.get("processing_metadata"),
                 "timestamp": result["timestamp"],
             }
             if result.get("output_video"):
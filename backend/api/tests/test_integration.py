@@ -4,6 +4,8 @@ from rest_framework import status
 from rest_framework.test import APIClient
 from PIL import Image
 
+from api.models import APIKey
+
 @pytest.mark.django_db
 class TestAPIIntegration:
     def setup_method(self):
@@ -28,6 +30,28 @@ class TestAPIIntegration:
         assert response.status_code == status.HTTP_200_OK
         assert response.json()['status'] == 'ok'
 
+    def test_metrics(self):
+        """Test the Prometheus metrics endpoint counts API requests."""
+        self.client.get('/api/v1/health/')
+        response = self.client.get('/api/v1/metrics/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'lpr_http_requests_total{method="GET",endpoint="/api/v1/health/",status="200"}' in body
+        assert '# TYPE lpr_pipeline_stage_seconds histogram' in body
+
+    def test_metrics_ocr_engines(self):
+        """OCR engine and Tesseract digit engine stats are part of the metrics."""
+        from ai import digit_engines, ocr_engine
+
+        ocr_engine._count("recognize_calls")
+        digit_engines.get_digit_engine()
+        body = self.client.get('/api/v1/metrics/').content.decode()
+        assert 'lpr_ocr_engine_calls_total{call="recognize"}' in body
+        assert '# TYPE lpr_ocr_reader_load_seconds gauge' in body
+        if digit_engines.get_stats()["engine"]:
+            assert 'lpr_digit_engine_calls_total{engine=' in body
+
     def test_predict_image_missing_auth(self):
         """Test prediction without API key should fail (if auth enabled)."""
         response = self.client.post('/api/v1/predict/image/')
@@ -36,8 +60,10 @@ class TestAPIIntegration:
 
     def test_predict_image_invalid_file(self):
         """Test sending invalid data."""
-        # Bypassing auth via mock or assuming test env allows
-        response = self.client.post('/api/v1/predict/image/', {}, format='multipart')
+        key = APIKey.objects.create(name="test")
+        response = self.client.post(
+            '/api/v1/predict/image/', {}, format='multipart', HTTP_X_API_KEY=str(key.key)
+        )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
     # Note: Full flow requires actual model weights loaded which might not be available in CI env
@@ -0,0 +1,81 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Repo root (ai package), as api.services does
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from ai.pipeline import load_image
+
+
+def encode(image, fmt, **params):
+    buf = io.BytesIO()
+    image.save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+def gradient(w=60, h=40, mode='RGB'):
+    """Image whose columns differ, so orientation and channel order are checkable."""
+    arr = np.zeros((h, w, 3), np.uint8)
+    arr[:, :, 0] = np.linspace(0, 255, w, dtype=np.uint8)[None, :]
+    arr[:, :, 2] = 200
+    return Image.fromarray(arr).convert(mode)
+
+
+class TestLoadImage:
+    """In-memory decoding of uploads (ai.pipeline.load_image)."""
+
+    @pytest.mark.parametrize('fmt', ['PNG', 'JPEG', 'BMP'])
+    def test_bytes_match_file(self, fmt, tmp_path):
+        data = encode(gradient(), fmt)
+        path = tmp_path / f'upload.{fmt.lower()}'
+        path.write_bytes(data)
+        from_bytes = load_image(data)
+        assert from_bytes.shape == (40, 60, 3)
+        assert from_bytes.dtype == np.uint8
+        assert np.array_equal(from_bytes, load_image(str(path)))
+        assert np.array_equal(load_image(bytearray(data)), from_bytes)
+        assert np.array_equal(load_image(memoryview(data)), from_bytes)
+
+    def test_bgr_channel_order(self):
+        img = load_image(encode(gradient(), 'PNG'))
+        # red ramp from PIL's RGB ends up in channel 2 (BGR), constant blue in channel 0
+        assert (img[:, :, 0] == 200).all()
+        assert img[0, -1, 2] == 255
+
+    def test_alpha_and_grayscale_become_bgr(self):
+        rgba = load_image(encode(gradient(mode='RGBA'), 'PNG'))
+        gray = load_image(encode(gradient(mode='L'), 'PNG'))
+        assert rgba.shape == gray.shape == (40, 60, 3)
+        assert np.array_equal(rgba, load_image(encode(gradient(), 'PNG')))
+
+    def test_exif_orientation_applied_like_imread(self, tmp_path):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90 degrees clockwise on display
+        data = encode(gradient(), 'JPEG', exif=exif)
+        path = tmp_path / 'rotated.jpg'
+        path.write_bytes(data)
+        img = load_image(data)
+        assert img.shape == (60, 40, 3)
+        assert np.array_equal(img, load_image(str(path)))
+
+    def test_arrays(self):
+        bgr = np.zeros((10, 20, 3), np.uint8)
+        assert load_image(bgr) is bgr
+        assert load_image(np.zeros((10, 20), np.uint8)).shape == (10, 20, 3)
+        assert load_image(np.zeros((10, 20, 4), np.uint8)).shape == (10, 20, 3)
+        with pytest.raises(ValueError):
+            load_image(np.zeros((10, 20, 2), np.uint8))
+
+    @pytest.mark.parametrize('data', [b'', b'not an image', encode(gradient(), 'PNG')[:50]])
+    def test_undecodable_bytes_raise_value_error(self, data):
+        with pytest.raises(ValueError):
+            load_image(data)
+
+    def test_missing_file_raises_value_error(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_image(str(tmp_path / 'missing.jpg'))
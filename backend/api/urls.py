@@ -6,6 +6,8 @@ from . import views
 
 urlpatterns = [
     path('health/', views.health_check, name='health'),
+    path('ready/', views.readiness, name='readiness'),
+    path('metrics/', views.metrics, name='metrics'),
     path('predict/image/', views.predict_image, name='predict_image'),
     path('predict/video/', views.predict_video, name='predict_video'),
     path('docs/', views.api_docs, name='api_docs'),
@@ -9,26 +9,41 @@ from rest_framework.parsers import MultiPartParser, JSONParser
 from rest_framework.response import Response
 from rest_framework import status
 
-<<<<<<< HEAD
-from .services import PlateRecognitionService, ResponseFormatter
-=======
 from .services import ResponseFormatter
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
 from .models import APIKey
 from .upload_validation import validate_image_upload, validate_video_upload
 import secrets
 
 DEBUG_KEYS = {"debug_info", "debug_url", "region_paths", "processing_metadata", "raw_reads"}
 
-<<<<<<< HEAD
-# Initialize service
-plate_service = PlateRecognitionService()
-=======
 # Initialize formatter (safe, no AI deps)
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
 formatter = ResponseFormatter()
 
 
+def _mode_error(request):
+    """400 response for an unknown 'mode' field, else None."""
+    from ai.pipeline import PIPELINE_MODES
+    mode = request.data.get("mode") or None
+    if mode is not None and mode not in PIPELINE_MODES:
+        body, sc = formatter.error(
+            "Invalid mode", f"'mode' must be one of: {', '.join(PIPELINE_MODES)}"
+        )
+        return Response(body, status=sc)
+    return None
+
+
+def _profile_error(request):
+    """400 response for an unknown 'profile' field, else None."""
+    from ai import pipeline_profiles
+    profile = request.data.get("profile") or None
+    if profile is not None and profile not in pipeline_profiles.names():
+        body, sc = formatter.error(
+            "Invalid profile", f"'profile' must be one of: {', '.join(pipeline_profiles.names())}"
+        )
+        return Response(body, status=sc)
+    return None
+
+
 def _strip_debug(data):
     if settings.DEBUG:
         return data
@@ -42,13 +57,31 @@ def _strip_debug(data):
 
 @api_view(['GET'])
 def health_check(request):
-<<<<<<< HEAD
-    """Health check endpoint."""
-    return Response(formatter.health_check(model_loaded=True))
-=======
     """Health check endpoint. NO AI LOADING HERE."""
-    return Response(formatter.health_check(model_loaded=False))
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
+    from ai import warmup
+    return Response(formatter.health_check(model_loaded=warmup.models_loaded()))
+
+
+@api_view(['GET'])
+def readiness(request):
+    """
+    Readiness endpoint: 200 once this worker has loaded and warmed up its
+    models (see backend/gunicorn.conf.py), 503 before. NO AI LOADING HERE.
+    """
+    from ai import warmup
+    data = warmup.status()
+    return Response(data, status=status.HTTP_200_OK if data["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@api_view(['GET'])
+def metrics(request):
+    """
+    Prometheus text-format metrics of the worker serving the scrape:
+    requests, pipeline stage timings, OCR passes and cache, model load
+    times, OCR queue depth, process memory. NO AI LOADING HERE.
+    """
+    from ai import metrics as ai_metrics
+    return HttpResponse(ai_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @api_view(['POST'])
@@ -56,26 +89,15 @@ def health_check(request):
 def predict_image(request):
     """
     Process an image for license plate detection.
-<<<<<<< HEAD
-    
-    POST /api/v1/predict/image/
-    - file: Image file (JPEG, PNG, WebP)
-    - overlay: Whether to generate annotated image (default: true)
-    - X-API-Key: API key for authentication (optional during development)
-=======
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
     """
     if "file" not in request.FILES:
         body, sc = formatter.error("No file provided", "Please provide an image file in the 'file' field")
         return Response(body, status=sc)
 
-<<<<<<< HEAD
-=======
     # Lazy import to prevent startup bottlenecks
     from .services import PlateRecognitionService
     plate_service = PlateRecognitionService()
 
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
     uploaded_file = request.FILES["file"]
     err, sc = validate_image_upload(uploaded_file)
     if err is not None:
@@ -83,12 +105,17 @@ def predict_image(request):
         return Response(body, status=sc)
 
     overlay = request.data.get("overlay", "true").lower() == "true"
+    mode = request.data.get("mode") or None
+    error_response = _mode_error(request) or _profile_error(request)
+    if error_response is not None:
+        return error_response
 
     try:
         response_data = plate_service.process_image_file(
             uploaded_file,
             overlay=overlay,
-            save_crops=True
+            mode=mode,
+            profile=request.data.get("profile") or None
         )
         
         if "overlay_image_url" in response_data:
@@ -159,6 +186,42 @@ def api_docs(request):
             </div>
         </div>
 
+        <div class="endpoint">
+            <span class="method get">GET</span>
+            <h3>/api/v1/ready/</h3>
+            <p><strong>Description:</strong> Readiness check: 200 once models are loaded and warmed up, 503 before</p>
+            <div class="code-block">
+{
+  "ready": true,
+  "state": "ready",
+  "mode": "background",
+  "pid": 12,
+  "duration_seconds": 9.84,
+  "models": {
+    "ocr": {"state": "ready", "load_seconds": 6.1, "warmup_ms": 310.4},
+    "plate_detector": {"state": "ready", "load_seconds": 0.42, "warmup_ms": 95.2},
+    "vehicle_seg": {"state": "ready", "load_seconds": 0.51, "warmup_ms": 180.7}
+  }
+}
+            </div>
+        </div>
+
+        <div class="endpoint">
+            <span class="method get">GET</span>
+            <h3>/api/v1/metrics/</h3>
+            <p><strong>Description:</strong> Prometheus text-format metrics of the worker serving the scrape</p>
+            <div class="code-block">
+# TYPE lpr_http_requests_total counter
+lpr_http_requests_total{method="POST",endpoint="/api/v1/predict/image/",status="200"} 42
+# TYPE lpr_pipeline_stage_seconds histogram
+lpr_pipeline_stage_seconds_bucket{pipeline="image",stage="ocr_number",le="0.5"} 40
+# TYPE lpr_ocr_cache_hit_ratio gauge
+lpr_ocr_cache_hit_ratio 0.31
+# TYPE lpr_process_resident_memory_bytes gauge
+lpr_process_resident_memory_bytes 1210056704
+            </div>
+        </div>
+
         <div class="endpoint">
             <span class="method post">POST</span>
             <h3>/api/v1/predict/image/</h3>
@@ -188,6 +251,18 @@ def api_docs(request):
                     <td>No</td>
                     <td>Generate annotated image (default: true)</td>
                 </tr>
+                <tr>
+                    <td>mode</td>
+                    <td>String</td>
+                    <td>No</td>
+                    <td>vehicles_first (vehicle masks, default), plates_first (plates on the full image, vehicles by box) or plates_only (no vehicle detection). plates_first is only cheaper than vehicles_first with a detect-only vehicle model (YOLO_VEHICLE_BOX_MODEL_PATH) or the ONNX backend; otherwise the segmentation model still computes masks</td>
+                </tr>
+                <tr>
+                    <td>profile</td>
+                    <td>String</td>
+                    <td>No</td>
+                    <td>fast, balanced (default) or accurate: thresholds, OCR passes, resolution cap, debug output and artifact formats</td>
+                </tr>
             </table>
             <p><strong>Success Response (200):</strong></p>
             <div class="code-block">
@@ -209,6 +284,8 @@ def api_docs(request):
     }
   ],
   "plates_found": 1,
+  "mode": "vehicles_first",
+  "profile": "balanced",
   "timestamp": "2026-01-23T18:42:32.212159",
   "overlay_image_url": "http://localhost:8000/media/results/result_xxxxxxxx.png"
 }
@@ -244,6 +321,12 @@ def api_docs(request):
                     <td>No</td>
                     <td>Process every nth frame (default: 2)</td>
                 </tr>
+                <tr>
+                    <td>profile</td>
+                    <td>String</td>
+                    <td>No</td>
+                    <td>fast, balanced (default) or accurate</td>
+                </tr>
             </table>
         </div>
     </div>
@@ -340,26 +423,15 @@ def create_api_key(request):
 def predict_video(request):
     """
     Process a video for license plate detection.
-<<<<<<< HEAD
-    
-    POST /api/v1/predict/video/
-    - file: Video file (MP4, AVI, MOV)
-    - skip_frames: Process every nth frame (default: 2)
-    - X-API-Key: API key for authentication (optional during development)
-=======
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
     """
     if "file" not in request.FILES:
         body, sc = formatter.error("No file provided", "Please provide a video file in the 'file' field")
         return Response(body, status=sc)
 
-<<<<<<< HEAD
-=======
     # Lazy import to prevent startup bottlenecks
     from .services import PlateRecognitionService
     plate_service = PlateRecognitionService()
 
->>>>>>> 1ac0cac23aeaa4d1df9946be393595cfb8b764f9
     uploaded_file = request.FILES["file"]
     err, sc = validate_video_upload(uploaded_file)
     if err is not None:
@@ -367,10 +439,14 @@ def predict_video(request):
         return Response(body, status=sc)
 
     skip_frames = int(request.data.get("skip_frames", 2))
+    error_response = _profile_error(request)
+    if error_response is not None:
+        return error_response
 
     try:
         response_data = plate_service.process_video_file(
-            uploaded_file, skip_frames=skip_frames, save_annotated=True
+            uploaded_file, skip_frames=skip_frames,
+            profile=request.data.get("profile") or None
         )
         if "processed_video_url" in response_data:
             base_url = request.build_absolute_uri("/").rstrip("/")
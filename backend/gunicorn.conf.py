@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for the Yemen LPR API.
+
+Models are warmed up at boot (ai.warmup, WARMUP_MODELS). With
+GUNICORN_PRELOAD=true the app and the models are loaded once in the master
+before workers fork, and the Python heap is frozen so that workers keep
+sharing those pages copy-on-write (PRELOAD_SHARE_MEMORY=true additionally
+moves torch weights to shared memory); each worker then only runs the
+warmup inference.
+Compare memory with scripts/report_worker_memory.py.
+Readiness: GET /api/v1/ready/ (503 until the worker is warmed up).
+
+Torch, OpenCV and ONNX Runtime threads are budgeted per worker from the core,
+worker and thread counts (ai.runtime).
+
+Command-line flags (--workers, --threads, --timeout, ...) override values here.
+"""
+import gc
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+
+def on_starting(server):
+    if server.cfg.preload_app:
+        from ai import runtime, warmup
+
+        runtime.apply(workers=server.cfg.workers, threads=server.cfg.threads)
+        warmup.load_models()
+        if warmup.SHARE_MEMORY:
+            warmup.share_memory()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        # Keep the GC from touching (and so copying) objects inherited by workers
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    from ai import runtime, warmup
+
+    runtime.apply(workers=server.cfg.workers, threads=server.cfg.threads)
+    if server.cfg.preload_app:
+        warmup.after_fork()
+    warmup.start()
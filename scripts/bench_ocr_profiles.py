@@ -0,0 +1,107 @@
+"""
+Measure memory and latency of the OCR profiles (ai.ocr_engine.PROFILES).
+
+Every profile is loaded in a fresh Python process, so the reported RSS is
+not shared between profiles. Latency is the mean recognize-only time per
+plate-number band, over the given plate crops (or synthetic bands).
+
+Usage:
+    python scripts/bench_ocr_profiles.py [--images <plates_dir>] [--repeat 20]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+
+
+def load_bands(images_dir, count=8):
+    from ai.preprocess import PlateContext
+
+    bands = []
+    if images_dir:
+        for path in sorted(Path(images_dir).iterdir()):
+            if path.suffix.lower() in IMAGE_EXTS:
+                img = cv2.imread(str(path))
+                if img is not None:
+                    bands.append(PlateContext(img).bottom(0.35).number_variant("standard"))
+    if not bands:
+        rng = np.random.default_rng(0)
+        for _ in range(count):
+            band = np.full((60, 220), 255, np.uint8)
+            cv2.putText(band, str(rng.integers(10000, 999999)), (10, 45),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3)
+            bands.append(band)
+    return bands
+
+
+def run_profile(profile, images_dir, repeat):
+    """Child process: load one profile and time it."""
+    from ai import ocr_engine
+
+    rss_before = ocr_engine._rss_bytes()
+    started = time.perf_counter()
+    reader = ocr_engine.get_profile_reader(profile)
+    load_seconds = time.perf_counter() - started
+    rss_after = ocr_engine._rss_bytes()
+
+    bands = load_bands(images_dir)
+    ocr_engine.recognize_batch(bands[:1], reader=reader, fallback_conf=0)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for band in bands:
+            ocr_engine.recognize(band, reader=reader, fallback_conf=0)
+    ms = 1000 * (time.perf_counter() - started) / (repeat * len(bands))
+
+    return {
+        "profile": profile,
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round((rss_after or 0) / 2**20, 1),
+        "reader_rss_mb": round(((rss_after or 0) - (rss_before or 0)) / 2**20, 1),
+        "ms_per_region": round(ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=None, help="Folder with plate crops")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--profiles", nargs="+", default=["full", "digits"])
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args.child, args.images, args.repeat)))
+        return 0
+
+    rows = []
+    for profile in args.profiles:
+        cmd = [sys.executable, __file__, "--child", profile, "--repeat", str(args.repeat)]
+        if args.images:
+            cmd += ["--images", args.images]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        rows.append(json.loads(out.strip().splitlines()[-1]))
+
+    base = rows[0]
+    print(f"{'profile':<10}{'load s':>8}{'RSS MB':>9}{'reader MB':>11}{'ms/region':>11}")
+    for row in rows:
+        print(f"{row['profile']:<10}{row['load_seconds']:>8}{row['rss_mb']:>9}"
+              f"{row['reader_rss_mb']:>11}{row['ms_per_region']:>11}")
+    for row in rows[1:]:
+        print(f"{row['profile']} vs {base['profile']}: "
+              f"{base['rss_mb'] - row['rss_mb']:+.1f} MB saved, "
+              f"{base['ms_per_region'] - row['ms_per_region']:+.2f} ms/region saved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Sweep thread budgets (ai.runtime) against request concurrency and report
+throughput vs. latency.
+
+Each case runs in a fresh Python process: it applies the torch / OpenCV /
+ONNX Runtime thread counts, warms the models up, then C request threads
+(as with gunicorn --threads C) each process --requests inputs through
+vehicle segmentation, plate detection and OCR of a plate band. Cases with
+torch threads "auto" use the ai.runtime budget for one worker with C threads.
+
+Usage:
+    python scripts/bench_thread_budget.py [--image car.jpg] [--concurrency 1 4 8]
+        [--torch-threads auto 1 2 4 0] [--requests 10]
+    (torch threads 0 = library default, i.e. all cores)
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+
+def load_inputs(image_path):
+    if image_path:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            raise SystemExit(f"Cannot read image: {image_path}")
+    else:
+        img = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    band = np.full((60, 220), 255, np.uint8)
+    cv2.putText(band, "163303", (8, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.3, 0, 3)
+    return img, band
+
+
+def run_case(concurrency, torch_threads, requests, image_path):
+    from ai import inference, ocr_engine, pipeline, runtime, warmup
+
+    if torch_threads == "auto":
+        plan = runtime.apply(workers=1, threads=concurrency)
+    else:
+        n = int(torch_threads)
+        default_threads = runtime.available_cores()
+        runtime.set_threads(n or default_threads, None, n or default_threads, n)
+        plan = {"torch_threads": n or default_threads, "cv2_threads": n or default_threads}
+    warmup.warmup()
+    img, band = load_inputs(image_path)
+
+    def one_request():
+        work, _ = pipeline.working_copy(img)
+        inference.segment_vehicles(work)
+        pipeline.detect_plates_on_image(work)
+        ocr_engine.read_regions([band, band])
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(requests):
+            started = time.perf_counter()
+            one_request()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    print(json.dumps({
+        "concurrency": concurrency,
+        "torch_threads": torch_threads,
+        "applied_torch_threads": plan["torch_threads"],
+        "cv2_threads": plan["cv2_threads"],
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="input image (default: synthetic 1280x720)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--torch-threads", nargs="+", default=["auto", "1", "2", "0"])
+    parser.add_argument("--requests", type=int, default=10, help="requests per client thread")
+    parser.add_argument("--case", nargs=2, metavar=("CONCURRENCY", "TORCH_THREADS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(int(args.case[0]), args.case[1], args.requests, args.image)
+        return
+
+    print(f"{'clients':>7} {'torch':>6} {'applied':>7} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        for torch_threads in args.torch_threads:
+            cmd = [sys.executable, __file__, "--case", str(concurrency), torch_threads,
+                   "--requests", str(args.requests)]
+            if args.image:
+                cmd += ["--image", args.image]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                print(f"{concurrency:>7} {torch_threads:>6} failed: {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(lines[-1])
+            print(
+                f"{concurrency:>7} {torch_threads:>6} {r['applied_torch_threads']:>7} {r['throughput_rps']:>7.2f} "
+                f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare vehicle mask handling in ai.inference.segment_vehicles: the previous
+full-frame approach (resize every mask to the image size, bitwise_and over the
+whole image, then crop) against the bbox-local one (ai.inference.mask_roi).
+
+Runs on synthetic masks, so no model is needed. Reports mean time and peak
+Python-allocated memory (tracemalloc; numpy/OpenCV arrays included) per image,
+and the fraction of mask pixels where both approaches disagree.
+
+Usage:
+    python scripts/bench_vehicle_masks.py [--width 4000 --height 3000] [--vehicles 12] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+
+def make_inputs(width, height, vehicles, mask_size, seed=0):
+    """Random image plus one elliptical low-res mask (and bbox) per vehicle."""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    mh, mw = mask_size
+    masks = np.zeros((vehicles, mh, mw), np.float32)
+    boxes = []
+    for i in range(vehicles):
+        bw, bh = rng.uniform(0.1, 0.4) * width, rng.uniform(0.1, 0.4) * height
+        x1, y1 = rng.uniform(0, width - bw), rng.uniform(0, height - bh)
+        boxes.append([int(x1), int(y1), int(x1 + bw), int(y1 + bh)])
+        cx, cy = (x1 + bw / 2) * mw / width, (y1 + bh / 2) * mh / height
+        axes = (int(bw * mw / width / 2), int(bh * mh / height / 2))
+        cv2.ellipse(masks[i], (int(cx), int(cy)), axes, 0, 0, 360, 1.0, -1)
+        masks[i] = cv2.GaussianBlur(masks[i], (5, 5), 0)
+    return img, masks, boxes
+
+
+def full_frame(img, masks, boxes):
+    """Previous segment_vehicles mask handling."""
+    h, w = img.shape[:2]
+    out = []
+    for mask, (x1, y1, x2, y2) in zip(masks, boxes):
+        mask_img = cv2.resize(mask, (w, h), interpolation=cv2.INTER_LINEAR)
+        mask_binary = (mask_img > 0.5).astype(np.uint8)
+        masked = cv2.bitwise_and(img, img, mask=mask_binary)
+        crop = masked[y1:y2, x1:x2].copy()
+        mask_area = int(np.sum(mask_binary[y1:y2, x1:x2] > 0))
+        out.append((crop, mask_binary[y1:y2, x1:x2], mask_area))
+    return out
+
+
+def bbox_local(img, masks, boxes):
+    """Current segment_vehicles mask handling."""
+    from ai.inference import mask_roi
+
+    out = []
+    for mask, (x1, y1, x2, y2) in zip(masks, boxes):
+        roi = img[y1:y2, x1:x2]
+        mask_binary = mask_roi(mask, [x1, y1, x2, y2], img.shape)
+        crop = cv2.bitwise_and(roi, roi, mask=mask_binary)
+        out.append((crop, mask_binary, int(cv2.countNonZero(mask_binary))))
+    return out
+
+
+def measure(fn, args, repeat):
+    fn(*args)  # warm-up
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, 1000 * sum(times) / len(times), peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--vehicles", type=int, default=12)
+    parser.add_argument("--mask-size", type=int, nargs=2, default=[480, 640], metavar=("H", "W"),
+                        help="resolution of the model masks (default: 480 640)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    img, masks, boxes = make_inputs(args.width, args.height, args.vehicles, tuple(args.mask_size))
+    print(f"image {args.width}x{args.height}, {args.vehicles} vehicles, masks {args.mask_size[0]}x{args.mask_size[1]}")
+    print(f"{'approach':<12} {'ms/image':>10} {'peak MiB':>10}")
+
+    results = {}
+    for name, fn in (("full_frame", full_frame), ("bbox_local", bbox_local)):
+        results[name], ms, peak = measure(fn, (img, masks, boxes), args.repeat)
+        print(f"{name:<12} {ms:>10.1f} {peak:>10.1f}")
+
+    differing = total = 0
+    for (crop_a, mask_a, _), (crop_b, mask_b, _) in zip(results["full_frame"], results["bbox_local"]):
+        differing += int(np.count_nonzero(mask_a != mask_b))
+        total += mask_a.size
+    print(f"mask pixels differing: {differing} / {total} ({100 * differing / max(total, 1):.4f}%)")
+
+
+if __name__ == "__main__":
+    main()
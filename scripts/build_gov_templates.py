@@ -0,0 +1,116 @@
+"""
+Build governorate digit templates for ai.gov_classifier from labeled crops.
+
+Dataset layout (one folder per governorate digit):
+    <dataset>/1/*.png
+    <dataset>/2/*.png
+    ...
+Images are full plate crops (as produced by plate detection) unless --strips
+is given, in which case they are already-cropped left strips.
+
+Usage:
+    python scripts/build_gov_templates.py <dataset> [--out ai/models/gov_digit_templates.npz]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai.gov_classifier import DEFAULT_TEMPLATES_PATH, GovDigitClassifier, normalize_strip
+from ai.gov_detect import preprocess_left_region_variant
+from ai.preprocess import PlateContext
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+
+
+def load_samples(dataset, ratio, variant, strips):
+    samples = []
+    for label_dir in sorted(p for p in Path(dataset).iterdir() if p.is_dir()):
+        for path in sorted(label_dir.iterdir()):
+            if path.suffix.lower() not in IMAGE_EXTS:
+                continue
+            img = cv2.imread(str(path))
+            if img is None:
+                print(f"  skip (unreadable): {path}")
+                continue
+            region = PlateContext(img)
+            if not strips:
+                region = region.left(ratio)
+            strip = preprocess_left_region_variant(region, variant)
+            if strip is None or strip.size == 0:
+                continue
+            samples.append((label_dir.name, normalize_strip(strip)))
+    return samples
+
+
+def leave_one_out(samples, labels, sums, counts, min_score, min_margin):
+    """Accuracy / coverage of 'sure' predictions with each sample left out of its template."""
+    sure = correct = 0
+    for label, vec in samples:
+        templates = []
+        for lab in labels:
+            s, n = sums[lab], counts[lab]
+            if lab == label:
+                s, n = s - vec, n - 1
+            t = s / max(n, 1)
+            norm = np.linalg.norm(t)
+            templates.append(t / norm if norm > 0 else t)
+        scores = np.stack(templates) @ vec
+        order = np.argsort(scores)[::-1]
+        best = scores[order[0]]
+        margin = best - (scores[order[1]] if len(order) > 1 else -1.0)
+        if best >= min_score and margin >= min_margin:
+            sure += 1
+            correct += int(labels[order[0]] == label)
+    return sure, correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="Folder with one sub-folder of crops per digit")
+    parser.add_argument("--out", default=str(DEFAULT_TEMPLATES_PATH))
+    parser.add_argument("--ratio", type=float, default=0.28, help="Left strip width ratio")
+    parser.add_argument("--variant", default="resize_clahe", help="Strip preprocessing variant")
+    parser.add_argument("--min-score", type=float, default=0.6)
+    parser.add_argument("--min-margin", type=float, default=0.08)
+    parser.add_argument("--strips", action="store_true", help="Images are already left strips")
+    args = parser.parse_args()
+
+    samples = load_samples(args.dataset, args.ratio, args.variant, args.strips)
+    if not samples:
+        print("No samples found.")
+        return 1
+
+    labels = sorted({label for label, _ in samples})
+    sums = {label: np.zeros_like(samples[0][1]) for label in labels}
+    counts = {label: 0 for label in labels}
+    for label, vec in samples:
+        sums[label] += vec
+        counts[label] += 1
+
+    templates = []
+    for label in labels:
+        t = sums[label] / counts[label]
+        templates.append(t / np.linalg.norm(t))
+        print(f"  digit {label}: {counts[label]} samples")
+
+    sure, correct = leave_one_out(samples, labels, sums, counts, args.min_score, args.min_margin)
+    print(f"Leave-one-out: {sure}/{len(samples)} answered by classifier "
+          f"({100.0 * sure / len(samples):.1f}%), accuracy {100.0 * correct / max(sure, 1):.1f}%")
+
+    classifier = GovDigitClassifier(
+        labels, np.stack(templates), ratio=args.ratio, variant=args.variant,
+        min_score=args.min_score, min_margin=args.min_margin,
+    )
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    classifier.save(args.out)
+    print(f"Templates saved to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Compare int8-quantized vs. float OCR reads on a labeled plate set.
+
+Each image is a plate crop whose file name starts with the expected number,
+e.g. 123456_001.jpg. The plate-number band is recognized with both the float
+recognizer and the int8 profile (ai.ocr_quant), and accuracy, agreement and
+latency are reported. Enable OCR_PRECISION=int8 only if the accuracy drop is
+acceptable.
+
+Usage:
+    python scripts/check_ocr_quantization.py <plates_dir> [--max-drop 0.0]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai import ocr_engine
+from ai.gov_detect import extract_digits_only
+from ai.preprocess import PlateContext
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+
+
+def load_set(plates_dir, region):
+    samples = []
+    for path in sorted(Path(plates_dir).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTS:
+            continue
+        img = cv2.imread(str(path))
+        if img is None:
+            continue
+        plate = PlateContext(img)
+        if region == "bottom":
+            plate = plate.bottom(0.35)
+        label = extract_digits_only(path.stem.split("_")[0])
+        samples.append((path.name, label, plate.number_variant("standard")))
+    return samples
+
+
+def read_all(reader, samples, batch):
+    """Digits read for every sample, plus mean milliseconds per image."""
+    images = [img for _name, _label, img in samples]
+    reads = []
+    started = time.perf_counter()
+    for i in range(0, len(images), batch):
+        for results in ocr_engine.recognize_batch(images[i:i + batch], reader=reader, fallback_conf=0):
+            best = max(results, key=lambda r: r[2], default=None)
+            reads.append(extract_digits_only(best[1]) if best else "")
+    ms = 1000 * (time.perf_counter() - started) / max(len(images), 1)
+    return reads, ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("plates_dir")
+    parser.add_argument("--region", choices=["bottom", "full"], default="bottom",
+                        help="OCR the bottom number band (default) or the whole crop")
+    parser.add_argument("--batch", type=int, default=1, help="Images per recognizer call")
+    parser.add_argument("--max-drop", type=float, default=0.0,
+                        help="Largest acceptable accuracy drop (fraction, e.g. 0.01)")
+    args = parser.parse_args()
+
+    samples = load_set(args.plates_dir, args.region)
+    if not samples:
+        print("No labeled images found.")
+        return 1
+
+    results = {}
+    for precision in ("float", "int8"):
+        reader = ocr_engine.get_reader(precision=precision)
+        read_all(reader, samples[:2], args.batch)  # warm-up
+        reads, ms = read_all(reader, samples, args.batch)
+        correct = sum(read == label for read, (_n, label, _i) in zip(reads, samples))
+        results[precision] = (reads, correct / len(samples), ms)
+        print(f"{precision:>5}: accuracy {100 * correct / len(samples):.1f}%  {ms:.1f} ms/image")
+
+    float_reads, float_acc, float_ms = results["float"]
+    int8_reads, int8_acc, int8_ms = results["int8"]
+    agree = sum(a == b for a, b in zip(float_reads, int8_reads))
+    print(f"Agreement: {agree}/{len(samples)}  speed-up: {float_ms / max(int8_ms, 1e-9):.2f}x")
+    for (name, label, _img), a, b in zip(samples, float_reads, int8_reads):
+        if a != b:
+            print(f"  {name}: label={label} float={a} int8={b}")
+
+    ok = float_acc - int8_acc <= args.max_drop
+    print("int8 profile OK" if ok else "int8 profile NOT recommended (accuracy drop too large)")
+    return 0 if ok else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
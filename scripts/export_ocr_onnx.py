@@ -0,0 +1,31 @@
+"""
+Export the EasyOCR detector and recognizer to ONNX for OCR_BACKEND=onnx.
+
+Usage:
+    python scripts/export_ocr_onnx.py [--out ai/models/onnx] [--langs ar en]
+
+Then run the API with OCR_BACKEND=onnx (and optionally OCR_ONNX_THREADS=N).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai.ocr_onnx import DEFAULT_ONNX_DIR, export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=str(DEFAULT_ONNX_DIR))
+    parser.add_argument("--langs", nargs="+", default=["ar", "en"])
+    parser.add_argument("--model-dir", default=None, help="EasyOCR model storage directory")
+    args = parser.parse_args()
+
+    for path in export(args.out, tuple(args.langs), model_storage_directory=args.model_dir):
+        print(f"Exported: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Export the plate detector and vehicle segmenter to ONNX for YOLO_BACKEND=onnx.
+
+The .onnx files are written next to the .pt weights (the default location
+ai.yolo_backend looks for), with a dynamic batch axis for batched inference.
+
+Usage:
+    python scripts/export_yolo_onnx.py [--imgsz 640] [--only detect|seg]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai.detector import _resolve_model_path
+from ai.inference import _model_path
+
+
+def export(weights, imgsz):
+    from ultralytics import YOLO
+
+    model = YOLO(str(weights))
+    return model.export(format="onnx", imgsz=imgsz, dynamic=True, opset=17, simplify=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--only", choices=["detect", "seg"], default=None)
+    args = parser.parse_args()
+
+    targets = {"detect": _resolve_model_path(), "seg": _model_path()}
+    status = 0
+    for name, weights in targets.items():
+        if args.only and name != args.only:
+            continue
+        if weights is None:
+            print(f"{name}: weights not found, skipped")
+            status = 1
+            continue
+        print(f"{name}: exported {export(weights, args.imgsz)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
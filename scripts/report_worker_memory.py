@@ -0,0 +1,134 @@
+"""
+Report per-worker memory with models preloaded in the master (shared by the
+workers) vs loaded separately in every worker, as the worker count grows.
+
+Mimics gunicorn: the master optionally loads the models as with
+GUNICORN_PRELOAD=true (ai.warmup.load_models, heap frozen; with --share-memory
+torch weights are also moved to shared memory), then forks N workers that each
+run the warmup inference. Once all workers are warm, memory is measured with
+psutil:
+  rss     resident set size, mean per worker
+  uss     unique (private) memory, mean per worker
+  shared  rss - uss, pages also mapped by other processes, mean per worker
+  total   PSS summed over master and workers (actual footprint)
+
+Every (mode, workers) case runs in a fresh Python process. Models come from
+the usual settings (YOLO_*_MODEL_PATH, OCR_*); keep OCR_POOL_WORKERS=0.
+
+Usage:
+    python scripts/report_worker_memory.py [--workers 1 2 4] [--modes preload per_worker] [--share-memory]
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+MIB = 2 ** 20
+
+
+def run_case(mode, workers, share_memory):
+    """Master side of one case; prints one JSON line with the measurements."""
+    import psutil
+
+    from ai import warmup
+
+    shared_bytes = 0
+    if mode == "preload":
+        warmup.load_models()
+        if share_memory:
+            shared_bytes = warmup.share_memory()
+        gc.freeze()
+
+    ready_r, ready_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                warmup.after_fork()
+                warmup.warmup()
+                os.write(ready_w, b"1")
+                signal.pause()
+            except BaseException:
+                code = 1
+            os._exit(code)
+        pids.append(pid)
+    os.close(ready_w)
+
+    try:
+        for _ in range(workers):
+            if not os.read(ready_r, 1):
+                raise RuntimeError("a worker exited before warming up")
+        master = psutil.Process().memory_full_info()
+        infos = [psutil.Process(pid).memory_full_info() for pid in pids]
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+
+    def mean(values):
+        return sum(values) / len(values) / MIB
+
+    print(json.dumps({
+        "mode": mode,
+        "workers": workers,
+        "master_rss_mib": master.rss / MIB,
+        "worker_rss_mib": mean([i.rss for i in infos]),
+        "worker_uss_mib": mean([i.uss for i in infos]),
+        "worker_shared_mib": mean([i.rss - i.uss for i in infos]),
+        "total_pss_mib": (master.pss + sum(i.pss for i in infos)) / MIB,
+        "shared_weights_mib": shared_bytes / MIB,
+        "models": warmup.status()["models"],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", choices=["preload", "per_worker"], default=["preload", "per_worker"])
+    parser.add_argument("--share-memory", action="store_true",
+                        help="preload with torch weights moved to shared memory (PRELOAD_SHARE_MEMORY=true)")
+    parser.add_argument("--json", action="store_true", help="print raw JSON lines")
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], int(args.case[1]), args.share_memory)
+        return
+
+    if not args.json:
+        print(f"{'mode':<11} {'workers':>7} {'master':>8} {'rss':>8} {'uss':>8} {'shared':>8} {'total':>8}   (MiB)")
+    for mode in args.modes:
+        for workers in args.workers:
+            cmd = [sys.executable, __file__, "--case", mode, str(workers)]
+            if args.share_memory:
+                cmd.append("--share-memory")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+            if proc.returncode != 0 or not lines:
+                print(f"{mode:<11} {workers:>7} failed: {proc.stderr.strip().splitlines()[-1:] or proc.returncode}")
+                continue
+            r = json.loads(lines[-1])
+            if args.json:
+                print(json.dumps(r))
+                continue
+            print(
+                f"{mode:<11} {workers:>7} {r['master_rss_mib']:>8.0f} {r['worker_rss_mib']:>8.0f} "
+                f"{r['worker_uss_mib']:>8.0f} {r['worker_shared_mib']:>8.0f} {r['total_pss_mib']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
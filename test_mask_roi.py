@@ -0,0 +1,66 @@
+"""
+Unit tests for ai.inference.mask_roi (ROI-local mask upsampling).
+
+Reference: bilinear full-frame cv2.resize of the mask, cropped to the bbox and
+thresholded at 0.5. Tolerance: pixels whose interpolated value is within
+NEAR_THRESHOLD of 0.5 may differ (warpAffine and resize round differently;
+on hard 0/1 masks the edge pixels land on exactly 0.5). All others must match.
+"""
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai.inference import mask_roi
+
+NEAR_THRESHOLD = 1e-3
+
+SHAPES = [
+    # (mask shape, image shape)
+    ((160, 160), (480, 640)),    # square mask, landscape frame
+    ((120, 213), (720, 1280)),
+    ((97, 131), (333, 451)),     # odd sizes
+    ((640, 640), (480, 640)),    # mask larger than the frame
+    ((200, 300), (200, 300)),    # same resolution
+    ((64, 48), (1001, 777)),     # strong upsampling, portrait
+    ((7, 5), (100, 90)),
+]
+
+
+def random_mask(rng, shape, binary):
+    mask = cv2.GaussianBlur(rng.random(shape).astype(np.float32), (0, 0), 2)
+    mask = (mask - mask.min()) / (mask.max() - mask.min())
+    return (mask > 0.5).astype(np.float32) if binary else mask
+
+
+def boxes(rng, w, h, n=12):
+    yield 0, 0, w, h
+    yield 0, h // 2, w // 3, h       # touches the left and bottom edges
+    yield w - 1, 0, w, 1              # single pixel in the top-right corner
+    for _ in range(n):
+        x1, x2 = sorted(rng.integers(0, w + 1, 2))
+        y1, y2 = sorted(rng.integers(0, h + 1, 2))
+        if x2 > x1 and y2 > y1:
+            yield int(x1), int(y1), int(x2), int(y2)
+
+
+@pytest.mark.parametrize("binary", [False, True], ids=["soft", "binary"])
+@pytest.mark.parametrize("mask_shape,image_shape", SHAPES)
+def test_matches_full_frame_resize(mask_shape, image_shape, binary):
+    rng = np.random.default_rng(sum(mask_shape) + sum(image_shape))
+    h, w = image_shape
+    for _ in range(3):
+        mask = random_mask(rng, mask_shape, binary)
+        full = cv2.resize(mask, (w, h))
+        for x1, y1, x2, y2 in boxes(rng, w, h):
+            values = full[y1:y2, x1:x2]
+            got = mask_roi(mask, (x1, y1, x2, y2), image_shape)
+            assert got.shape == values.shape
+            assert got.dtype == np.uint8
+            differs = got.astype(bool) != (values > 0.5)
+            assert np.all(np.abs(values[differs] - 0.5) <= NEAR_THRESHOLD)
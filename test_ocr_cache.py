@@ -0,0 +1,60 @@
+"""
+Unit tests for ai.ocr_cache.OCRCache (LRU eviction, expiry, copy-on-get).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import ocr_cache
+
+
+def test_evicts_least_recently_used():
+    cache = ocr_cache.OCRCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_and_put_copy_the_value():
+    cache = ocr_cache.OCRCache(max_entries=4, ttl=60)
+    value = {"text": "12345", "debug": {"cache_hit": False}}
+    cache.put("k", value)
+    value["text"] = "changed by the caller"
+    hit = cache.get("k")
+    hit["debug"]["cache_hit"] = True
+    assert cache.get("k") == {"text": "12345", "debug": {"cache_hit": False}}
+
+
+def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ocr_cache.time, "monotonic", lambda: now[0])
+    cache = ocr_cache.OCRCache(max_entries=4, ttl=10)
+    cache.put("k", 1)
+    now[0] += 11
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats["expired"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_disabled_by_size_zero():
+    cache = ocr_cache.OCRCache(max_entries=0, ttl=60)
+    cache.put("k", 1)
+    assert cache.get("k") is None
+
+
+def test_key_depends_on_crop_and_settings():
+    gray = np.tile(np.arange(64, dtype=np.uint8) * 4, (32, 1))
+    key = ocr_cache.make_key(gray, "number", "bottom_region")
+    assert key == ocr_cache.make_key(gray.copy(), "number", "bottom_region")
+    assert key != ocr_cache.make_key(gray, "governorate", "bottom_region")
+    assert key != ocr_cache.make_key(gray[:, ::-1].copy(), "number", "bottom_region")
+    assert ocr_cache.make_key(np.zeros((0, 0), np.uint8), "number") is None
@@ -0,0 +1,121 @@
+"""
+Unit tests for ai.ocr_engine.recognize_batch: batched recognition must return
+what EasyOCR's own Reader.recognize() returns image by image, in input order.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+easyocr = pytest.importorskip("easyocr")
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import ocr_engine
+
+CHARACTERS = "0123456789"
+
+
+class ColumnRecognizer(torch.nn.Module):
+    """
+    Stub recognition network: one output step per 8 input columns, whose class
+    is the column brightness bucket. Reads depend on content and padded width
+    (EasyOCR pads narrower images of a batch), so any mixing shows up.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def forward(self, x, text):
+        self.calls.append(tuple(x.shape))
+        cols = x.mean(dim=2)[:, 0]                      # (B, W), values in [-1, 1]
+        steps = cols.unfold(1, 8, 8).mean(-1)           # (B, W // 8)
+        centers = torch.linspace(-1, 1, len(CHARACTERS) + 1)
+        classes = (steps[..., None] - centers).abs().argmin(-1)
+        # Confident reads, so EasyOCR's low-contrast retry pass never runs
+        return 100.0 * torch.nn.functional.one_hot(classes, len(centers)).float()
+
+
+def stub_reader(model_lang="latin"):
+    from easyocr.utils import CTCLabelConverter
+
+    return SimpleNamespace(
+        character=CHARACTERS,
+        lang_char=CHARACTERS,
+        model_lang=model_lang,
+        recognizer=ColumnRecognizer(),
+        converter=CTCLabelConverter(CHARACTERS, {}, {}),
+        device="cpu",
+        detector=None,
+    )
+
+
+def regions(seed=0):
+    """Plate-like grayscale regions with interleaved aspect ratios (padded widths 1 to 5)."""
+    rng = np.random.default_rng(seed)
+    sizes = [(32, 100), (40, 40), (32, 150), (30, 97), (48, 60), (32, 101), (20, 95), (64, 300), (30, 18)]
+    out = []
+    for h, w in sizes:
+        stripes = rng.integers(0, 256, max(w // 6, 1)).astype(np.uint8)
+        out.append(np.repeat(stripes, 6)[:w][None, :].repeat(h, axis=0).copy())
+    return out
+
+
+def per_image(reader, images, allowlist=None):
+    return [
+        easyocr.Reader.recognize(reader, img, allowlist=allowlist, detail=1, paragraph=False)
+        for img in images
+    ]
+
+
+@pytest.mark.parametrize("model_lang", ["latin", "arabic"])
+def test_matches_per_image_recognize_in_input_order(model_lang):
+    images = regions()
+    expected = per_image(stub_reader(model_lang), images)
+    reader = stub_reader(model_lang)
+    got = ocr_engine.recognize_batch(images, reader=reader)
+
+    assert len(got) == len(images)
+    for exp, res in zip(expected, got):
+        assert len(exp) == len(res) == 1
+        (exp_box, exp_text, exp_conf), (box, text, conf) = exp[0], res[0]
+        assert text == exp_text
+        assert conf == pytest.approx(exp_conf, abs=1e-5)
+        assert [list(map(int, p)) for p in box] == [list(map(int, p)) for p in exp_box]
+    # The reads differ between regions, so a reordering would not go unnoticed
+    assert len({res[0][1] for res in got}) > len(images) // 2
+
+
+def test_one_forward_pass_per_padded_width():
+    images = regions()
+    reader = stub_reader()
+    ocr_engine.recognize_batch(images, reader=reader)
+    widths = {ocr_engine._padded_width_key(img) for img in images}
+    assert len(reader.recognizer.calls) == len(widths)
+    assert sum(shape[0] for shape in reader.recognizer.calls) == len(images)
+
+
+def test_allowlist_and_empty_images():
+    images = regions(1)
+    expected = per_image(stub_reader(), images, allowlist="0123")
+    got = ocr_engine.recognize_batch(
+        [None, images[0], np.zeros((0, 5), np.uint8)] + images[1:], reader=stub_reader(), allowlist="0123"
+    )
+    assert got[0] == [] and got[2] == []
+    assert [r[0][1] for r in [got[1]] + got[3:]] == [e[0][1] for e in expected]
+    assert set("".join(r[0][1] for r in got if r)) <= set("0123")
+
+
+def test_bgr_input_is_converted_like_grayscale():
+    import cv2
+
+    images = regions(2)
+    bgr = [cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) for img in images]
+    gray_reads = ocr_engine.recognize_batch(images, reader=stub_reader())
+    bgr_reads = ocr_engine.recognize_batch(bgr, reader=stub_reader())
+    assert [r[0][1] for r in bgr_reads] == [r[0][1] for r in gray_reads]
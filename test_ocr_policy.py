@@ -0,0 +1,80 @@
+"""
+Unit tests for ai.ocr_policy.run_passes (early exit over ordered OCR passes).
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import ocr_policy
+
+
+def number_policy(**overrides):
+    policy = {
+        "passes": ["standard", "clahe", "otsu", "adaptive"],
+        "probe_passes": 1,
+        "stop": {"min_confidence": 0.9, "min_digits": 5, "max_digits": 6},
+        "adaptive": {"enabled": False},
+    }
+    policy.update(overrides)
+    return ocr_policy.get_policy("number", policy)
+
+
+def fake_ocr(reads):
+    """run_stage that appends reads[pass] (digits, confidence) and logs the stages it ran."""
+    stages = []
+
+    def run_stage(passes):
+        stages.append(list(passes))
+        for p in passes:
+            if p in reads:
+                candidates.append(reads[p])
+
+    candidates = []
+    return run_stage, candidates, stages
+
+
+def test_confident_probe_exits_early():
+    run_stage, candidates, stages = fake_ocr({"standard": ("12345", 0.95)})
+    decision = ocr_policy.run_passes("number", number_policy(), run_stage, candidates)
+    assert stages == [["standard"]]
+    assert decision["early_exit"] is True
+    assert decision["passes_run"] == 1
+    assert decision["passes_available"] == 4
+
+
+def test_weak_probe_runs_remaining_passes_in_one_batch():
+    run_stage, candidates, stages = fake_ocr({"standard": ("12345", 0.5), "otsu": ("12345", 0.95)})
+    decision = ocr_policy.run_passes("number", number_policy(), run_stage, candidates)
+    assert stages == [["standard"], ["clahe", "otsu", "adaptive"]]
+    assert decision["early_exit"] is False
+    assert decision["passes"] == ["standard", "clahe", "otsu", "adaptive"]
+
+
+def test_stop_rule_checks_digit_count():
+    # Confident, but too short for a plate number
+    run_stage, candidates, stages = fake_ocr({"standard": ("123", 0.99)})
+    decision = ocr_policy.run_passes("number", number_policy(), run_stage, candidates)
+    assert decision["early_exit"] is False
+    assert len(stages) == 2
+
+
+def test_max_passes_caps_the_passes_run():
+    run_stage, candidates, stages = fake_ocr({})
+    decision = ocr_policy.run_passes("number", number_policy(max_passes=2), run_stage, candidates)
+    assert stages == [["standard"], ["clahe"]]
+    assert decision["passes_available"] == 2
+
+
+def test_no_probe_runs_everything_at_once():
+    run_stage, candidates, stages = fake_ocr({"standard": ("12345", 0.95)})
+    decision = ocr_policy.run_passes("number", number_policy(probe_passes=0), run_stage, candidates)
+    assert stages == [["standard", "clahe", "otsu", "adaptive"]]
+    assert decision["early_exit"] is False
+
+
+def test_overrides_merge_stop_rule():
+    policy = ocr_policy.get_policy("number", {"stop": {"min_confidence": 0.5}})
+    assert policy["stop"]["min_confidence"] == 0.5
+    assert policy["stop"]["min_digits"] == ocr_policy.get_policy("number")["stop"]["min_digits"]
@@ -0,0 +1,76 @@
+"""
+Unit tests for ai.ocr_quant (int8 recognizer weights cached to disk).
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import ocr_quant
+
+
+class Recognizer(torch.nn.Module):
+    """Same layer kinds as EasyOCR's recognizer head: BiLSTM + Linear."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv1d(8, 8, 1)
+        self.rnn = torch.nn.LSTM(8, 16, num_layers=2, bidirectional=True, batch_first=True)
+        self.head = torch.nn.Sequential(torch.nn.Linear(32, 12), torch.nn.Linear(12, 5))
+
+    def forward(self, x):
+        x = self.conv(x.transpose(1, 2)).transpose(1, 2)
+        return self.head(self.rnn(x)[0])
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "recognizer.pt"
+    monkeypatch.setattr(ocr_quant, "cache_path", lambda langs, cache_dir=None: path)
+    return path
+
+
+def test_cache_round_trip_skips_quantization(cache_file, monkeypatch):
+    torch.manual_seed(0)
+    first = SimpleNamespace(recognizer=Recognizer().eval())
+    float_conv = first.recognizer.conv.weight.clone()
+    assert ocr_quant.quantize_recognizer(first, ["ar"]) == "quantized"
+    assert cache_file.exists()
+
+    def no_quantize(*args, **kwargs):
+        raise AssertionError("quantize_dynamic ran although the cache exists")
+
+    monkeypatch.setattr(torch.quantization, "quantize_dynamic", no_quantize)
+    # Same float weights (as in a second worker)
+    torch.manual_seed(0)
+    second = SimpleNamespace(recognizer=Recognizer().eval())
+    assert ocr_quant.quantize_recognizer(second, ["ar"]) == "cache"
+
+    x = torch.randn(3, 7, 8)
+    with torch.no_grad():
+        assert torch.equal(first.recognizer(x), second.recognizer(x))
+    assert torch.equal(second.recognizer.conv.weight, float_conv)
+    assert type(second.recognizer.rnn).__name__ == "LSTM"
+    assert type(second.recognizer.rnn) is not torch.nn.LSTM
+
+
+def test_cache_file_is_weights_only(cache_file):
+    reader = SimpleNamespace(recognizer=Recognizer().eval())
+    ocr_quant.quantize_recognizer(reader, ["ar"])
+    layers = torch.load(cache_file, map_location="cpu", weights_only=True)["layers"]
+    assert set(layers) == {"rnn", "head.0", "head.1"}
+    assert layers["head.0"]["weight"]["int8"].dtype == torch.int8
+
+
+def test_mismatched_cache_is_ignored(cache_file):
+    ocr_quant.quantize_recognizer(SimpleNamespace(recognizer=torch.nn.Sequential(torch.nn.Linear(4, 2))), ["ar"])
+    reader = SimpleNamespace(recognizer=Recognizer().eval())
+    assert ocr_quant.quantize_recognizer(reader, ["ar"]) == "quantized"
+    with torch.no_grad():
+        assert reader.recognizer(torch.randn(1, 7, 8)).shape == (1, 7, 5)
@@ -0,0 +1,81 @@
+"""
+Unit tests for ai.pipeline_profiles (profile resolution and overrides).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import pipeline_profiles
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    """Replace the loaded config with the returned dict."""
+    config = {"default": "balanced", "profiles": {
+        "balanced": {},
+        "fast": {
+            "plate_conf": 0.5,
+            "number_ocr": {"passes": ["standard"]},
+            "debug_gov": False,
+            "artifacts": {"overlay": "jpg", "crops": "none"},
+        },
+    }}
+    monkeypatch.setattr(pipeline_profiles, "_CONFIG", config)
+    monkeypatch.delenv("PIPELINE_PROFILE", raising=False)
+    return config
+
+
+def test_default_profile_is_the_base(profiles):
+    profile = pipeline_profiles.get_profile()
+    assert profile["name"] == "balanced"
+    assert profile == {**pipeline_profiles.BASE_PROFILE, "name": "balanced"}
+
+
+def test_env_selects_default(profiles, monkeypatch):
+    monkeypatch.setenv("PIPELINE_PROFILE", "fast")
+    assert pipeline_profiles.get_profile()["name"] == "fast"
+    assert pipeline_profiles.get_profile("balanced")["name"] == "balanced"
+
+
+def test_profile_overrides_base_and_merges_artifacts(profiles):
+    profile = pipeline_profiles.get_profile("fast")
+    assert profile["plate_conf"] == 0.5
+    assert profile["vehicle_conf"] == pipeline_profiles.BASE_PROFILE["vehicle_conf"]
+    assert profile["debug_gov"] is False
+    assert profile["number_ocr"] == {"passes": ["standard"]}
+    assert profile["artifacts"] == {"overlay": "jpg", "crops": "none", "jpeg_quality": 90}
+
+
+def test_resolved_profile_is_a_copy(profiles):
+    pipeline_profiles.get_profile("fast")["artifacts"]["crops"] = "png"
+    assert pipeline_profiles.get_profile("fast")["artifacts"]["crops"] == "none"
+    assert pipeline_profiles.BASE_PROFILE["artifacts"]["crops"] == "png"
+
+
+def test_unknown_profile(profiles):
+    with pytest.raises(ValueError, match="Unknown pipeline profile"):
+        pipeline_profiles.get_profile("turbo")
+
+
+def test_invalid_artifact_format(profiles):
+    profiles["profiles"]["bad"] = {"artifacts": {"overlay": "gif"}}
+    with pytest.raises(ValueError, match="artifacts.overlay"):
+        pipeline_profiles.get_profile("bad")
+
+
+def test_shipped_config_resolves():
+    for name in ("fast", "balanced", "accurate"):
+        assert pipeline_profiles.get_profile(name)["name"] == name
+
+
+def test_video_settings_default_off_and_merge(profiles):
+    assert pipeline_profiles.get_profile("balanced")["video"] == {"debug_gov": False, "crops": "none"}
+    profiles["profiles"]["debug_video"] = {"video": {"crops": "jpg"}}
+    assert pipeline_profiles.get_profile("debug_video")["video"] == {"debug_gov": False, "crops": "jpg"}
+    profiles["profiles"]["bad_video"] = {"video": {"crops": "gif"}}
+    with pytest.raises(ValueError, match="video.crops"):
+        pipeline_profiles.get_profile("bad_video")
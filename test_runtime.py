@@ -0,0 +1,104 @@
+"""
+Unit tests for ai.runtime thread budgeting (cores / (workers x threads)).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import runtime
+
+ENV = (
+    "CPU_CORES", "WEB_CONCURRENCY", "GUNICORN_THREADS", "RUNTIME_TORCH_THREADS",
+    "RUNTIME_TORCH_INTEROP_THREADS", "RUNTIME_CV2_THREADS", "YOLO_ONNX_THREADS", "OCR_ONNX_THREADS",
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ENV:
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.mark.parametrize("cores,workers,threads,per_thread", [
+    (8, 1, 1, 8),
+    (8, 2, 2, 2),
+    (7, 2, 1, 3),     # rounds down
+    (4, 8, 1, 1),     # more workers than cores: still 1 thread each
+    (4, 2, 4, 1),     # more request threads than cores
+    (1, 1, 1, 1),
+    (64, 3, 2, 10),
+])
+def test_per_thread_budget(cores, workers, threads, per_thread):
+    plan = runtime.budget(workers=workers, threads=threads, cores=cores)
+    assert (plan["cores"], plan["workers"], plan["threads"]) == (cores, workers, threads)
+    assert plan["torch_threads"] == plan["cv2_threads"] == plan["onnx_threads"] == per_thread
+    assert plan["torch_interop_threads"] == 1
+
+
+def test_zero_or_missing_counts_fall_back_to_env(monkeypatch):
+    monkeypatch.setenv("CPU_CORES", "12")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("GUNICORN_THREADS", "2")
+    plan = runtime.budget()
+    assert (plan["cores"], plan["workers"], plan["threads"], plan["torch_threads"]) == (12, 3, 2, 2)
+    assert runtime.budget(workers=0, threads=0, cores=0)["torch_threads"] == 2
+
+
+def test_arguments_win_over_env(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "8")
+    monkeypatch.setenv("GUNICORN_THREADS", "8")
+    assert runtime.budget(workers=1, threads=1, cores=8)["torch_threads"] == 8
+
+
+def test_defaults_without_env():
+    plan = runtime.budget()
+    assert (plan["workers"], plan["threads"]) == (1, 1)
+    assert plan["cores"] == runtime.available_cores() >= 1
+    assert plan["torch_threads"] == plan["cores"]
+
+
+def test_explicit_thread_overrides(monkeypatch):
+    monkeypatch.setenv("RUNTIME_TORCH_THREADS", "3")
+    monkeypatch.setenv("RUNTIME_TORCH_INTEROP_THREADS", "2")
+    monkeypatch.setenv("RUNTIME_CV2_THREADS", "0")
+    plan = runtime.budget(workers=2, threads=1, cores=16)
+    assert (plan["torch_threads"], plan["torch_interop_threads"], plan["cv2_threads"]) == (3, 2, 0)
+    # ONNX Runtime keeps the computed budget
+    assert plan["onnx_threads"] == 8
+
+
+def test_empty_env_values_are_ignored(monkeypatch):
+    monkeypatch.setenv("CPU_CORES", "")
+    monkeypatch.setenv("RUNTIME_TORCH_THREADS", "")
+    plan = runtime.budget(workers=1, threads=1)
+    assert plan["cores"] == runtime.available_cores()
+    assert plan["torch_threads"] == plan["cores"]
+
+
+def test_cpu_cores_env_overrides_detection(monkeypatch):
+    monkeypatch.setenv("CPU_CORES", "5")
+    assert runtime.available_cores() == 5
+
+
+def test_onnx_env_settings_win_over_budget(monkeypatch):
+    torch = pytest.importorskip("torch")
+    import cv2
+
+    from ai import ocr_engine, yolo_backend
+
+    monkeypatch.setattr(yolo_backend, "ONNX_THREADS", 0)
+    monkeypatch.setattr(ocr_engine, "ONNX_THREADS", 0)
+    monkeypatch.setenv("YOLO_ONNX_THREADS", "6")
+    torch_threads, cv2_threads = torch.get_num_threads(), cv2.getNumThreads()
+    try:
+        runtime.set_threads(2, None, 2, 2)
+        assert yolo_backend.ONNX_THREADS == 0
+        assert ocr_engine.ONNX_THREADS == 2
+        assert torch.get_num_threads() == 2
+    finally:
+        torch.set_num_threads(torch_threads)
+        cv2.setNumThreads(cv2_threads)
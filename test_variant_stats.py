@@ -0,0 +1,78 @@
+"""
+Unit tests for ai.variant_stats.order_passes (adaptive OCR pass ordering).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import variant_stats
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Replace the recorded counters with the returned dict."""
+    counts = {}
+    monkeypatch.setattr(variant_stats, "ENABLED", True)
+    monkeypatch.setattr(variant_stats, "_persisted", counts)
+    monkeypatch.setattr(variant_stats, "_pending", {})
+    monkeypatch.setattr(variant_stats, "_order_calls", {})
+    return counts
+
+
+PASSES = ["standard", "clahe", "otsu", "adaptive"]
+
+
+def early_exit_counts():
+    # The probe pass runs on every plate and stops early on the easy ones;
+    # the fallbacks only run on hard plates, so their share of all wins is tiny.
+    return {"number": {
+        "standard": {"runs": 10000, "wins": 9500},
+        "clahe": {"runs": 500, "wins": 60},     # 12% of its runs, 0.6% of all wins
+        "otsu": {"runs": 500, "wins": 2},       # 0.4% of its runs
+        "adaptive": {"runs": 500, "wins": 40},  # 8% of its runs
+    }}
+
+
+def test_no_change_below_min_runs(stats):
+    stats.update({"number": {"otsu": {"runs": 50, "wins": 40}}})
+    assert variant_stats.order_passes("number", PASSES, min_runs=200) == PASSES
+
+
+def test_orders_by_own_win_rate(stats):
+    stats.update(early_exit_counts())
+    assert variant_stats.order_passes("number", PASSES, min_runs=200) == [
+        "standard", "clahe", "adaptive", "otsu",
+    ]
+
+
+def test_early_exit_fallbacks_are_not_pruned_by_win_share(stats):
+    stats.update(early_exit_counts())
+    ordered = variant_stats.order_passes("number", PASSES, min_runs=200, prune_below=0.01)
+    # clahe and adaptive win well when they run, although they hold < 1% of all wins
+    assert ordered == ["standard", "clahe", "adaptive"]
+
+
+def test_pruned_passes_are_retried_every_n_calls(stats):
+    stats.update(early_exit_counts())
+    orders = [
+        variant_stats.order_passes("number", PASSES, min_runs=200, prune_below=0.01, explore_every=3)
+        for _ in range(6)
+    ]
+    with_otsu = [i for i, order in enumerate(orders) if "otsu" in order]
+    assert with_otsu == [2, 5]
+    assert orders[2] == ["standard", "clahe", "adaptive", "otsu"]
+
+
+def test_best_pass_is_always_kept(stats):
+    stats.update({"number": {p: {"runs": 1000, "wins": 0} for p in PASSES}})
+    assert variant_stats.order_passes("number", PASSES, min_runs=200, prune_below=0.01) == ["standard"]
+
+
+def test_disabled_returns_configured_order(stats, monkeypatch):
+    stats.update(early_exit_counts())
+    monkeypatch.setattr(variant_stats, "ENABLED", False)
+    assert variant_stats.order_passes("number", PASSES, min_runs=200, prune_below=0.01) == PASSES
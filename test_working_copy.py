@@ -0,0 +1,96 @@
+"""
+Unit tests for the multi-resolution helpers in ai.pipeline: working_copy()
+downscaling and mapping working-copy boxes back to full resolution.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai.pipeline import _full_res_plates, _to_original, working_copy
+
+
+def image(h, w):
+    """Image whose pixels encode their own coordinates (x in channel 0/1, y in 2)."""
+    ys, xs = np.mgrid[0:h, 0:w]
+    return np.dstack([xs % 256, xs // 256, ys % 256]).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape,max_side", [((480, 640), 640), ((480, 640), 1280), ((480, 640), 0)])
+def test_no_downscale_returns_original(shape, max_side):
+    img = image(*shape)
+    work, scale = working_copy(img, max_side)
+    assert work is img
+    assert scale == 1.0
+
+
+@pytest.mark.parametrize("shape,max_side", [
+    ((1080, 1920), 1280),
+    ((1001, 777), 640),   # portrait, odd sizes
+    ((333, 451), 200),
+    ((3, 2000), 640),     # very thin: short side stays >= 1
+])
+def test_downscale_caps_long_side(shape, max_side):
+    h, w = shape
+    work, scale = working_copy(image(h, w), max_side)
+    wh, ww = work.shape[:2]
+    assert max(wh, ww) == max_side
+    assert scale == pytest.approx(max(h, w) / max_side)
+    assert min(wh, ww) >= 1
+    assert ww == pytest.approx(w / scale, abs=1)
+    assert wh == pytest.approx(h / scale, abs=1)
+
+
+def test_to_original_scales_and_clamps():
+    assert _to_original([10, 20, 30, 40], 2.0, (1000, 1000)) == [20, 40, 60, 80]
+    # Odd scale: start rounds down, end rounds to nearest
+    assert _to_original([10, 10, 21, 21], 1.5, (1000, 1000)) == [15, 15, 32, 32]
+    # Boxes slightly outside the working copy are clipped to the image
+    assert _to_original([-3, -1, 335, 260], 3.0, (777, 1001)) == [0, 0, 1001, 777]
+
+
+def test_full_working_copy_maps_to_full_image():
+    img = image(1001, 777)
+    work, scale = working_copy(img, 640)
+    wh, ww = work.shape[:2]
+    assert _to_original([0, 0, ww, wh], scale, img.shape) == [0, 0, 777, 1001]
+
+
+def test_full_res_plates_unscaled_adds_offset_and_keeps_crop():
+    img = image(100, 200)
+    crop = img[10:20, 30:60]
+    ((out_crop, conf, bbox),) = _full_res_plates(img, [(crop, 0.9, [30, 10, 60, 20])], 1.0, (5, 7))
+    assert out_crop is crop
+    assert conf == 0.9
+    assert bbox == [35, 17, 65, 27]
+
+
+def test_full_res_plates_recrops_from_full_resolution():
+    img = image(1001, 777)
+    work, scale = working_copy(img, 640)
+    # Plate at (40, 50)-(90, 70) inside a vehicle region at offset (100, 200) of the working copy
+    plates = [(work[250:270, 140:190], 0.8, [40, 50, 90, 70])]
+    ((crop, conf, bbox),) = _full_res_plates(img, plates, scale, (100, 200))
+    x1, y1, x2, y2 = bbox
+    assert bbox == _to_original([140, 250, 190, 270], scale, img.shape)
+    assert crop.shape[:2] == (y2 - y1, x2 - x1)
+    # The crop holds the original pixels of bbox
+    assert crop[0, 0].tolist() == [x1 % 256, x1 // 256, y1 % 256]
+    assert crop[-1, -1].tolist() == [(x2 - 1) % 256, (x2 - 1) // 256, (y2 - 1) % 256]
+
+
+def test_full_res_plates_clamps_at_image_edges_and_drops_empty():
+    img = image(100, 200)
+    plates = [
+        (None, 0.7, [90, 40, 120, 60]),    # runs past the right/bottom edge
+        (None, 0.6, [150, 10, 160, 20]),   # entirely outside the image
+    ]
+    out = _full_res_plates(img, plates, 2.0)
+    assert len(out) == 1
+    crop, _conf, bbox = out[0]
+    assert bbox == [180, 80, 200, 100]
+    assert crop.shape[:2] == (20, 20)
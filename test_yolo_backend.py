@@ -0,0 +1,149 @@
+"""
+Unit tests for ai.yolo_backend letterboxing: letterbox(), _strip_letterbox()
+(Ultralytics masks) and OnnxYOLO postprocessing of synthetic raw outputs back
+to original image coordinates.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai import yolo_backend
+from ai.yolo_backend import LETTERBOX_COLOR, OnnxYOLO, _strip_letterbox, letterbox
+
+
+@pytest.mark.parametrize("shape,size,expected_r,pad", [
+    ((480, 640), 640, 1.0, (0, 80)),
+    ((640, 480), 640, 1.0, (80, 0)),
+    ((333, 451), 320, 320 / 451, (0, 42)),
+    ((1080, 1920), 640, 1 / 3, (0, 140)),
+])
+def test_letterbox(shape, size, expected_r, pad):
+    img = np.zeros(shape + (3,), np.uint8)
+    out, r, (left, top) = letterbox(img, size)
+    assert out.shape == (size, size, 3)
+    assert r == pytest.approx(expected_r)
+    assert (left, top) == pad
+    nh, nw = round(shape[0] * r), round(shape[1] * r)
+    assert (out[top:top + nh, left:left + nw] == 0).all()
+    padding = np.ones((size, size), bool)
+    padding[top:top + nh, left:left + nw] = False
+    assert (out[padding] == LETTERBOX_COLOR).all()
+
+
+@pytest.mark.parametrize("mask_shape,orig_shape,content", [
+    ((640, 640), (480, 640), (slice(80, 560), slice(0, 640))),   # square letterbox
+    ((384, 640), (1080, 1920), (slice(12, 372), slice(0, 640))),  # rect (stride-padded) letterbox
+    ((640, 480), (1280, 960), (slice(0, 640), slice(0, 480))),    # no padding
+])
+def test_strip_letterbox(mask_shape, orig_shape, content):
+    masks = np.zeros((2,) + mask_shape, np.float32)
+    masks[:, content[0], content[1]] = 1.0
+    out = _strip_letterbox(masks, orig_shape)
+    assert out.shape[1:] == (content[0].stop - content[0].start, content[1].stop - content[1].start)
+    assert (out == 1.0).all()
+    # Same aspect ratio as the original image
+    assert out.shape[2] / out.shape[1] == pytest.approx(orig_shape[1] / orig_shape[0], rel=0.01)
+
+
+def test_strip_letterbox_empty():
+    masks = np.zeros((0, 640, 640), np.float32)
+    assert _strip_letterbox(masks, (480, 640)) is masks
+
+
+def model(imgsz):
+    m = OnnxYOLO.__new__(OnnxYOLO)  # no ONNX session needed for postprocessing
+    m.imgsz = imgsz
+    return m
+
+
+def raw_outputs(boxes_orig, scores, r, pad, nc=2, nm=1, proto_size=None):
+    """YOLOv8 head output (anchors, 4 + nc + nm) for boxes given in original coordinates."""
+    rows = []
+    for (x1, y1, x2, y2), (cls, score) in zip(boxes_orig, scores):
+        bx1, by1 = x1 * r + pad[0], y1 * r + pad[1]
+        bx2, by2 = x2 * r + pad[0], y2 * r + pad[1]
+        row = np.zeros(4 + nc + nm, np.float32)
+        row[:4] = [(bx1 + bx2) / 2, (by1 + by2) / 2, bx2 - bx1, by2 - by1]
+        row[4 + cls] = score
+        row[4 + nc:] = 1.0
+        rows.append(row)
+    proto = np.full((nm, proto_size, proto_size), 20.0, np.float32) if proto_size else None
+    return np.stack(rows), proto
+
+
+@pytest.mark.parametrize("shape,imgsz", [((480, 640), 640), ((333, 451), 320), ((1001, 777), 640)])
+def test_onnx_postprocess_restores_boxes_and_masks(shape, imgsz):
+    h, w = shape
+    _img, r, pad = letterbox(np.zeros(shape + (3,), np.uint8), imgsz)
+    plate = (0.1 * w, 0.2 * h, 0.5 * w, 0.45 * h)
+    car = (0.05 * w, 0.5 * h, 0.95 * w, 0.999 * h)
+    pred, proto = raw_outputs(
+        [plate, car, plate, car],
+        [(0, 0.9), (1, 0.8), (0, 0.85), (1, 0.1)],  # duplicate plate (NMS), weak car (conf)
+        r, pad, proto_size=imgsz // 4,
+    )
+    dets = model(imgsz)._postprocess(pred, proto, 2, 0.25, 0.7, (shape, r, pad))
+
+    assert len(dets) == 2
+    np.testing.assert_allclose(dets.boxes, [plate, car], atol=1e-3 * max(h, w))
+    np.testing.assert_allclose(dets.confs, [0.9, 0.8], atol=1e-6)
+    assert dets.classes.tolist() == [0, 1]
+
+    # Masks cover the original image at input resolution, padding removed,
+    # and are cut to their boxes
+    mh, mw = dets.masks.shape[1:]
+    assert (mh, mw) == (round(h * r), round(w * r))
+    for mask, (x1, y1, x2, y2) in zip(dets.masks, [plate, car]):
+        ys, xs = np.nonzero(mask)
+        np.testing.assert_allclose(
+            [xs.min() / r, ys.min() / r, (xs.max() + 1) / r, (ys.max() + 1) / r],
+            [x1, y1, x2, y2], atol=1.5 / r,
+        )
+
+
+def test_onnx_postprocess_boxes_only_and_clipping():
+    shape, imgsz = (480, 640), 640
+    _img, r, pad = letterbox(np.zeros(shape + (3,), np.uint8), imgsz)
+    # Box reaching into the letterbox padding above the image
+    pred, _proto = raw_outputs([(100, -40, 300, 100)], [(0, 0.9)], r, pad, nm=0)
+    dets = model(imgsz)._postprocess(pred, None, 2, 0.25, 0.7, (shape, r, pad))
+    assert dets.masks is None
+    np.testing.assert_allclose(dets.boxes, [[100, 0, 300, 100]], atol=1e-3)
+
+
+def test_onnx_postprocess_nothing_above_conf():
+    pred, proto = raw_outputs([(0, 0, 10, 10)], [(0, 0.1)], 1.0, (0, 80), proto_size=160)
+    dets = model(640)._postprocess(pred, proto, 2, 0.25, 0.7, ((480, 640), 1.0, (0, 80)))
+    assert len(dets) == 0
+    assert dets.masks.shape[0] == 0
+
+
+def test_ultralytics_masks_use_strip_letterbox(monkeypatch):
+    calls = []
+    monkeypatch.setattr(yolo_backend, "_strip_letterbox", lambda m, s: calls.append(s) or m)
+
+    class Tensor:
+        def __init__(self, a):
+            self.a = np.asarray(a)
+
+        def cpu(self):
+            return self
+
+        def numpy(self):
+            return self.a
+
+    class Result:
+        orig_shape = (480, 640)
+        boxes = type("Boxes", (), {
+            "xyxy": Tensor([[1, 2, 3, 4]]), "conf": Tensor([0.5]), "cls": Tensor([2]),
+        })()
+        masks = type("Masks", (), {"data": Tensor(np.zeros((1, 640, 640)))})()
+
+    dets = yolo_backend.Detections.from_ultralytics(Result())
+    assert calls == [(480, 640)]
+    assert dets.classes.tolist() == [2]